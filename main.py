@@ -1,5 +1,17 @@
+import sys
+import time
+
+_startup_time = time.perf_counter()
+
+# has to come before everything it's supposed to time, utils included
+from profiling import parse_profile_args, startup_profiler
+
+profile_options = parse_profile_args(sys.argv[1:])
+if profile_options.enabled:
+    startup_profiler.start(profile_options, start_time=_startup_time)
+
 import setproctitle
-from user.parse_config import check_or_generate_config, set_theme, USER_CONFIG_FILE, USER_CONFIG_PATH, DEFAULT_CONFIG
+from user.parse_config import check_or_generate_config, set_theme, USER_CONFIG_FILE, DEFAULT_CONFIG
 
 from modules.statusbar import StatusBar
 from fabric import Application
@@ -14,46 +26,34 @@ import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from utils.file_watch import get_file_watcher
+from utils.stylesheet import get_stylesheet_manager
+from utils.store import get_store
+from services import configure as configure_services
 
 import os
 
 
-class CSSFileHandler(FileSystemEventHandler):
-    def __init__(self, app, css_path):
-        self.app = app
-        self.css_path = css_path
+def on_css_changed(css_path):
+    def callback(path, event, dest):
+        if path.endswith(".css") and event == "changed":
+            logger.info(f"[Main] CSS file modified: {path}")
+            get_stylesheet_manager().queue_reload(css_path)
+    return callback
 
-    def on_modified(self, event):
-        if event.src_path.endswith(".css"):
-            logger.info(f"[Main] CSS file modified: {event.src_path}")
-            try:
-                provider = Gtk.CssProvider()
-                provider.load_from_path(self.css_path)
 
-                display = Gdk.Screen.get_default()
-                Gtk.StyleContext.add_provider_for_screen(
-                    display,
-                    provider,
-                    Gtk.STYLE_PROVIDER_PRIORITY_USER
-                )
+def on_config_changed(path, event, dest):
+    if event != "changed":
+        return
+    logger.info("[Main] ERMMMMM Config modification alert")
 
-                logger.info("CSS reloaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to reload CSS: {e}")
-
-class ConfigEventHandler(FileSystemEventHandler):
-    def on_modified(self, event):
-        if os.path.basename(event.src_path) == "config.json":
-            logger.info("[Main] ERMMMMM Config modification alert")
-
-            if check_or_generate_config():
-                with open(event.src_path, "rb") as h:
-                    new_config = json.load(h)
+    if check_or_generate_config():
+        with open(path, "rb") as h:
+            new_config = json.load(h)
 
-                if set_theme(new_config):
-                    logger.info("[Main] Theme {} set (live)".format(new_config["theme"]))
+        if set_theme(new_config):
+            logger.info("[Main] Theme {} set (live)".format(new_config["theme"]))
+        configure_services(new_config)
 
 
 def load_configuration():
@@ -66,84 +66,68 @@ def load_configuration():
     
     if set_theme(config):
         logger.info("[Main] Theme {} set".format(config["theme"]))
+    configure_services(config)
     return config
 
 def setup_css_provider(css_path):
     """Sets up the GTK CSS provider."""
-    provider = Gtk.CssProvider()
-    provider.load_from_path(css_path)
-    Gtk.StyleContext.add_provider_for_screen(
-        Gdk.Screen.get_default(),
-        provider,
-        Gtk.STYLE_PROVIDER_PRIORITY_USER
-    )
-
-def start_file_observers(app, css_path):
-    """Initializes and starts file system observers."""
-    # CSS observer
-    css_handler = CSSFileHandler(app, css_path)
-    css_observer = Observer()
-    css_observer.schedule(css_handler, path=get_relative_path("./styles"), recursive=False)
-    css_observer.start()
-
-    # Pywal observer
-    pywal_observer = None
+    get_stylesheet_manager().load(css_path)
+
+def start_file_watches(css_path):
+    """Watches styles, the pywal cache and the config, all on the main loop."""
+    watcher = get_file_watcher()
+    watcher.watch_dir(get_relative_path("./styles"), on_css_changed(css_path))
+
     pywal_css_file = os.path.join(os.getenv('HOME'), '.cache/wal/colors.css') # Specific Pywal CSS file
     if os.path.isfile(pywal_css_file):
         logger.info(f"[Main] Pywal CSS detected at {pywal_css_file}, setting up live reload.")
-        pywal_handler = CSSFileHandler(app, pywal_css_file) # Reusing CSSFileHandler
-        pywal_observer = Observer()
-        # Watch the directory containing the Pywal CSS file
-        pywal_observer.schedule(pywal_handler, path=os.path.dirname(pywal_css_file), recursive=False)
-        pywal_observer.start()
+        watcher.watch_dir(os.path.dirname(pywal_css_file), on_css_changed(pywal_css_file))
     else:
         logger.info(f"[Main] Pywal CSS not found at {pywal_css_file}, skipping live reload for it.")
 
-    # Config observer
-    config_dir_path = os.path.realpath(USER_CONFIG_PATH)
-    config_handler = ConfigEventHandler()
-    config_observer = Observer()
-    # Watch the config directory, not recursively, as ConfigEventHandler checks for "config.json"
-    config_observer.schedule(config_handler, path=config_dir_path, recursive=False)
-    config_observer.start()
-
-    return css_observer, pywal_observer, config_observer
+    watcher.watch_file(USER_CONFIG_FILE, on_config_changed)
 
 
 if __name__ == "__main__":
     setproctitle.setproctitle("goblin")
     
-    config = load_configuration()
+    with startup_profiler.phase("load_configuration"):
+        config = load_configuration()
 
     # Initialize apps
-    statusbar = StatusBar(config=config)
+    with startup_profiler.phase("statusbar"):
+        statusbar = StatusBar(config=config)
     app = Application("goblin", statusbar)
 
+    profile_failed = False
+    if startup_profiler.enabled:
+        # a profiling run is over once the bar is on screen. it maps inside its
+        # constructor (show_all), so this has to be hooked up right after it
+        def on_profile_done(failed: bool):
+            global profile_failed
+            profile_failed = failed
+            app.quit()
+
+        startup_profiler.finish_on_first_map(statusbar, on_profile_done)
+
     css_path = get_relative_path("./styles/style.css")
-    setup_css_provider(css_path)
-    
-    css_observer, pywal_observer, config_observer = start_file_observers(app, css_path)
+    with startup_profiler.phase("css"):
+        setup_css_provider(css_path)
     
+    with startup_profiler.phase("file_watches"):
+        start_file_watches(css_path)
+
     try:
         app.run()
     except KeyboardInterrupt:
-        logger.info("[Main] Keyboard interrupt detected. Stopping observers...")
+        logger.info("[Main] Keyboard interrupt detected. Exiting...")
     finally:
-        logger.info("[Main] Stopping observers...")
-        css_observer.stop()
-        if pywal_observer:
-            pywal_observer.stop()
-        config_observer.stop() 
-
-        logger.info("[Main] Joining observers...")
-        css_observer.join()
-        if pywal_observer:
-            pywal_observer.join()
-        config_observer.join()
-        logger.info("[Main] All observers stopped and joined. Exiting.")
-
+        get_store().flush()
         logger.info("[Main] Shutting down async task manager...")
         async_task_manager.shutdown()
         logger.info("[Main] Async task manager shut down. GObLiN exiting.")
 
+    if profile_failed:
+        sys.exit(1)
+
 
@@ -12,22 +12,16 @@ from fabric.widgets.wayland import WaylandWindow as Window
 from fabric import Application
 from fabric.utils import get_relative_path
 
-from widgets.media_widget import MediaWidget
-from widgets.profile import Profile
-from widgets.power_menu import PowerMenu
-from widgets.hw_monitor import HWMonitor
-from widgets.network_controls import NetworkControls
-
-from widgets.todos import Todos
-from widgets.timer import TimerWidget
+# the other widgets are imported by their LazyWidget factories, on first show
 from widgets.reminders import Reminders
-from widgets.pins import Pins
-from widgets.kanban import Kanban
-from widgets.controls import Controls
 
 from widgets.popup import NotificationPopup
 
 from user.icons import Icons
+from user.parse_config import DEFAULT_CONFIG
+from utils.visibility import VisibilityGate
+from utils.lazy import LazyWidget, import_attr
+from services import get_service
 
 
 from loguru import logger
@@ -53,7 +47,7 @@ class ControlCenter(Window):
                 return True
         return False
 
-    def __init__(self, **kwargs):
+    def __init__(self, config: dict = DEFAULT_CONFIG, **kwargs):
         super().__init__(
             layer="overlay",
             title="control-center",
@@ -65,8 +59,14 @@ class ControlCenter(Window):
             **kwargs,
         )
 
+        # widgets listed here are never built, so their modules are never imported
+        self.disabled_widgets: set[str] = set(config.get("disabled_widgets", DEFAULT_CONFIG["disabled_widgets"]))
+
         self.connect("key-press-event", self.on_key_press)
 
+        # stop every poller in here while the window is hidden
+        self.visibility = VisibilityGate(self, hide_signals=("notify_hide",))
+
         #  ____  _____ _____ ___ _   _ _____
         # |  _ \| ____|  ___|_ _| \ | | ____|
         # | | | |  _| | |_   | ||  \| |  _|
@@ -79,69 +79,82 @@ class ControlCenter(Window):
         #   \ V  V /  | || |_| | |_| | |___  | |  ___) |
         #    \_/\_/  |___|____/ \____|_____| |_| |____/
         #
-        self.profile = Profile(name="profile")
+        # everything below is built the first time it's actually shown, see LazyWidget
+        self.profile = self._lazy(
+            "profile",
+            lambda: import_attr("widgets.profile:Profile")(name="profile"),
+            on_built=self.visibility.register,
+        )
 
-        self.hwmon = HWMonitor(name="hw-mon")  # this goes in center_widgets
+        self.hwmon = self._lazy(
+            "hw_monitor",
+            lambda: import_attr("widgets.hw_monitor:HWMonitor")(name="hw-mon"),
+            on_built=self.visibility.register,
+        )  # this goes in center_widgets
 
-        self.controls = Controls(
-            name="controls", size=(300, -1)
+        self.controls = self._lazy(
+            "controls", lambda: import_attr("widgets.controls:Controls")(name="controls", size=(300, -1))
         )  # sliders for vol, brightness
 
-        self.power_menu = PowerMenu()
-        self.media = MediaWidget(name="media")
+        self.power_menu = self._lazy("power_menu", lambda: import_attr("widgets.power_menu:PowerMenu")())
+        self.media = self._lazy(
+            "media",
+            lambda: import_attr("widgets.media_widget:MediaWidget")(name="media"),
+            on_built=self.visibility.register,
+        )
 
-        self.header = Box(orientation="h", children=[self.profile])
-        self.row_1 = Box(orientation="h", children=[self.hwmon], name="outer-box")
-        self.row_2 = Box(orientation="h", children=[self.controls], name="outer-box")
+        self.header = Box(orientation="h", children=self._enabled(self.profile))
+        self.row_1 = Box(orientation="h", children=self._enabled(self.hwmon), name="outer-box")
+        self.row_2 = Box(orientation="h", children=self._enabled(self.controls), name="outer-box")
         #        self.row_3 = Box(
         #            orientation="h", children=[self.fetch], name="outer-box"
         #        )
 
 #        self.todos = Todos(name="todos", size=(-1, 120))
 #        self.todos.set_hexpand(True)
-        self.kanban = Kanban(name="kanban")
-        self.kanban.set_size_request(-1, 196)
-        self.kanban.set_hexpand(False)
-        self.timer = TimerWidget(
-            name="timer",
-        )
-        self.timer.connect("timer-finished", self.on_timer_finished)
+        self.kanban = self._lazy("kanban", self._build_kanban)
+        self.timer = self._lazy("timer", lambda: import_attr("widgets.timer:TimerWidget")(name="timer"))
+        if self.timer is not None:
+            # timers keep running (and restored ones go off) without the page ever being opened
+            get_service("timers").connect("finished", self.on_timer_finished)
+        # not shown anywhere, but it has to be running for reminders to go off
         self.reminders = Reminders(name="reminders")
         self.reminders.connect("reminder-due", self.on_reminder_due)
 
-        self.pins = Pins(name="pins")
+        self.pins = self._lazy("pins", lambda: import_attr("widgets.pins:Pins")(name="pins"))
 
         #        self.row_3 = Box(
         #            orientation="h", children=[self.todos], name="outer-box", h_expand=True
         #        )
 
+        # only the current page gets mapped, so the others wait until they're switched to
         self.utils_notebook = Gtk.Notebook(name="utils-notebook")
-        self.utils_notebook.append_page(self.kanban, Gtk.Label(Icons.TODOS.value))
-        self.utils_notebook.append_page(self.timer, Gtk.Label(Icons.TIMER.value))
-        self.utils_notebook.append_page(self.pins, Gtk.Label(Icons.PAPERCLIP.value))
+        for page, icon in ((self.kanban, Icons.TODOS), (self.timer, Icons.TIMER), (self.pins, Icons.PAPERCLIP)):
+            if page is not None:
+                self.utils_notebook.append_page(page, Gtk.Label(icon.value))
 
         self.row_3 = Box(
-            children=[self.utils_notebook],
+            children=[self.utils_notebook] if self.utils_notebook.get_n_pages() else [],
             name="outer-box",
         )
 
-        self.network_controls = NetworkControls()
+        self.network_controls = self._lazy(
+            "network",
+            lambda: import_attr("widgets.network_controls:NetworkControls")(),
+            on_built=lambda network_controls: self.visibility.register(network_controls.wifi_menu),
+        )
         
-        self.row_4 = Box(orientation="h", children=[self.network_controls], name="outer-box", v_expand=True)
+        self.row_4 = Box(orientation="h", children=self._enabled(self.network_controls), name="outer-box", v_expand=True)
         
-        self.row_5 = Box(orientation="h", children=[self.power_menu], name="outer-box")
+        self.row_5 = Box(orientation="h", children=self._enabled(self.power_menu), name="outer-box")
         self.row_6 = Box(
-            orientation="h", children=[self.media], name="outer-box", h_expand=True
+            orientation="h", children=self._enabled(self.media), name="outer-box", h_expand=True
         )
 
         self.widgets = [
-            self.header,
-            self.row_1,
-            self.row_2,
-            self.row_3,
-            self.row_4,
-            self.row_5,
-            self.row_6,
+            row
+            for row in (self.header, self.row_1, self.row_2, self.row_3, self.row_4, self.row_5, self.row_6)
+            if row.get_children()
         ]
 
         self.add(
@@ -152,16 +165,35 @@ class ControlCenter(Window):
                 children=self.widgets,
             ),
         )
-        self.show_all()
+
+        # show the contents but not the window. show_all() here would map it on the
+        # spot (GTK maps a shown toplevel synchronously), and every LazyWidget in it
+        # would be built at startup. they're built when the window is first shown
+        self.get_child().show_all()
+
+    def _lazy(self, name: str, factory, on_built=None) -> LazyWidget | None:
+        if name in self.disabled_widgets:
+            return None
+        return LazyWidget(factory, on_built=on_built)
+
+    @staticmethod
+    def _enabled(*widgets) -> list:
+        return [widget for widget in widgets if widget is not None]
+
+    def _build_kanban(self) -> Gtk.Widget:
+        kanban = import_attr("widgets.kanban:Kanban")(name="kanban")
+        kanban.set_size_request(-1, 196)
+        kanban.set_hexpand(False)
+        return kanban
 
     def toggle_visible(self) -> None:
         self.set_visible(not self.is_visible())
 
-    def on_timer_finished(self, timer) -> None:
+    def on_timer_finished(self, timers, name: str) -> None:
         NotificationPopup(
             parent=self,
             title=Icons.TIMER.value,
-            body="Timer finished!",
+            body=f"Timer {name} finished!",
             name="window",
             anchor="top center",
         ).show()
@@ -178,6 +210,7 @@ class ControlCenter(Window):
 
 if __name__ == "__main__":
     control_center = ControlCenter()
+    control_center.show()
     app = Application("control-center", control_center)
     app.set_stylesheet_from_file(get_relative_path("../styles/style.css"))
 
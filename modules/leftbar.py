@@ -8,11 +8,6 @@ from fabric.utils import (
 )
 
 
-from fabric.hyprland.widgets import (
-    Workspaces as HyprlandWorkspaces,
-    WorkspaceButton as HyprlandWorkspaceButton,
-)
-
 from modules.control_center import ControlCenter
 from modules.osd import OSD
 
@@ -21,7 +16,8 @@ from user.commands import Commands
 from widgets.battery_single import BatterySingle
 from widgets.systray import SystemTray
 from widgets.calendar_widget import CalendarWidget, CalendarWindow
-from widgets.sway import Workspaces as SwayWorkspaces
+
+from utils.stylesheet import get_stylesheet_manager
 
 from user.parse_config import check_or_generate_config, set_theme, USER_CONFIG_FILE, DEFAULT_CONFIG
 
@@ -56,7 +52,7 @@ class LeftBar(Window):
             style="margin: 15px 10px 10px 5px;",  # to center the icon glyph
         )
 
-        self.control_center = ControlCenter()
+        self.control_center = ControlCenter(config=self.config)
         
         self.control_center.connect("notify_hide", self.on_cc_hidden)
         self.control_center.hide()
@@ -64,10 +60,16 @@ class LeftBar(Window):
         self.osd = OSD()
         self.osd.hide()
 
-        self.calendar_window = CalendarWindow(name="window")
+        self.calendar_window = CalendarWindow(config=self.config, name="window")
         self.calendar_window.hide()
         
+        # only the configured compositor's module gets imported
         if self.config["workspaces_wm"] == "hyprland":
+            from fabric.hyprland.widgets import (
+                Workspaces as HyprlandWorkspaces,
+                WorkspaceButton as HyprlandWorkspaceButton,
+            )
+
             self.workspaces = HyprlandWorkspaces(
                 name="workspaces",
                 orientation="v",
@@ -81,6 +83,8 @@ class LeftBar(Window):
                 ),
             )
         elif self.config["workspaces_wm"] == "sway":
+            from widgets.sway import Workspaces as SwayWorkspaces
+
             self.workspaces = SwayWorkspaces(orientation="v", icons=self.config["ws_icons"])
 
         self.battery = BatterySingle(name="battery", orientation=Gtk.Orientation.VERTICAL)
@@ -151,17 +155,7 @@ class LeftBar(Window):
         menu.popup_at_pointer(event)
 
     def refresh_css(self, *_): 
-        css_path = get_relative_path("../styles/style.css")
-
-        provider = Gtk.CssProvider()
-        provider.load_from_path(css_path)
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-
-
+        get_stylesheet_manager().queue_reload(get_relative_path("../styles/style.css"))
 
     def on_cc_hidden(self, *_):
         self.osd.suppressed = False
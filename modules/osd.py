@@ -2,7 +2,7 @@ from fabric import Application
 from fabric.widgets.wayland import WaylandWindow as Window
 from fabric.widgets.revealer import Revealer
 
-from services import audio_service, brightness_service
+from services import get_service
 
 from user.icons import Icons
 
@@ -14,6 +14,49 @@ from typing import Literal
 
 from utils.monitors import get_current_gdk_monitor_id
 
+HIDE_DELAY_MS = 900
+
+
+class FrameCoalescer:
+    """Runs `callback` at most once per frame of `widget` however often `queue` is called.
+
+    Falls back to an idle callback while the widget isn't mapped, since there's no
+    frame clock ticking for it then.
+    """
+
+    def __init__(self, widget: Gtk.Widget, callback):
+        self.widget = widget
+        self.callback = callback
+        self._tick_id: int | None = None
+        self._idle_id: int | None = None
+        self.widget.connect("unmap", self._on_unmap)
+
+    def queue(self) -> None:
+        if self._tick_id is not None or self._idle_id is not None:
+            return
+        if self.widget.get_mapped():
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+        else:
+            self._idle_id = GLib.idle_add(self._on_idle)
+
+    def _on_tick(self, widget, frame_clock) -> bool:
+        self._tick_id = None
+        self.callback()
+        return GLib.SOURCE_REMOVE
+
+    def _on_idle(self) -> bool:
+        self._idle_id = None
+        self.callback()
+        return False
+
+    def _on_unmap(self, widget) -> None:
+        # a pending tick won't fire until the widget is shown again, flush it now
+        if self._tick_id is not None:
+            self.widget.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+            self._idle_id = GLib.idle_add(self._on_idle)
+
+
 class AudioOSDContainer(Gtk.Box):
     __gsignals__ = {"volume-changed": (GObject.SignalFlags.RUN_FIRST, None, ())}
 
@@ -32,7 +75,9 @@ class AudioOSDContainer(Gtk.Box):
 
         self.show_all()
 
-        self.audio = audio_service
+        self._redraw = FrameCoalescer(self, self.redraw)
+
+        self.audio = get_service("audio")
         self.audio.connect("notify::speaker", self.on_speaker_changed)
         self.audio.connect("changed", self.check_mute)
 
@@ -41,17 +86,17 @@ class AudioOSDContainer(Gtk.Box):
             speaker.connect("notify::volume", self.update_volume)
             
     def update_volume(self, speaker, _):
-        speaker.handler_block_by_func(self.update_volume)
+        self._redraw.queue()
         self.emit("volume-changed")
-        if not self.audio.speaker:
+
+    def redraw(self):
+        if not (speaker := self.audio.speaker):
             return
-        if self.audio.speaker.muted:
+        if speaker.muted:
             self.icon.set_text(Icons.VOL_MUTE.value)
         else:
             self.icon.set_text(Icons.VOL.value)
-        volume = round(self.audio.speaker.volume)
-        self.scale.set_value(volume)
-        speaker.handler_unblock_by_func(self.update_volume)
+        self.scale.set_value(round(speaker.volume))
 
     def check_mute(self, audio):
         if not audio.speaker:
@@ -83,12 +128,19 @@ class BrightnessOSDContainer(Gtk.Box):
 
         self.show_all()
 
-        self.brightness = brightness_service.get_initial()
+        self._value: int = 0
+        self._redraw = FrameCoalescer(self, self.redraw)
+
+        self.brightness = get_service("brightness")
         self.brightness.connect("screen", self.on_brightness_changed)
 
     def on_brightness_changed(self, service, value):
-        self.scale.set_value(value)
+        self._value = value
+        self._redraw.queue()
         self.emit("brightness-changed", 0)
+
+    def redraw(self):
+        self.scale.set_value(self._value)
             
 class OSD(Window):
     def __init__(self, **kwargs):
@@ -117,8 +169,19 @@ class OSD(Window):
         self.set_visible(False)
         self.hide_timer_id = None
         self.suppressed: bool = False
-        
+
+        # show_box only records what to show, the window is touched once per frame
+        self._pending_box: Literal["audio", "brightness"] | None = None
+        self._current_box: Literal["audio", "brightness"] | None = None
+        self._hide_at: int = 0
+        self._redraw = FrameCoalescer(self, self._apply)
+
     def _hide(self):
+        # the deadline gets pushed back by every show_box, only hide once it has passed
+        remaining_ms = (self._hide_at - GLib.get_monotonic_time()) // 1000
+        if remaining_ms > 0:
+            self.hide_timer_id = GLib.timeout_add(remaining_ms, self._hide)
+            return False
         self.set_visible(False)
         self.hide_timer_id = None
         return False  
@@ -126,26 +189,34 @@ class OSD(Window):
     def show_box(self, box_to_show: Literal["audio", "brightness"]):
         if self.suppressed:
             return
-        
-        self.monitor = get_current_gdk_monitor_id()
-        
-        match box_to_show:
-            case "audio":
-                self.revealer.children = self.audio_osd_container
-            case "brightness":
-                self.revealer.children = self.brightness_osd_container
-            
-        self.revealer.set_reveal_child(True)
-        
-        self.set_visible(True)
-        
-        if self.hide_timer_id is not None:
-            GLib.source_remove(self.hide_timer_id)
-        
-        self.hide_timer_id = GLib.timeout_add(
-            900,
-            self._hide
-        )
+        self._pending_box = box_to_show
+        self._hide_at = GLib.get_monotonic_time() + HIDE_DELAY_MS * 1000
+        self._redraw.queue()
+
+    def _apply(self):
+        if (box_to_show := self._pending_box) is None:
+            return
+        self._pending_box = None
+
+        monitor = get_current_gdk_monitor_id()
+        if monitor is not None and monitor != self.monitor:
+            self.monitor = monitor
+
+        if box_to_show != self._current_box:
+            match box_to_show:
+                case "audio":
+                    self.revealer.children = self.audio_osd_container
+                case "brightness":
+                    self.revealer.children = self.brightness_osd_container
+            self._current_box = box_to_show
+
+        if not self.revealer.get_reveal_child():
+            self.revealer.set_reveal_child(True)
+        if not self.get_visible():
+            self.set_visible(True)
+
+        if self.hide_timer_id is None:
+            self.hide_timer_id = GLib.timeout_add(HIDE_DELAY_MS, self._hide)
         
     def show_audio_osd(self, osd):
         self.show_box(box_to_show="audio")
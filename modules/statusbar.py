@@ -8,11 +8,6 @@ from fabric.utils import (
     exec_shell_command_async,
 )
 
-
-from fabric.hyprland.widgets import (
-    Workspaces as HyprlandWorkspaces,
-    WorkspaceButton as HyprlandWorkspaceButton,
-)
 from gi.repository.GLib import variant_parse_error_print_context
 
 from modules.control_center import ControlCenter
@@ -23,7 +18,8 @@ from user.commands import Commands
 from widgets.battery_single import BatterySingle
 from widgets.systray import SystemTray
 from widgets.calendar_widget import CalendarWidget, CalendarWindow
-from widgets.sway import Workspaces as SwayWorkspaces
+
+from utils.stylesheet import get_stylesheet_manager
 
 from user.parse_config import check_or_generate_config, set_theme, USER_CONFIG_FILE, DEFAULT_CONFIG
 
@@ -59,7 +55,7 @@ class StatusBar(Window):
             name="bar-icon",
         )
 
-        self.control_center = ControlCenter()
+        self.control_center = ControlCenter(config=self.config)
         self.control_center.connect("notify_hide", self.on_cc_hidden)
         self.control_center.hide()
         
@@ -67,12 +63,19 @@ class StatusBar(Window):
         self.osd.hide()
 
         self.calendar_window = CalendarWindow(
+            config=self.config,
             name="window",
             anchor=("center left" if self.vertical_bar else "top center")
         )
         self.calendar_window.hide()
         
+        # only the configured compositor's module gets imported
         if self.config["workspaces_wm"] == "hyprland":
+            from fabric.hyprland.widgets import (
+                Workspaces as HyprlandWorkspaces,
+                WorkspaceButton as HyprlandWorkspaceButton,
+            )
+
             self.workspaces = HyprlandWorkspaces(
                 name="workspaces",
                 orientation=child_orientation,
@@ -86,6 +89,8 @@ class StatusBar(Window):
                 ),
             )
         elif self.config["workspaces_wm"] == "sway":
+            from widgets.sway import Workspaces as SwayWorkspaces
+
             self.workspaces = SwayWorkspaces(
                 orientation=child_orientation,
                 icons=self.config["ws_icons"]
@@ -170,17 +175,7 @@ class StatusBar(Window):
         menu.popup_at_pointer(event)
 
     def refresh_css(self, *_): 
-        css_path = get_relative_path("../styles/style.css")
-
-        provider = Gtk.CssProvider()
-        provider.load_from_path(css_path)
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_USER
-        )
-
-
+        get_stylesheet_manager().queue_reload(get_relative_path("../styles/style.css"))
 
     def on_cc_hidden(self, *_):
         self.osd.suppressed = False
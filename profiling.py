@@ -0,0 +1,273 @@
+"""
+Startup profiler, enabled with `python main.py --profile-startup[=report.json]`.
+
+Records how long every module takes to import, how long each widget class defined
+under widgets/ and modules/ spends in its constructor, and the time until the bar
+first maps. The report is written as JSON and the app quits, exiting with status 1
+if `--startup-budget=<ms>` was given and the bar mapped later than that, or if the
+report couldn't be written, so the same command works as a regression check.
+
+This lives outside utils/ on purpose: importing anything from that package runs
+utils/__init__.py, which imports gi and starts the async task manager, and that
+has to happen after the import hook is installed to show up in the report. For
+the same reason only the standard library is imported up here.
+"""
+
+import argparse
+import functools
+import importlib.abc
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+DEFAULT_REPORT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "goblin", "startup-profile.json"
+)
+
+# a profiling run gives up waiting for the bar to map after this long
+MAP_TIMEOUT = 30
+
+# classes defined in these packages get their constructors timed
+INSTRUMENTED_PACKAGES = ("widgets.", "modules.")
+
+
+@dataclass
+class ProfileOptions:
+    enabled: bool = False
+    report_path: str = DEFAULT_REPORT_PATH
+    budget_ms: float | None = None
+
+
+def parse_profile_args(argv: list[str]) -> ProfileOptions:
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile-startup", nargs="?", const=DEFAULT_REPORT_PATH, default=None)
+    parser.add_argument("--startup-budget", type=float, default=None)
+    args, _ = parser.parse_known_args(argv)
+    return ProfileOptions(
+        enabled=args.profile_startup is not None,
+        report_path=args.profile_startup or DEFAULT_REPORT_PATH,
+        budget_ms=args.startup_budget,
+    )
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.time_import(module.__name__):
+            self._loader.exec_module(module)
+        if module.__name__.startswith(INSTRUMENTED_PACKAGES):
+            self._profiler.instrument_module(module)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Asks the real finders for the spec, then wraps its loader in a _TimedLoader"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.options = ProfileOptions()
+        self._start: float = time.perf_counter()
+        self._finder: _ImportTimer | None = None
+
+        # module -> [cumulative seconds, self seconds]
+        self._imports: dict[str, list[float]] = {}
+        self._import_stack: list[list[float]] = []
+        # class -> [calls, seconds]
+        self._widgets: dict[str, list[float]] = {}
+        self._phases: dict[str, float] = {}
+        self._first_map: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._finder is not None
+
+    def start(self, options: ProfileOptions, start_time: float | None = None) -> None:
+        self.options = options
+        self._start = start_time or time.perf_counter()
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def stop(self) -> None:
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    # recording
+    @contextmanager
+    def time_import(self, name: str):
+        # children subtract their time from the parent's frame, what's left is self time
+        frame = [0.0]
+        self._import_stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1][0] += elapsed
+            self._imports[name] = [elapsed, elapsed - frame[0]]
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self._phases[name] = time.perf_counter() - start
+
+    def instrument_module(self, module) -> None:
+        for obj in list(vars(module).values()):
+            if (
+                isinstance(obj, type)
+                and obj.__module__ == module.__name__
+                and "__init__" in obj.__dict__
+            ):
+                obj.__init__ = self._timed_init(f"{obj.__module__}.{obj.__qualname__}", obj.__init__)
+
+    def _timed_init(self, name: str, init):
+        @functools.wraps(init)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return init(*args, **kwargs)
+            finally:
+                stats = self._widgets.setdefault(name, [0, 0.0])
+                stats[0] += 1
+                stats[1] += time.perf_counter() - start
+
+        return wrapper
+
+    # reporting
+    def finish_on_first_map(self, window, on_done) -> None:
+        """
+        Writes the report once `window` maps, then calls `on_done(failed)`. `failed`
+        is set when the bar mapped over budget, never mapped, or the report is missing.
+
+        Call this right after constructing the window. Windows that show_all() in
+        their constructor are already mapped by then, GTK maps them synchronously.
+        """
+        from gi.repository import GLib
+
+        timeout_id = None
+
+        def on_map(*_):
+            nonlocal timeout_id
+            if self._first_map is None:
+                self._first_map = time.perf_counter() - self._start
+                if timeout_id is not None:
+                    GLib.source_remove(timeout_id)
+                    timeout_id = None
+                # let the first frame go out before doing file I/O
+                GLib.idle_add(finish)
+
+        def on_timeout():
+            nonlocal timeout_id
+            timeout_id = None
+            self._log("error", f"bar didn't map within {MAP_TIMEOUT}s, giving up")
+            finish()
+            return False
+
+        def finish():
+            self.stop()
+            report = self.report()
+            written = self.write_report(report)
+            on_done(report["over_budget"] or report["first_map_ms"] is None or not written)
+            return False
+
+        if window.get_mapped():
+            on_map()
+        else:
+            window.connect("map", on_map)
+            timeout_id = GLib.timeout_add_seconds(MAP_TIMEOUT, on_timeout)
+
+    def report(self) -> dict:
+        first_map_ms = self._first_map * 1000 if self._first_map is not None else None
+        budget_ms = self.options.budget_ms
+        return {
+            "first_map_ms": first_map_ms,
+            "budget_ms": budget_ms,
+            "over_budget": (
+                budget_ms is not None and first_map_ms is not None and first_map_ms > budget_ms
+            ),
+            "phases_ms": {name: seconds * 1000 for name, seconds in self._phases.items()},
+            "imports": sorted(
+                (
+                    {"module": name, "cumulative_ms": total * 1000, "self_ms": own * 1000}
+                    for name, (total, own) in self._imports.items()
+                ),
+                key=lambda entry: entry["self_ms"],
+                reverse=True,
+            ),
+            "widgets": sorted(
+                (
+                    {"widget": name, "calls": calls, "total_ms": total * 1000}
+                    for name, (calls, total) in self._widgets.items()
+                ),
+                key=lambda entry: entry["total_ms"],
+                reverse=True,
+            ),
+        }
+
+    def write_report(self, report: dict) -> bool:
+        """Writes the report, returns whether it actually ended up on disk"""
+        path = self.options.report_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(f"{path}.tmp", "w") as h:
+                json.dump(report, h, indent=4)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            self._log("error", f"unable to write startup report: {e}")
+            return False
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            self._log("error", f"startup report missing after writing it to {path}")
+            return False
+
+        if report["first_map_ms"] is not None:
+            self._log("info", f"bar mapped after {report['first_map_ms']:.1f} ms, report written to {path}")
+        else:
+            self._log("info", f"report written to {path}")
+        if report["over_budget"]:
+            self._log("error", f"startup is over the {report['budget_ms']:.0f} ms budget")
+        return True
+
+    @staticmethod
+    def _log(level: str, message: str) -> None:
+        # imported here so loguru's own import is timed too
+        from loguru import logger
+
+        getattr(logger, level)(f"[Profile] {message}")
+
+
+startup_profiler = StartupProfiler()
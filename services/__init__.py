@@ -1,8 +1,91 @@
 # notification_service = Notifications()
-from fabric.audio.service import Audio
-from services.brightness import Brightness
+from utils.sources import get_source_registry
 
-# Instantiate here
-audio_service = Audio()
-brightness_service = Brightness()
+# user config the services are created with, see configure()
+_config: dict = {}
 
+
+# nothing is created here, each service starts the first time it's asked for
+def _audio():
+    from fabric.audio.service import Audio
+    return Audio()
+
+
+def _brightness():
+    from services.brightness import Brightness
+    return Brightness.get_initial()
+
+
+def _metrics():
+    from services.metrics import SystemMetrics
+    return SystemMetrics()
+
+
+def _weather():
+    from services.weather import DEFAULT_INTERVAL, WeatherService
+    return WeatherService(interval=_config.get("weather_interval", DEFAULT_INTERVAL))
+
+
+def _quotes():
+    from services.quotes import QuoteService
+    return QuoteService()
+
+
+def _timers():
+    from services.timers import TimerService
+    return TimerService()
+
+
+_registry = get_source_registry()
+# these stay up for the whole session once started: the OSD, which exists from
+# startup on, watches audio and brightness, and timers have to go off whether or
+# not anything is showing them
+_registry.register("audio", _audio)
+_registry.register("brightness", _brightness)
+_registry.register("timers", _timers)
+# these stop once the last widget that acquired them releases them
+_registry.register("metrics", _metrics, stop=lambda service: service.stop())
+_registry.register("weather", _weather, stop=lambda service: service.stop())
+_registry.register("quotes", _quotes, stop=lambda service: service.stop())
+
+# old module attribute names -> source name
+_ALIASES = {
+    "audio_service": "audio",
+    "brightness_service": "brightness",
+    "metrics_service": "metrics",
+    "weather_service": "weather",
+    "quote_service": "quotes",
+}
+
+
+def get_service(name: str):
+    """The service, started if it isn't running. It's never stopped on this caller's behalf."""
+    return _registry.get(name)
+
+
+def acquire_service(name: str):
+    """Like get_service(), but keeps it running only until the matching release_service()"""
+    return _registry.acquire(name)
+
+
+def release_service(name: str) -> None:
+    _registry.release(name)
+
+
+def configure(config: dict) -> None:
+    """Sets the user config services are created with, and applies it to the running ones.
+
+    Services that aren't running yet aren't started for this, they pick it up when
+    they're first asked for.
+    """
+    _config.update(config)
+    if _registry.is_running("weather") and "weather_interval" in config:
+        get_service("weather").set_interval(config["weather_interval"])
+
+
+def __getattr__(name: str):
+    # `from services import audio_service` still works, it just starts the service
+    # at that point, so prefer get_service() where it's actually used
+    if name in _ALIASES:
+        return get_service(_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,163 @@
+"""
+Base for services that fetch something over HTTP for their subscribers and keep
+the last result on disk.
+
+Subscribers share one service, so N widgets cost one request. Nothing runs while
+nobody is subscribed, failed requests are retried with exponential backoff, and
+the cache is written atomically so a crash never leaves half of it behind.
+
+Subclasses provide `value`, `_start()` (the first subscriber arrived),
+`_fetch()` (a coroutine on async_task_manager's loop that hands its result back
+with `GLib.idle_add`) and `_cache_data()` / `_restore_cache()`. They call
+`_load_cache()` once their own state is set up.
+"""
+
+import json
+from abc import ABCMeta, abstractmethod
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+from utils import async_task_manager
+from utils.store import write_atomic
+
+
+# abc.ABC can't be mixed into a Service as is, the metaclasses conflict
+class _ServiceABCMeta(type(Service), ABCMeta):
+    def __call__(cls, *args, **kwargs):
+        # GObject's constructor skips object.__new__, which is where abstract
+        # classes are normally refused
+        if cls.__abstractmethods__:
+            missing = ", ".join(sorted(cls.__abstractmethods__))
+            raise TypeError(f"Can't instantiate abstract class {cls.__name__} without {missing}")
+        return super().__call__(*args, **kwargs)
+
+
+class CachedHttpService(Service, metaclass=_ServiceABCMeta):
+    @Signal
+    def changed(self, value: object) -> None: ...
+
+    # prefix for log messages
+    log_name = "HTTP"
+    # first retry after a failure, doubled on every further failure
+    retry_delay = 60
+    max_retry_delay = 60 * 60
+
+    def __init__(self, url: str, cache_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.task_manager = async_task_manager
+        self.url = url
+        self.cache_path = cache_path
+
+        self._subscribers: int = 0
+        self._timer_id: int | None = None
+        self._retry_id: int | None = None
+        self._fetching: bool = False
+        self._failures: int = 0
+
+    @property
+    @abstractmethod
+    def value(self) -> object | None: ...
+
+    def subscribe(self, callback) -> int:
+        """Connect `callback(service, value)` and start refreshing. Returns the handler id."""
+        handler_id = self.connect("changed", callback)
+        self._subscribers += 1
+        value = self.value
+        if self._subscribers == 1:
+            self._start()
+        # unless _start() already moved on and announced the new value
+        if value is not None and self.value is value:
+            GLib.idle_add(callback, self, value)
+        return handler_id
+
+    def unsubscribe(self, handler_id: int) -> None:
+        try:
+            self.disconnect(handler_id)
+        except Exception as e:
+            logger.warning(f"[{self.log_name}] failed to disconnect handler {handler_id}: {e}")
+        self._subscribers = max(0, self._subscribers - 1)
+        if not self._subscribers:
+            self._cancel_timers()
+
+    def stop(self) -> None:
+        """Stops refreshing for good, called once the last user has released the service"""
+        self._subscribers = 0
+        self._cancel_timers()
+
+    @abstractmethod
+    def _start(self) -> None:
+        """The first subscriber arrived"""
+
+    @abstractmethod
+    async def _fetch(self) -> None: ...
+
+    # timers
+    def _set_timer(self, seconds: float, callback) -> None:
+        """Run `callback()` once after `seconds`, replacing any pending timer"""
+        self._cancel_timer()
+
+        def on_timeout() -> bool:
+            self._timer_id = None
+            callback()
+            return False
+
+        self._timer_id = GLib.timeout_add(int(seconds * 1000), on_timeout)
+
+    def _cancel_timer(self) -> None:
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+
+    def _cancel_timers(self) -> None:
+        self._cancel_timer()
+        if self._retry_id is not None:
+            GLib.source_remove(self._retry_id)
+            self._retry_id = None
+
+    # fetching
+    def _start_fetch(self) -> None:
+        if self._fetching or self._retry_id is not None:
+            return
+        self._fetching = True
+        self.task_manager.run(self._fetch())
+
+    def _fetch_succeeded(self) -> None:
+        """Subclasses call this first thing when their fetch result arrives"""
+        self._fetching = False
+        self._failures = 0
+
+    def _on_failed(self, error: Exception) -> bool:
+        self._fetching = False
+        self._failures += 1
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._failures - 1))
+        logger.warning(f"[{self.log_name}] request failed ({self._failures} in a row), retrying in {delay}s: {error}")
+        if self._subscribers:
+            self._retry_id = GLib.timeout_add_seconds(delay, self._retry)
+        return False
+
+    def _retry(self) -> bool:
+        self._retry_id = None
+        self._start_fetch()
+        return False
+
+    # cache
+    @abstractmethod
+    def _cache_data(self) -> dict: ...
+
+    @abstractmethod
+    def _restore_cache(self, cache: dict) -> None: ...
+
+    def _load_cache(self) -> None:
+        try:
+            with open(self.cache_path) as h:
+                self._restore_cache(json.load(h))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_cache(self) -> None:
+        try:
+            write_atomic(self.cache_path, json.dumps(self._cache_data()), fsync=False)
+        except OSError as e:
+            logger.warning(f"[{self.log_name}] unable to write cache: {e}")
@@ -0,0 +1,220 @@
+"""
+Shared system metrics sampler.
+
+Every bar / control center widget used to run its own psutil loop. This service
+reads each metric at most once per its interval and hands the value out to every
+subscriber through a signal, so N widgets cost the same as one.
+"""
+
+import asyncio
+import time
+
+import psutil
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+from utils import async_task_manager
+
+
+# seconds between samples, per metric
+DEFAULT_INTERVALS: dict[str, int] = {
+    "cpu": 1,
+    "memory": 2,
+    "disk": 30,
+    "temperature": 2,
+    "battery": 5,
+    "uptime": 60,
+}
+
+
+def read_cpu() -> int:
+    return int(psutil.cpu_percent())
+
+
+def read_memory() -> dict[str, float]:
+    ram = psutil.virtual_memory()
+    return {
+        "percent": ram.percent / 100,
+        "used_gb": (ram.total - ram.available) / (1024**3),
+    }
+
+
+def read_disk(path: str = "/") -> dict[str, float]:
+    disk = psutil.disk_usage(path)
+    return {
+        "percent": disk.percent / 100,
+        "used_gb": disk.used / (1024**3),
+    }
+
+
+def read_temperature() -> int:
+    try:
+        return int(list(psutil.sensors_temperatures().items())[0][1][0].current)
+    except (IndexError, KeyError, AttributeError):
+        return 0
+
+
+def read_battery() -> dict[str, float | bool]:
+    if bat_sen := psutil.sensors_battery():
+        return {"percent": bat_sen.percent, "charging": bat_sen.power_plugged}
+    return {"percent": 100, "charging": True}
+
+
+def read_uptime() -> int:
+    return int(time.time() - psutil.boot_time())
+
+
+READERS = {
+    "cpu": read_cpu,
+    "memory": read_memory,
+    "disk": read_disk,
+    "temperature": read_temperature,
+    "battery": read_battery,
+    "uptime": read_uptime,
+}
+
+
+class SystemMetrics(Service):
+    """Samples CPU, memory, disk, temperature, battery and uptime on one timer.
+
+    Only metrics with at least one subscriber are read, and the timer is removed
+    entirely when nobody is subscribed.
+    """
+
+    @Signal
+    def cpu(self, value: object) -> None: ...
+
+    @Signal
+    def memory(self, value: object) -> None: ...
+
+    @Signal
+    def disk(self, value: object) -> None: ...
+
+    @Signal
+    def temperature(self, value: object) -> None: ...
+
+    @Signal
+    def battery(self, value: object) -> None: ...
+
+    @Signal
+    def uptime(self, value: object) -> None: ...
+
+    def __init__(self, intervals: dict[str, int] | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.task_manager = async_task_manager
+
+        self.intervals: dict[str, int] = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self._subscribers: dict[str, int] = {metric: 0 for metric in READERS}
+        self._next_due: dict[str, float] = {metric: 0.0 for metric in READERS}
+        self._last: dict[str, object] = {}
+
+        self._timer_id: int | None = None
+        # period the running timer was created with, in seconds
+        self._tick_interval: int = 0
+        self._kick_id: int | None = None
+        self._sampling: bool = False
+
+    def get(self, metric: str) -> object | None:
+        """Last sampled value for `metric`, or None if it hasn't been read yet."""
+        return self._last.get(metric)
+
+    def set_interval(self, metric: str, seconds: int) -> None:
+        self.intervals[metric] = max(1, int(seconds))
+        self._next_due[metric] = 0.0
+        # the tick has to follow the shortest interval, or a faster metric
+        # would still only be read at the old rate
+        if self._timer_id is not None and min(self.intervals.values()) != self._tick_interval:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+            self._ensure_timer()
+
+    def subscribe(self, metric: str, callback) -> int:
+        """Connect `callback(service, value)` to `metric` and start sampling it.
+
+        Returns the handler id, to be passed back to `unsubscribe`.
+        """
+        if metric not in READERS:
+            raise ValueError(f"unknown metric {metric}")
+
+        handler_id = self.connect(metric, callback)
+        self._subscribers[metric] += 1
+
+        if metric in self._last:
+            # late subscribers get the cached value instead of waiting a full interval
+            GLib.idle_add(callback, self, self._last[metric])
+        else:
+            self._next_due[metric] = 0.0
+
+        self._ensure_timer()
+        return handler_id
+
+    def unsubscribe(self, metric: str, handler_id: int) -> None:
+        try:
+            self.disconnect(handler_id)
+        except Exception as e:
+            logger.warning(f"[Metrics] failed to disconnect handler {handler_id}: {e}")
+        self._subscribers[metric] = max(0, self._subscribers[metric] - 1)
+
+        if not any(self._subscribers.values()) and self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+
+    def stop(self) -> None:
+        """Stops sampling for good, called once the last user has released the service"""
+        for source_id in (self._timer_id, self._kick_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._timer_id = self._kick_id = None
+
+    def _ensure_timer(self) -> None:
+        if self._timer_id is None:
+            self._tick_interval = min(self.intervals.values())
+            self._timer_id = GLib.timeout_add_seconds(self._tick_interval, self._on_tick)
+        # sample right away instead of waiting for the first tick. deferred to idle
+        # so that several subscribe() calls in a row end up in a single read
+        if self._kick_id is None:
+            self._kick_id = GLib.idle_add(self._kick)
+
+    def _kick(self) -> bool:
+        self._kick_id = None
+        self._on_tick()
+        return False
+
+    def _due_metrics(self) -> list[str]:
+        now = time.monotonic()
+        due = []
+        for metric, count in self._subscribers.items():
+            if count and now >= self._next_due[metric]:
+                due.append(metric)
+                self._next_due[metric] = now + self.intervals[metric]
+        return due
+
+    def _on_tick(self) -> bool:
+        if self._sampling:
+            return True
+        if due := self._due_metrics():
+            self._sampling = True
+            self.task_manager.run(self._sample(due))
+        return True
+
+    async def _sample(self, metrics: list[str]) -> None:
+        values = await asyncio.to_thread(self._read, metrics)
+        GLib.idle_add(self._publish, values)
+
+    def _read(self, metrics: list[str]) -> dict[str, object]:
+        values = {}
+        for metric in metrics:
+            try:
+                values[metric] = READERS[metric]()
+            except Exception as e:
+                logger.error(f"[Metrics] failed reading {metric}: {e}")
+        return values
+
+    def _publish(self, values: dict[str, object]) -> bool:
+        self._sampling = False
+        for metric, value in values.items():
+            self._last[metric] = value
+            self.emit(metric, value)
+        return False
@@ -0,0 +1,138 @@
+"""
+Quote of the day from a locally persisted pool.
+
+zenquotes hands out a batch of quotes per request. The whole batch is kept on
+disk and the service steps through it, one quote per rotation interval, so a
+request is only made when the pool is about to run out. With a cached pool
+nothing is requested at startup, and the current quote survives restarts. The
+last HISTORY_SIZE quotes shown are remembered, so a refill doesn't bring them
+back right away.
+"""
+
+import os
+import time
+
+from gi.repository import GLib
+from loguru import logger
+
+from services.http_service import CachedHttpService
+from utils.http import get_session
+
+ZENQUOTES_URL = "https://zenquotes.io/api/quotes"
+CACHE_PATH = os.path.join(GLib.get_user_cache_dir(), "goblin", "quotes.json")
+
+ROTATE_INTERVAL = 24 * 60 * 60
+# refill once this few unseen quotes are left
+LOW_WATER = 5
+HISTORY_SIZE = 200
+
+
+class QuoteService(CachedHttpService):
+    log_name = "Quotes"
+    retry_delay = 60
+    max_retry_delay = 6 * 60 * 60
+
+    def __init__(
+        self,
+        url: str = ZENQUOTES_URL,
+        rotate_interval: int = ROTATE_INTERVAL,
+        cache_path: str = CACHE_PATH,
+        **kwargs,
+    ):
+        super().__init__(url, cache_path, **kwargs)
+        self.rotate_interval = rotate_interval
+
+        self._pool: list[dict[str, str]] = []
+        # index into the pool of the quote being shown, -1 before the first one
+        self._index: int = -1
+        # wall clock time the current quote was first shown
+        self._shown_at: float = 0.0
+        # texts of the last HISTORY_SIZE quotes shown, oldest first
+        self._history: list[str] = []
+
+        self._load_cache()
+
+    @property
+    def value(self) -> dict[str, str] | None:
+        if 0 <= self._index < len(self._pool):
+            return self._pool[self._index]
+        return None
+
+    def next(self) -> None:
+        """Skip to the next quote now"""
+        self._shown_at = 0.0
+        self._rotate()
+
+    def _start(self) -> None:
+        # with a cached quote nothing is requested at startup, even if the pool
+        # is low, the next rotation refills it
+        self._rotate(refill=self.value is None)
+
+    def _rotate(self, refill: bool = True) -> None:
+        """Move on to the next quote if the current one has been up long enough"""
+        self._cancel_timer()
+        now = time.time()
+        if self.value is None or now - self._shown_at >= self.rotate_interval:
+            if self._index + 1 < len(self._pool):
+                self._index += 1
+                self._shown_at = now
+                self._history = [*self._history, self.value["quote"]][-HISTORY_SIZE:]
+                self._save_cache()
+                self.emit("changed", self.value)
+
+        if refill and len(self._pool) - self._index - 1 < LOW_WATER:
+            self._start_fetch()
+
+        if self._subscribers and self.value is not None:
+            if now - self._shown_at < self.rotate_interval:
+                self._set_timer(max(1.0, self._shown_at + self.rotate_interval - now), self._rotate)
+            elif not refill:
+                # overdue with nothing left to move on to, a rotation that may
+                # refill comes a little later instead of right at startup
+                self._set_timer(self.retry_delay, self._rotate)
+            # otherwise the pool ran dry and the refill rotates
+
+    async def _fetch(self) -> None:
+        try:
+            async with get_session().get(self.url) as response:
+                response.raise_for_status()
+                batch = [
+                    {"quote": item["q"].strip(), "author": item["a"].strip()}
+                    for item in await response.json(content_type=None)
+                ]
+        except Exception as e:
+            GLib.idle_add(self._on_failed, e)
+            return
+        GLib.idle_add(self._on_fetched, batch)
+
+    def _on_fetched(self, batch: list[dict[str, str]]) -> bool:
+        self._fetch_succeeded()
+        # quotes already shown aren't needed anymore
+        keep = self._pool[max(self._index, 0):]
+        queued = {item["quote"] for item in keep}
+        recent = queued | set(self._history)
+        new = [item for item in batch if item["quote"] not in recent]
+        if not new and len(keep) <= 1:
+            # everything in the batch was shown recently and nothing else is
+            # left to show, a repeat beats being stuck on one quote
+            new = [item for item in batch if item["quote"] not in queued]
+        # the batch may repeat itself too
+        new = list({item["quote"]: item for item in new}.values())
+        self._index = 0 if self._index >= 0 and keep else -1
+        self._pool = keep + new
+        logger.info(f"[Quotes] refilled pool with {len(new)} quotes, {len(self._pool)} total")
+        self._save_cache()
+
+        # nothing was showing yet (e.g. the first run), or the pool ran dry when it was time to move on
+        if self._subscribers and (self.value is None or time.time() - self._shown_at >= self.rotate_interval):
+            self._rotate()
+        return False
+
+    def _cache_data(self) -> dict:
+        return {"pool": self._pool, "index": self._index, "shown_at": self._shown_at, "history": self._history}
+
+    def _restore_cache(self, cache: dict) -> None:
+        self._pool = cache["pool"]
+        self._index = int(cache["index"])
+        self._shown_at = float(cache["shown_at"])
+        self._history = list(cache.get("history", []))[-HISTORY_SIZE:]
@@ -0,0 +1,163 @@
+"""
+Countdown timers, any number of them, by name.
+
+A running timer is just a deadline on the boot clock, which keeps counting
+through suspend and can't be moved by wall clock changes; the time left is
+always read off the clock instead of being counted down tick by tick. All the
+timers share one DeadlineScheduler, so the only wakeups are the expiries, and
+anything that displays a countdown drives its own refresh (see TimerWidget).
+
+Timers are persisted, so they keep running across shell restarts. The boot clock
+only means something within one boot, so a wall clock deadline is saved as well
+and used instead after a reboot.
+"""
+
+import json
+import os
+import time
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+from utils.scheduler import DeadlineScheduler, boottime
+from utils.store import get_store
+
+STATE_PATH = os.path.join(GLib.get_user_cache_dir(), "goblin", "timers.json")
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+def read_boot_id() -> str:
+    try:
+        with open(BOOT_ID_PATH) as h:
+            return h.read().strip()
+    except OSError:
+        return ""
+
+
+class TimerService(Service):
+    @Signal
+    def changed(self, name: str) -> None: ...
+
+    @Signal
+    def finished(self, name: str) -> None: ...
+
+    @Signal
+    def removed(self, name: str) -> None: ...
+
+    def __init__(self, state_path: str = STATE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.state_path = state_path
+        # name -> {"remaining": seconds left while paused, "deadline": boottime() deadline while running, else None}
+        self._timers: dict[str, dict] = {}
+        self._scheduler = DeadlineScheduler(self._on_expired, max_sleep=None, clock=boottime)
+        self._boot_id = read_boot_id()
+        self._load()
+
+    def names(self) -> list[str]:
+        return list(self._timers)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._timers
+
+    def is_running(self, name: str) -> bool:
+        return self._timers[name]["deadline"] is not None
+
+    def remaining(self, name: str) -> float:
+        timer = self._timers[name]
+        if timer["deadline"] is None:
+            return timer["remaining"]
+        return max(0.0, timer["deadline"] - boottime())
+
+    def create(self, name: str, seconds: float = 0) -> None:
+        if name not in self._timers:
+            self._timers[name] = {"remaining": max(0.0, seconds), "deadline": None}
+            self._changed(name)
+
+    def remove(self, name: str) -> None:
+        if self._timers.pop(name, None) is not None:
+            self._scheduler.remove(name)
+            self.emit("removed", name)
+            self._save()
+
+    def set(self, name: str, seconds: float) -> None:
+        timer = self._timers[name]
+        if timer["deadline"] is not None:
+            self._run(name, boottime() + seconds)
+        else:
+            timer["remaining"] = max(0.0, seconds)
+        self._changed(name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.set(name, self.remaining(name) + seconds)
+
+    def start(self, name: str) -> None:
+        timer = self._timers[name]
+        if timer["deadline"] is None and timer["remaining"] > 0:
+            self._run(name, boottime() + timer["remaining"])
+            self._changed(name)
+
+    def pause(self, name: str) -> None:
+        timer = self._timers[name]
+        if timer["deadline"] is not None:
+            timer["remaining"] = self.remaining(name)
+            timer["deadline"] = None
+            self._scheduler.remove(name)
+            self._changed(name)
+
+    def reset(self, name: str) -> None:
+        timer = self._timers[name]
+        timer["remaining"], timer["deadline"] = 0.0, None
+        self._scheduler.remove(name)
+        self._changed(name)
+
+    def _run(self, name: str, deadline: float) -> None:
+        self._timers[name]["deadline"] = deadline
+        self._scheduler.add(name, deadline)
+
+    def _on_expired(self, name: str) -> None:
+        timer = self._timers[name]
+        timer["remaining"], timer["deadline"] = 0.0, None
+        logger.info(f"[Timers] {name} finished")
+        self._changed(name)
+        self.emit("finished", name)
+
+    def _changed(self, name: str) -> None:
+        self.emit("changed", name)
+        self._save()
+
+    def _serialize(self) -> str:
+        now, wall_now = boottime(), time.time()
+        timers = {
+            name: {
+                "remaining": timer["remaining"],
+                "deadline": timer["deadline"],
+                "wall_deadline": wall_now + timer["deadline"] - now if timer["deadline"] is not None else None,
+            }
+            for name, timer in self._timers.items()
+        }
+        return json.dumps({"boot_id": self._boot_id, "timers": timers})
+
+    def _save(self) -> None:
+        get_store().write(self.state_path, self._serialize)
+
+    def _load(self) -> None:
+        try:
+            with open(self.state_path) as h:
+                state = json.load(h)
+            same_boot = bool(self._boot_id) and state["boot_id"] == self._boot_id
+            for name, saved in state["timers"].items():
+                self._timers[name] = {"remaining": float(saved["remaining"]), "deadline": None}
+                if saved["deadline"] is None:
+                    continue
+                if same_boot:
+                    deadline = float(saved["deadline"])
+                else:
+                    # rebooted since, the boot clock started over
+                    deadline = boottime() + float(saved["wall_deadline"]) - time.time()
+                # one that ran out while the shell was down still fires, right away
+                self._run(name, deadline)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"[Timers] unable to restore timers: {e}")
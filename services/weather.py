@@ -0,0 +1,131 @@
+"""
+Shared weather service.
+
+One request per refresh interval no matter how many Weather widgets exist, and
+none at all while nothing is subscribed. The last good response is kept on disk
+so widgets have something to show right at startup, and a cache younger than the
+interval isn't refetched. Requests are conditional when the server hands out an
+ETag/Last-Modified, and failures back off exponentially instead of hammering the
+server while offline.
+
+`url` and `cache_path` can be pointed at a local HTTP server and a temp file for
+testing.
+"""
+
+import os
+import time
+
+from gi.repository import GLib
+
+from services.http_service import CachedHttpService
+from utils.http import get_session
+
+WTTR_URL = "https://wttr.in/?format=j1"
+CACHE_PATH = os.path.join(GLib.get_user_cache_dir(), "goblin", "weather.json")
+
+DEFAULT_INTERVAL = 30 * 60
+MIN_INTERVAL = 60
+
+
+def parse_wttr(data: dict) -> dict[str, str]:
+    current = data["current_condition"][0]
+    return {
+        "code": current["weatherCode"],
+        "temp_C": current["temp_C"],
+        "desc": current["weatherDesc"][0]["value"],
+    }
+
+
+class WeatherService(CachedHttpService):
+    log_name = "Weather"
+    retry_delay = 30
+
+    def __init__(
+        self,
+        url: str = WTTR_URL,
+        interval: int = DEFAULT_INTERVAL,
+        cache_path: str = CACHE_PATH,
+        **kwargs,
+    ):
+        super().__init__(url, cache_path, **kwargs)
+        self.interval = max(MIN_INTERVAL, int(interval))
+
+        self._value: dict | None = None
+        # wall clock time of the last good response, it has to survive restarts
+        self._fetched_at: float = 0.0
+        self._validators: dict[str, str] = {}
+
+        self._load_cache()
+
+    @property
+    def value(self) -> dict | None:
+        """Last known weather, possibly stale, or None if there never was any"""
+        return self._value
+
+    def set_interval(self, seconds: int) -> None:
+        seconds = max(MIN_INTERVAL, int(seconds))
+        if seconds != self.interval:
+            self.interval = seconds
+            self._schedule()
+
+    def refresh(self) -> None:
+        """Fetch now, regardless of the cache age"""
+        self._cancel_timers()
+        self._start_fetch()
+
+    def _start(self) -> None:
+        self._schedule()
+
+    def _schedule(self) -> None:
+        # while a fetch or a retry is pending, its result schedules the next one
+        if not self._subscribers or self._fetching or self._retry_id is not None:
+            return
+        age = time.time() - self._fetched_at
+        self._set_timer(max(0.0, self.interval - age), self._start_fetch)
+
+    async def _fetch(self) -> None:
+        # validators only make sense with the body they belong to, without a
+        # cached value a 304 would leave nothing to show
+        cached, validators = self._value, self._validators
+        headers = {}
+        if cached is not None:
+            if etag := validators.get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := validators.get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            async with get_session().get(self.url, headers=headers) as response:
+                if response.status == 304 and cached is not None:
+                    GLib.idle_add(self._on_fetched, cached, validators)
+                    return
+                response.raise_for_status()
+                value = parse_wttr(await response.json(content_type=None))
+                validators = {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                }
+        except Exception as e:
+            GLib.idle_add(self._on_failed, e)
+            return
+        GLib.idle_add(self._on_fetched, value, validators)
+
+    def _on_fetched(self, value: dict, validators: dict[str, str]) -> bool:
+        self._fetch_succeeded()
+        self._fetched_at = time.time()
+        self._validators = validators
+        changed = value != self._value
+        self._value = value
+        self._save_cache()
+        if changed:
+            self.emit("changed", value)
+        self._schedule()
+        return False
+
+    def _cache_data(self) -> dict:
+        return {"value": self._value, "fetched_at": self._fetched_at, "validators": self._validators}
+
+    def _restore_cache(self, cache: dict) -> None:
+        self._value = cache["value"]
+        self._fetched_at = float(cache["fetched_at"])
+        self._validators = cache.get("validators", {})
@@ -0,0 +1,100 @@
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TESTS_DIR)
+sys.path[:0] = [TESTS_DIR, ROOT]
+
+# everything that writes to the user's dirs goes here instead, set before any
+# module computes its paths
+HOME = tempfile.mkdtemp(prefix="goblin-tests-")
+os.environ["HOME"] = HOME
+os.environ["XDG_CACHE_HOME"] = os.path.join(HOME, ".cache")
+
+import fakes  # noqa: E402
+
+fakes.install(HOME)
+
+
+@pytest.fixture(autouse=True)
+def loop():
+    fakes.loop.reset()
+    yield fakes.loop
+
+
+class StandInServer:
+    """Local HTTP server for the services that normally talk to the internet.
+
+    `routes` maps a path to the responses to give, (status, headers, body) each;
+    they're handed out in order and the last one repeats. `requests` records
+    (path, headers) of everything asked.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, list[tuple[int, dict[str, str], bytes]]] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                responses = server.routes.get(self.path) or [(404, {}, b"")]
+                status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def reply(self, path: str, *responses) -> None:
+        """`reply("/x", (200, {}, b"..."), ...)`, a dict or list body is sent as JSON"""
+        self.routes[path] = [
+            (status, headers, json.dumps(body).encode() if isinstance(body, (dict, list)) else body)
+            for status, headers, body in responses
+        ]
+
+    def paths(self) -> list[str]:
+        return [path for path, _ in self.requests]
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    # the services go through the real aiohttp on async_task_manager's loop
+    aiohttp = pytest.importorskip("aiohttp")
+    if isinstance(aiohttp, fakes.FakeModule):
+        pytest.skip("aiohttp isn't installed")
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def close_http_session():
+    yield
+    http = sys.modules.get("utils.http")
+    if http is not None and http._session is not None and not http._session.closed:
+        from utils import async_task_manager
+
+        async_task_manager.run(http._session.close()).result(timeout=5)
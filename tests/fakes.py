@@ -0,0 +1,466 @@
+"""
+Stand-ins for gi, fabric and the other desktop-only dependencies, so the shell's
+modules can be imported and driven without a display or a session bus.
+
+Widgets are permissive: any attribute or method they don't implement is a no-op.
+What they do implement is the part the tests rely on: signals, parenting, and
+GTK's map semantics, where showing a toplevel maps it and its visible
+descendants synchronously. GLib's main loop is replaced by `loop`, which only
+runs idle callbacks, timeouts and frame ticks when a test asks it to.
+
+`install()` has to run before anything from the repo is imported.
+"""
+
+import heapq
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import itertools
+import os
+import select
+import sys
+import threading
+import time
+import types
+
+
+class MainLoop:
+    """GLib sources on a virtual clock. Idle callbacks may be added from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.now: float = 0.0
+            self._idle: list[tuple[int, object, tuple]] = []
+            # (due, id, interval, callback, args)
+            self._timers: list[tuple[float, int, float, object, tuple]] = []
+            self._ticks: dict[int, tuple[object, object]] = {}
+            self._watches: dict[int, tuple[int, object]] = {}
+            self._removed: set[int] = set()
+
+    # GLib
+    def idle_add(self, callback, *args, priority=None) -> int:
+        with self._lock:
+            source_id = next(self._ids)
+            self._idle.append((source_id, callback, args))
+        return source_id
+
+    def timeout_add(self, interval_ms, callback, *args, priority=None) -> int:
+        with self._lock:
+            source_id = next(self._ids)
+            interval = interval_ms / 1000
+            heapq.heappush(self._timers, (self.now + interval, source_id, interval, callback, args))
+        return source_id
+
+    def timeout_add_seconds(self, interval, callback, *args, priority=None) -> int:
+        return self.timeout_add(interval * 1000, callback, *args)
+
+    def source_remove(self, source_id: int) -> bool:
+        with self._lock:
+            self._removed.add(source_id)
+            self._ticks.pop(source_id, None)
+            self._watches.pop(source_id, None)
+        return True
+
+    def get_monotonic_time(self) -> int:
+        return int(self.now * 1_000_000)
+
+    def add_tick_callback(self, widget, callback) -> int:
+        with self._lock:
+            source_id = next(self._ids)
+            self._ticks[source_id] = (widget, callback)
+        return source_id
+
+    def io_add_watch(self, fd, priority, condition, callback) -> int:
+        with self._lock:
+            source_id = next(self._ids)
+            self._watches[source_id] = (fd, callback)
+        return source_id
+
+    # driving it
+    @property
+    def pending_timeouts(self) -> list[float]:
+        """Seconds until each pending timeout, soonest first"""
+        with self._lock:
+            return sorted(due - self.now for due, source_id, *_ in self._timers if source_id not in self._removed)
+
+    def run_idle(self, limit: int = 10_000) -> int:
+        """Runs idle callbacks until none are left, returns how many ran"""
+        ran = 0
+        while ran < limit:
+            with self._lock:
+                if not self._idle:
+                    return ran
+                source_id, callback, args = self._idle.pop(0)
+                if source_id in self._removed:
+                    continue
+            ran += 1
+            if callback(*args):
+                with self._lock:
+                    self._idle.append((source_id, callback, args))
+        raise RuntimeError("idle callbacks keep rescheduling themselves")
+
+    def advance(self, seconds: float) -> None:
+        """Moves the clock forward, firing the timeouts that come due on the way"""
+        target = self.now + seconds
+        while True:
+            self.run_idle()
+            with self._lock:
+                while self._timers and self._timers[0][1] in self._removed:
+                    heapq.heappop(self._timers)
+                if not self._timers or self._timers[0][0] > target:
+                    break
+                due, source_id, interval, callback, args = heapq.heappop(self._timers)
+                self.now = max(self.now, due)
+            if callback(*args):
+                with self._lock:
+                    heapq.heappush(self._timers, (self.now + interval, source_id, interval, callback, args))
+        self.now = target
+        self.run_idle()
+
+    def frame(self) -> int:
+        """One frame of every widget's frame clock, returns how many tick callbacks ran"""
+        with self._lock:
+            ticks = list(self._ticks.items())
+        for source_id, (widget, callback) in ticks:
+            if not callback(widget, None):
+                self.source_remove(source_id)
+        return len(ticks)
+
+    def poll_io(self, timeout: float = 1.0) -> int:
+        """Waits for watched fds to become readable and runs their callbacks, returns how many ran"""
+        with self._lock:
+            watches = dict(self._watches)
+        if not watches:
+            return 0
+        readable, _, _ = select.select({fd for fd, _ in watches.values()}, [], [], timeout)
+        ran = 0
+        for source_id, (fd, callback) in watches.items():
+            if fd in readable and source_id in self._watches:
+                ran += 1
+                if not callback(fd, IO_IN):
+                    self.source_remove(source_id)
+        return ran
+
+    def wait_for(self, predicate, timeout: float = 5.0) -> None:
+        """Runs idle callbacks in real time until `predicate()`, for work done on other threads"""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise TimeoutError("condition not met in time")
+            self.run_idle()
+            time.sleep(0.005)
+        self.run_idle()
+
+
+# GIOCondition
+IO_IN, IO_PRI, IO_OUT, IO_ERR, IO_HUP = 1, 2, 4, 8, 16
+
+loop = MainLoop()
+
+
+class _Any:
+    """Stands in for any GTK/GLib value or call result nobody looks at"""
+
+    def __init__(self, *args, **kwargs): ...
+    def __call__(self, *args, **kwargs): return _Any()
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Any()
+    def __iter__(self): return iter(())
+    def __bool__(self): return False
+    def __int__(self): return 0
+    def __float__(self): return 0.0
+    def __index__(self): return 0
+    def __or__(self, other): return self
+    __ror__ = __and__ = __rand__ = __or__
+    def __getitem__(self, key): return _Any()
+    def __mro_entries__(self, bases): return (Widget,)
+
+
+class _Meta(type):
+    """Classes whose unknown CamelCase attributes are widget classes, anything else is _Any"""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name[:1].isupper() and name.isalpha() and not name.isupper():
+            sub = _Meta(name, (Widget,), {})
+            setattr(cls, name, sub)
+            return sub
+        return _Any()
+
+
+class Widget(metaclass=_Meta):
+    """Any GObject: signals, children, and the map semantics of a GTK widget"""
+
+    __gsignals__ = {}
+
+    def __init__(self, *args, children=None, start_children=None, center_children=None,
+                 end_children=None, child=None, **kwargs):
+        self._fk_handlers: dict[str, dict[int, tuple]] = {}
+        self._fk_ids = itertools.count(1)
+        self._fk_children: list = []
+        self._fk_visible = False
+        self._fk_mapped = False
+        self._fk_parent = None
+        for group in (children, start_children, center_children, end_children, child):
+            if group is None:
+                continue
+            for widget in group if isinstance(group, (list, tuple)) else [group]:
+                self.add(widget)
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name.startswith("_fk_"):
+            raise AttributeError(name)
+        return _Any()
+
+    # signals
+    def connect(self, signal: str, callback, *args) -> int:
+        handler_id = next(self._fk_ids)
+        self._fk_handlers.setdefault(signal, {})[handler_id] = (callback, args)
+        return handler_id
+
+    def disconnect(self, handler_id: int) -> None:
+        for handlers in self._fk_handlers.values():
+            if handlers.pop(handler_id, None) is not None:
+                return
+        raise ValueError(f"no handler {handler_id}")
+
+    def handler_count(self, signal: str) -> int:
+        return len(self._fk_handlers.get(signal, {}))
+
+    def emit(self, signal: str, *values) -> None:
+        for callback, args in list(self._fk_handlers.get(signal, {}).values()):
+            callback(self, *values, *args)
+
+    # children
+    def add(self, widget) -> None:
+        if isinstance(widget, Widget):
+            self._fk_children.append(widget)
+            widget._fk_parent = self
+
+    def pack_start(self, widget, *args) -> None:
+        self.add(widget)
+
+    pack_end = pack_start
+
+    def append_page(self, widget, *args) -> None:
+        self.add(widget)
+
+    def attach(self, widget, *args) -> None:
+        self.add(widget)
+
+    def remove(self, widget) -> None:
+        if widget in self._fk_children:
+            self._fk_children.remove(widget)
+            widget._fk_parent = None
+
+    def get_n_pages(self) -> int:
+        return len(self._fk_children)
+
+    def get_children(self) -> list:
+        return list(self._fk_children)
+
+    def get_child(self):
+        return self._fk_children[0] if self._fk_children else None
+
+    # visibility
+    def get_mapped(self) -> bool:
+        return self._fk_mapped
+
+    def is_visible(self) -> bool:
+        return self._fk_visible
+
+    get_visible = is_visible
+
+    def show(self) -> None:
+        self._fk_visible = True
+        if isinstance(self, Window) or (self._fk_parent is not None and self._fk_parent._fk_mapped):
+            self._fk_map()
+
+    def show_all(self) -> None:
+        for widget in self._fk_children:
+            widget.show_all()
+        self.show()
+
+    def hide(self) -> None:
+        self._fk_visible = False
+        self._fk_unmap()
+
+    def set_visible(self, visible: bool) -> None:
+        self.show() if visible else self.hide()
+
+    def destroy(self) -> None:
+        self.emit("destroy")
+
+    def _fk_map(self) -> None:
+        if self._fk_mapped:
+            return
+        self._fk_mapped = True
+        # a notebook only maps its current page
+        children = self._fk_children[:1] if type(self).__name__ == "Notebook" else self._fk_children
+        for widget in children:
+            if widget._fk_visible:
+                widget._fk_map()
+        self.emit("map")
+
+    def _fk_unmap(self) -> None:
+        if not self._fk_mapped:
+            return
+        self._fk_mapped = False
+        for widget in self._fk_children:
+            widget._fk_unmap()
+        self.emit("unmap")
+
+    # frame clock
+    def add_tick_callback(self, callback) -> int:
+        return loop.add_tick_callback(self, callback)
+
+    def remove_tick_callback(self, tick_id: int) -> None:
+        loop.source_remove(tick_id)
+
+
+class Window(Widget):
+    pass
+
+
+def Signal(func=None, *args, **kwargs):
+    return func if callable(func) else (lambda f: f)
+
+
+def Property(*args, **kwargs):
+    return lambda func: property(func)
+
+
+class GLibError(Exception):
+    def __init__(self, message: str = ""):
+        super().__init__(message)
+        self.message = message
+
+
+class Variant:
+    """GLib.Variant without type checking, `unpack()` unpacks nested variants like the real one"""
+
+    def __init__(self, signature: str, value):
+        self.signature = signature
+        self.value = value
+
+    def unpack(self):
+        return _unpack(self.value)
+
+    def __repr__(self):
+        return f"Variant({self.signature!r}, {self.value!r})"
+
+
+def _unpack(value):
+    if isinstance(value, Variant):
+        return value.unpack()
+    if isinstance(value, dict):
+        return {key: _unpack(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unpack(item) for item in value)
+    return value
+
+
+def _glib(home: str):
+    class GLib(metaclass=_Meta):
+        Error = GLibError
+        Variant = Variant
+        SOURCE_REMOVE = False
+        SOURCE_CONTINUE = True
+        PRIORITY_DEFAULT = 0
+        PRIORITY_DEFAULT_IDLE = 200
+        PRIORITY_LOW = 300
+        IO_IN, IO_PRI, IO_OUT, IO_ERR, IO_HUP = IO_IN, IO_PRI, IO_OUT, IO_ERR, IO_HUP
+        idle_add = staticmethod(loop.idle_add)
+        timeout_add = staticmethod(loop.timeout_add)
+        timeout_add_seconds = staticmethod(loop.timeout_add_seconds)
+        source_remove = staticmethod(loop.source_remove)
+        io_add_watch = staticmethod(loop.io_add_watch)
+        get_monotonic_time = staticmethod(loop.get_monotonic_time)
+        get_user_cache_dir = staticmethod(lambda: os.path.join(home, ".cache"))
+        get_user_config_dir = staticmethod(lambda: os.path.join(home, ".config"))
+        get_user_data_dir = staticmethod(lambda: os.path.join(home, ".local", "share"))
+        get_home_dir = staticmethod(lambda: home)
+
+    return GLib
+
+
+class GObject(metaclass=_Meta):
+    Object = Widget
+
+
+class FakeModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name in ("Window", "WaylandWindow", "ApplicationWindow"):
+            return Window
+        if name == "Signal":
+            return Signal
+        if name == "Property":
+            return Property
+        if name[:1].isupper():
+            cls = _Meta(name, (Widget,), {})
+            setattr(self, name, cls)
+            return cls
+        return _Any()
+
+
+# always faked, they need a display, a compositor or system typelibs
+FAKED = {"gi", "fabric", "setproctitle", "cairo", "i3ipc", "watchdog", "PIL", "dbus", "markdown"}
+# faked only when they aren't installed, the real ones work headless
+FAKED_IF_MISSING = {"loguru", "psutil", "aiohttp", "requests", "yaml"}
+
+
+def _get_relative_path(path: str) -> str:
+    # relative to the calling module, like fabric's
+    caller = sys._getframe(1).f_globals["__file__"]
+    return os.path.join(os.path.dirname(os.path.abspath(caller)), path)
+
+
+class _Finder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def __init__(self, home: str):
+        self.home = home
+        self.faked = FAKED | {name for name in FAKED_IF_MISSING if importlib.util.find_spec(name) is None}
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.split(".")[0] in self.faked:
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        module = FakeModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        match module.__name__:
+            case "gi":
+                module.require_version = lambda *args: None
+            case "gi.repository":
+                module.GLib = _glib(self.home)
+                module.GObject = GObject
+            case "gi.repository.GLib":
+                for name, value in vars(sys.modules["gi.repository"].GLib).items():
+                    if not name.startswith("__"):
+                        setattr(module, name, value.__func__ if isinstance(value, staticmethod) else value)
+            case "fabric.utils":
+                module.get_relative_path = _get_relative_path
+            case "loguru":
+                module.logger = types.SimpleNamespace(
+                    **{level: (lambda *args, **kwargs: None)
+                       for level in ("trace", "debug", "info", "success", "warning", "error", "exception")}
+                )
+
+
+def install(home: str) -> None:
+    """Fakes the desktop modules and points GLib's user dirs at `home`"""
+    if not any(isinstance(finder, _Finder) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _Finder(home))
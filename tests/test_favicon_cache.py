@@ -0,0 +1,72 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from utils import async_task_manager
+from utils.favicon_cache import FaviconCache
+
+ICON = b"\x00\x00\x01\x00 not really an icon"
+
+
+def get(cache: FaviconCache, url: str):
+    return async_task_manager.run(cache.get(url)).result(timeout=5)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "favicons")
+
+
+def test_cached_in_memory_and_on_disk(http_server, cache_dir):
+    http_server.reply("/favicon.ico", (200, {}, ICON))
+    cache = FaviconCache(cache_dir)
+
+    assert get(cache, http_server.url("/some/page")) == ICON
+    assert get(cache, http_server.url("/other/page")) == ICON
+    # a restart finds it on disk
+    assert get(FaviconCache(cache_dir), http_server.url("/")) == ICON
+    assert http_server.paths() == ["/favicon.ico"]
+
+
+def test_concurrent_gets_share_one_request(http_server, cache_dir):
+    http_server.reply("/favicon.ico", (200, {}, ICON))
+    cache = FaviconCache(cache_dir)
+
+    async def get_many():
+        return await asyncio.gather(*(cache.get(http_server.url(f"/{i}")) for i in range(10)))
+
+    assert async_task_manager.run(get_many()).result(timeout=5) == [ICON] * 10
+    assert len(http_server.requests) == 1
+
+
+def test_missing_favicon_is_remembered(http_server, cache_dir):
+    http_server.reply("/favicon.ico", (404, {}, b"not found"))
+
+    assert get(FaviconCache(cache_dir), http_server.url("/")) is None
+    assert get(FaviconCache(cache_dir), http_server.url("/")) is None
+    assert len(http_server.requests) == 1
+
+
+def test_server_errors_are_not_cached(http_server, cache_dir):
+    http_server.reply("/favicon.ico", (503, {}, b""), (200, {}, ICON))
+    cache = FaviconCache(cache_dir)
+
+    assert get(cache, http_server.url("/")) is None
+    assert get(cache, http_server.url("/")) == ICON
+    assert len(http_server.requests) == 2
+
+
+def test_expired_icon_is_refetched_and_kept_on_failure(http_server, cache_dir):
+    http_server.reply("/favicon.ico", (200, {}, ICON))
+    assert get(FaviconCache(cache_dir, ttl=60), http_server.url("/")) == ICON
+
+    # a week later the server is having trouble
+    for name in os.listdir(cache_dir):
+        past = time.time() - 7 * 24 * 60 * 60
+        os.utime(os.path.join(cache_dir, name), (past, past))
+    http_server.reply("/favicon.ico", (500, {}, b""))
+
+    assert get(FaviconCache(cache_dir, ttl=60), http_server.url("/")) == ICON
+    assert len(http_server.requests) == 2
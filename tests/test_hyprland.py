@@ -0,0 +1,164 @@
+"""
+HyprlandIPC and MonitorCache against a fake compositor listening on real unix
+sockets, so timeouts and partial event lines behave like they do for real.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from utils.hyprland import HyprlandIPC
+from utils.monitors import MonitorCache
+
+
+class FakeHyprland:
+    """Serves `.socket.sock` from `replies` (command -> bytes, None to never answer)
+    and accepts `.socket2.sock` connections for the test to write events to."""
+
+    def __init__(self, socket_dir: str):
+        self.socket_dir = socket_dir
+        self.replies: dict[str, bytes | None] = {}
+        self.requests: list[str] = []
+        self._stalled: list[socket.socket] = []
+
+        self._requests = self._listen(".socket.sock")
+        self._requests.settimeout(0.05)
+        self._events = self._listen(".socket2.sock")
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _listen(self, name: str) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(os.path.join(self.socket_dir, name))
+        sock.listen()
+        return sock
+
+    def _serve(self) -> None:
+        while self._running:
+            try:
+                conn, _ = self._requests.accept()
+            except (TimeoutError, OSError):
+                continue
+            command = conn.recv(8192).decode()
+            self.requests.append(command)
+            if (reply := self.replies.get(command)) is None:
+                self._stalled.append(conn)
+                continue
+            conn.sendall(reply)
+            conn.close()
+
+    def accept_events(self) -> socket.socket:
+        self._events.settimeout(1)
+        conn, _ = self._events.accept()
+        return conn
+
+    def close(self) -> None:
+        self._running = False
+        self._thread.join()
+        for sock in (self._requests, self._events, *self._stalled):
+            sock.close()
+
+
+@pytest.fixture
+def hyprland():
+    # unix socket paths are limited to ~100 bytes, pytest's tmp_path can be longer
+    socket_dir = tempfile.mkdtemp(prefix="hypr-")
+    server = FakeHyprland(socket_dir)
+    yield server
+    server.close()
+    shutil.rmtree(socket_dir)
+
+
+@pytest.fixture
+def ipc(hyprland):
+    ipc = HyprlandIPC(socket_dir=hyprland.socket_dir, request_timeout=0.2)
+    yield ipc
+    ipc._disconnect_events()
+
+
+def test_request(hyprland, ipc):
+    hyprland.replies["version"] = b"Hyprland 0.45"
+    hyprland.replies["j/monitors"] = json.dumps([{"id": 0, "name": "DP-1"}]).encode()
+
+    assert ipc.request("version") == b"Hyprland 0.45"
+    assert ipc.request_json("monitors") == [{"id": 0, "name": "DP-1"}]
+    assert hyprland.requests == ["version", "j/monitors"]
+
+
+def test_request_times_out(hyprland, ipc):
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        ipc.request("version")
+    assert time.monotonic() - start < 1
+
+
+def test_request_without_hyprland(monkeypatch):
+    monkeypatch.delenv("HYPRLAND_INSTANCE_SIGNATURE", raising=False)
+    ipc = HyprlandIPC()
+    assert not ipc.available
+    with pytest.raises(RuntimeError):
+        ipc.request("version")
+
+
+def test_events(hyprland, ipc, loop):
+    events = []
+    ipc.subscribe(lambda name, data: events.append((name, data)))
+    conn = hyprland.accept_events()
+
+    # lines can be split across reads
+    conn.sendall(b"workspace>>2\nfocusedmon>>DP-1,3\nopenwindow>>80a6f50,2,")
+    assert loop.poll_io() == 1
+    assert events == [("workspace", "2"), ("focusedmon", "DP-1,3")]
+    conn.sendall(b"kitty,kitty\n")
+    loop.poll_io()
+    assert events[-1] == ("openwindow", "80a6f50,2,kitty,kitty")
+
+    conn.close()
+    loop.poll_io()
+    assert events[-1] == ("disconnected", "")
+    # and it tries again later
+    assert loop.pending_timeouts == [ipc.reconnect_interval]
+    loop.advance(ipc.reconnect_interval)
+    hyprland.accept_events().close()
+
+
+def test_monitor_cache(hyprland, ipc, loop):
+    hyprland.replies["j/activeworkspace"] = json.dumps({"id": 1, "monitor": "DP-1"}).encode()
+    cache = MonitorCache(ipc)
+    assert cache.active_monitor == "DP-1"
+    conn = hyprland.accept_events()
+
+    # answered from the cache until an event says otherwise
+    assert cache.active_monitor == "DP-1"
+    assert hyprland.requests == ["j/activeworkspace"]
+    conn.sendall(b"focusedmon>>HDMI-A-1,4\n")
+    loop.poll_io()
+    assert cache.active_monitor == "HDMI-A-1"
+    assert len(hyprland.requests) == 1
+
+    # Hyprland stops answering: the last known monitor, after one timeout
+    hyprland.replies["j/activeworkspace"] = None
+    conn.sendall(b"workspace>>5\n")
+    loop.poll_io()
+    start = time.monotonic()
+    assert cache.active_monitor == "HDMI-A-1"
+    assert time.monotonic() - start < 1
+    conn.close()
+
+
+def test_monitor_list_falls_back_on_timeout(hyprland, ipc, monkeypatch):
+    from utils import monitors
+
+    monkeypatch.setattr(monitors, "get_hyprland_ipc", lambda: ipc)
+    hyprland.replies["j/monitors"] = json.dumps([{"id": 0, "name": "DP-1"}, {"id": 1, "name": "HDMI-A-1"}]).encode()
+    assert monitors.get_all_monitors() == {0: "DP-1", 1: "HDMI-A-1"}
+
+    hyprland.replies["j/monitors"] = None
+    assert monitors.get_all_monitors() == {0: "DP-1", 1: "HDMI-A-1"}
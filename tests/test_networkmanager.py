@@ -0,0 +1,269 @@
+"""
+NetworkManagerWifiBackend against a mock NetworkManager, faked at the
+Gio.DBusProxy level: objects are (path, interface) -> properties, and method
+calls are answered and recorded by MockNM.
+"""
+
+import types
+
+import pytest
+
+import fakes
+from fakes import Variant
+from utils import networkmanager as nm
+from utils.networkmanager import NetworkManagerWifiBackend
+
+DEVICE = "/org/freedesktop/NetworkManager/Devices/3"
+PSK, SAE, OWE, EAP = 0x100, 0x400, 0x800, 0x200
+
+
+class MockNM:
+    def __init__(self):
+        self.objects: dict[tuple[str, str], dict] = {}
+        self.proxies: dict[tuple[str, str], "Proxy"] = {}
+        self.saved: dict[str, dict] = {}
+        self.calls: list[tuple[str, str, tuple]] = []
+
+        self.set(nm.NM_PATH, nm.NM_IFACE, WirelessEnabled=True, ActiveConnections=[])
+        self.set("/org/freedesktop/NetworkManager/Devices/1", nm.NM_DEVICE_IFACE, DeviceType=1, Interface="enp3s0")
+        self.set(DEVICE, nm.NM_DEVICE_IFACE, DeviceType=nm.NM_DEVICE_TYPE_WIFI, Interface="wlan0")
+        self.set(DEVICE, nm.NM_WIRELESS_IFACE, AccessPoints=[], ActiveAccessPoint="/")
+
+    def set(self, path: str, iface: str, **properties) -> None:
+        self.objects.setdefault((path, iface), {}).update(properties)
+
+    def add_ap(self, number: int, ssid: bytes, strength: int = 50, flags: int = 0, wpa: int = 0, rsn: int = 0) -> str:
+        path = f"/org/freedesktop/NetworkManager/AccessPoint/{number}"
+        self.set(path, nm.NM_AP_IFACE, Ssid=ssid, Strength=strength, Flags=flags, WpaFlags=wpa, RsnFlags=rsn)
+        self.objects[(DEVICE, nm.NM_WIRELESS_IFACE)]["AccessPoints"].append(path)
+        return path
+
+    def save(self, number: int, ssid: bytes) -> str:
+        path = f"{nm.NM_SETTINGS_PATH}/{number}"
+        self.saved[path] = {"connection": {"id": ssid.decode()}, nm.NM_WIRELESS_TYPE: {"ssid": ssid}}
+        return path
+
+    def called(self, method: str) -> list[tuple]:
+        return [args for _, name, args in self.calls if name == method]
+
+    def call(self, path: str, method: str, args: tuple) -> tuple:
+        self.calls.append((path, method, args))
+        match method:
+            case "GetDevices":
+                return ([p for p, iface in self.objects if iface == nm.NM_DEVICE_IFACE],)
+            case "ListConnections":
+                return (list(self.saved),)
+            case "GetSettings":
+                return (self.saved[path],)
+            case "Delete":
+                del self.saved[path]
+            case "ActivateConnection":
+                return ("/org/freedesktop/NetworkManager/ActiveConnection/1",)
+            case "AddAndActivateConnection2":
+                return (f"{nm.NM_SETTINGS_PATH}/99", "/org/freedesktop/NetworkManager/ActiveConnection/2", {})
+        return ()
+
+    def gio(self):
+        mock = self
+
+        def new_sync(bus, flags, info, name, path, iface, cancellable):
+            return mock.proxy(path, iface)
+
+        def new(bus, flags, info, name, path, iface, cancellable, callback):
+            fakes.loop.idle_add(callback, None, mock.proxy(path, iface))
+
+        return types.SimpleNamespace(
+            BusType=types.SimpleNamespace(SYSTEM=0, SESSION=1),
+            DBusProxyFlags=types.SimpleNamespace(NONE=0),
+            DBusCallFlags=types.SimpleNamespace(NONE=0),
+            bus_get_sync=lambda *args: None,
+            DBusProxy=types.SimpleNamespace(new_sync=new_sync, new=new, new_finish=lambda result: result),
+        )
+
+    def proxy(self, path: str, iface: str) -> "Proxy":
+        if (path, iface) not in self.proxies:
+            self.proxies[(path, iface)] = Proxy(self, path, iface)
+        return self.proxies[(path, iface)]
+
+
+class Proxy(fakes.Widget):
+    def __init__(self, mock: MockNM, path: str, iface: str):
+        super().__init__()
+        self.mock, self.path, self.iface = mock, path, iface
+
+    def get_name_owner(self) -> str:
+        return ":1.4"
+
+    def get_object_path(self) -> str:
+        return self.path
+
+    def get_cached_property(self, name: str) -> Variant | None:
+        properties = self.mock.objects.get((self.path, self.iface), {})
+        return Variant("v", properties[name]) if name in properties else None
+
+    def call_sync(self, method, params, flags, timeout, cancellable) -> Variant:
+        args = params.unpack() if params is not None else ()
+        return Variant("r", self.mock.call(self.path, method, args))
+
+
+@pytest.fixture
+def mock_nm(monkeypatch):
+    mock = MockNM()
+    monkeypatch.setattr(nm, "Gio", mock.gio())
+    return mock
+
+
+@pytest.fixture
+def make_backend(mock_nm, loop):
+    def make():
+        backend = NetworkManagerWifiBackend()
+        # access point and active connection proxies are created asynchronously
+        loop.run_idle()
+        return backend
+
+    return make
+
+
+@pytest.mark.parametrize(
+    ("flags", "wpa", "rsn", "expected"),
+    [
+        (0, 0, 0, ""),
+        (nm.NM_802_11_AP_FLAGS_PRIVACY, 0, 0, "none"),
+        (1, PSK, 0, "wpa-psk"),
+        (1, 0, PSK, "wpa-psk"),
+        (1, 0, SAE, "sae"),
+        # WPA3 transition networks take either
+        (1, 0, PSK | SAE, "wpa-psk"),
+        (0, 0, OWE, "owe"),
+        (1, 0, EAP, None),
+    ],
+)
+def test_key_mgmt(mock_nm, flags, wpa, rsn, expected):
+    mock_nm.add_ap(1, b"net", flags=flags, wpa=wpa, rsn=rsn)
+    ap = mock_nm.proxy("/org/freedesktop/NetworkManager/AccessPoint/1", nm.NM_AP_IFACE)
+    assert NetworkManagerWifiBackend._key_mgmt(ap) == expected
+
+
+def test_networks_from_cached_properties(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"home", strength=40, flags=1, rsn=PSK)
+    mock_nm.add_ap(2, b"home", strength=80, flags=1, rsn=PSK)
+    mock_nm.add_ap(3, b"cafe", strength=90)
+    in_use = mock_nm.add_ap(4, b"work", strength=20, flags=1, wpa=PSK)
+    mock_nm.add_ap(5, b"")
+    mock_nm.set(DEVICE, nm.NM_WIRELESS_IFACE, ActiveAccessPoint=in_use)
+    wifi = make_backend()
+
+    assert wifi.get_wifi_networks() == [
+        {"in_use": True, "ssid": "work", "signal": "20", "security": "WPA1"},
+        {"in_use": False, "ssid": "cafe", "signal": "90", "security": "none"},
+        # strongest BSSID only
+        {"in_use": False, "ssid": "home", "signal": "80", "security": "WPA2"},
+    ]
+    assert wifi.fetch_currently_connected_ssid() == "work"
+    assert wifi.get_wifi_status()
+    # nothing was asked over the bus but the device list
+    assert [method for _, method, _ in mock_nm.calls] == ["GetDevices"]
+
+
+def test_signals_update_state(mock_nm, make_backend, loop):
+    removed = mock_nm.add_ap(1, b"home", rsn=PSK)
+    wifi = make_backend()
+    events = []
+    for signal in ("enabled-changed", "access-points-changed", "active-connection-changed"):
+        wifi.connect(signal, lambda _, *args, signal=signal: events.append((signal, *args)))
+
+    nm_proxy = mock_nm.proxy(nm.NM_PATH, nm.NM_IFACE)
+    nm_proxy.emit("g-properties-changed", Variant("a{sv}", {"WirelessEnabled": Variant("b", False)}), [])
+    assert events == [("enabled-changed", False)]
+
+    wireless = mock_nm.proxy(DEVICE, nm.NM_WIRELESS_IFACE)
+    wireless.emit("g-signal", ":1.4", "AccessPointRemoved", Variant("(o)", (removed,)))
+    assert wifi.get_wifi_networks() == []
+
+    added = mock_nm.add_ap(2, b"cafe")
+    wireless.emit("g-signal", ":1.4", "AccessPointAdded", Variant("(o)", (added,)))
+    loop.run_idle()
+    assert [network["ssid"] for network in wifi.get_wifi_networks()] == ["cafe"]
+
+    active = "/org/freedesktop/NetworkManager/ActiveConnection/7"
+    mock_nm.set(active, nm.NM_ACTIVE_CONNECTION_IFACE, Type=nm.NM_WIRELESS_TYPE, SpecificObject=added)
+    mock_nm.set(nm.NM_PATH, nm.NM_IFACE, ActiveConnections=[active])
+    nm_proxy.emit("g-properties-changed", Variant("a{sv}", {"ActiveConnections": Variant("ao", [active])}), [])
+    loop.run_idle()
+    assert events[-1] == ("active-connection-changed",)
+    assert wifi._active_wifi_connections() == {"cafe": active}
+
+    assert wifi.disconnect_network("cafe")
+    assert mock_nm.called("DeactivateConnection") == [(active,)]
+    assert [signal for signal, *_ in events].count("access-points-changed") == 2
+
+
+def added_settings(mock_nm) -> dict:
+    (settings, device, ap, options), = mock_nm.called("AddAndActivateConnection2")
+    assert device == DEVICE
+    return settings
+
+
+def test_connect_wpa(mock_nm, make_backend):
+    ap = mock_nm.add_ap(1, b"home", flags=1, rsn=PSK)
+    wifi = make_backend()
+
+    # a secured network needs its password
+    assert not wifi.connect_network("home")
+    assert mock_nm.called("AddAndActivateConnection2") == []
+
+    assert wifi.connect_network("home", "hunter22", remember=False)
+    (settings, _, ap_path, options), = mock_nm.called("AddAndActivateConnection2")
+    assert ap_path == ap
+    assert settings["802-11-wireless-security"] == {"key-mgmt": "wpa-psk", "psk": "hunter22"}
+    assert settings[nm.NM_WIRELESS_TYPE]["ssid"] == b"home"
+    assert options == {"persist": "volatile"}
+
+
+def test_connect_wpa3(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"home", flags=1, rsn=SAE)
+    assert make_backend().connect_network("home", "hunter22")
+    assert added_settings(mock_nm)["802-11-wireless-security"]["key-mgmt"] == "sae"
+
+
+def test_connect_wep(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"old", flags=nm.NM_802_11_AP_FLAGS_PRIVACY)
+    assert make_backend().connect_network("old", "0123456789")
+    assert added_settings(mock_nm)["802-11-wireless-security"] == {
+        "key-mgmt": "none",
+        "wep-key0": "0123456789",
+        "wep-key-type": nm.NM_WEP_KEY_TYPE_KEY,
+    }
+
+
+def test_connect_open_and_owe(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"cafe")
+    mock_nm.add_ap(2, b"airport", rsn=OWE)
+    wifi = make_backend()
+
+    assert wifi.connect_network("cafe")
+    assert wifi.connect_network("airport")
+    open_settings, owe_settings = (settings for settings, *_ in mock_nm.called("AddAndActivateConnection2"))
+    assert "802-11-wireless-security" not in open_settings
+    assert owe_settings["802-11-wireless-security"] == {"key-mgmt": "owe"}
+
+
+def test_enterprise_networks_are_refused(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"eduroam", flags=1, rsn=EAP)
+    assert not make_backend().connect_network("eduroam", "password")
+    assert mock_nm.called("AddAndActivateConnection2") == []
+
+
+def test_saved_connections_are_matched_on_ssid(mock_nm, make_backend):
+    mock_nm.add_ap(1, b"home", flags=1, rsn=PSK)
+    saved = mock_nm.save(1, b"home")
+    mock_nm.saved[saved]["connection"]["id"] = "Home (5 GHz)"
+    wifi = make_backend()
+
+    assert wifi.connect_network("home")
+    assert mock_nm.called("ActivateConnection") == [(saved, DEVICE, "/")]
+    assert wifi.get_connection_info("home")["connection.id"] == "Home (5 GHz)"
+
+    assert wifi.forget_network("home")
+    assert mock_nm.saved == {}
+    assert not wifi.forget_network("home")
@@ -0,0 +1,95 @@
+"""
+Holding down a volume or brightness key fires hundreds of change notifications,
+the OSD must only touch its widgets once per frame for all of them.
+"""
+
+import time
+
+import pytest
+
+import fakes
+from modules import osd
+
+BURST = 200
+
+
+@pytest.fixture
+def counts(monkeypatch):
+    counts = {"apply": 0, "redraw": 0}
+
+    def get_current_gdk_monitor_id():
+        # called once per _apply
+        counts["apply"] += 1
+        return 0
+
+    redraw = osd.BrightnessOSDContainer.redraw
+
+    def counted_redraw(self):
+        counts["redraw"] += 1
+        redraw(self)
+
+    services = {"audio": fakes.Widget(), "brightness": fakes.Widget()}
+    monkeypatch.setattr(osd, "get_service", services.__getitem__)
+    monkeypatch.setattr(osd, "get_current_gdk_monitor_id", get_current_gdk_monitor_id)
+    monkeypatch.setattr(osd.BrightnessOSDContainer, "redraw", counted_redraw)
+    counts["brightness"] = services["brightness"]
+    return counts
+
+
+def burst(service) -> float:
+    start = time.perf_counter()
+    for value in range(BURST):
+        service.emit("screen", value)
+    return time.perf_counter() - start
+
+
+def test_burst_while_hidden_applies_once(counts, loop):
+    window = osd.OSD()
+    assert not window.get_mapped()
+
+    burst(counts["brightness"])
+    assert counts["apply"] == 0
+    loop.run_idle()
+
+    assert (counts["apply"], counts["redraw"]) == (1, 1)
+    assert window.get_mapped()
+    assert window.brightness_osd_container._value == BURST - 1
+    assert len(loop.pending_timeouts) == 1
+
+
+def test_burst_while_shown_applies_once_per_frame(counts, loop):
+    window = osd.OSD()
+    counts["brightness"].emit("screen", 0)
+    loop.run_idle()
+    assert window.get_mapped()
+    counts["apply"] = 0
+
+    elapsed = burst(counts["brightness"])
+    loop.run_idle()
+    # the window's frame clock drives the OSD now
+    assert counts["apply"] == 0
+    loop.frame()
+
+    assert counts["apply"] == 1
+    assert len(loop.pending_timeouts) == 1
+    # coalescing leaves each event a few attribute writes, nothing per-event touches GTK
+    assert elapsed < 0.1
+
+
+def test_held_key_keeps_the_osd_up(counts, loop):
+    window = osd.OSD()
+    brightness = counts["brightness"]
+    brightness.emit("screen", 0)
+    loop.run_idle()
+
+    # one event every 100 ms for two seconds, well past the hide delay
+    for value in range(20):
+        loop.advance(0.1)
+        brightness.emit("screen", value)
+        loop.frame()
+        assert window.get_mapped()
+        assert len(loop.pending_timeouts) == 1
+
+    loop.advance(osd.HIDE_DELAY_MS / 1000)
+    assert not window.get_mapped()
+    assert loop.pending_timeouts == []
@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+import pytest
+
+import fakes
+from profiling import MAP_TIMEOUT, ProfileOptions, StartupProfiler, parse_profile_args
+
+
+@pytest.fixture
+def profiler():
+    profiler = StartupProfiler()
+    yield profiler
+    profiler.stop()
+
+
+def run(profiler, report_path, budget_ms, window, started_ago=1.0):
+    """Profiles a startup that began `started_ago` seconds back, returns what on_done got"""
+    profiler.start(
+        ProfileOptions(enabled=True, report_path=str(report_path), budget_ms=budget_ms),
+        start_time=time.perf_counter() - started_ago,
+    )
+    results = []
+    profiler.finish_on_first_map(window, results.append)
+    return results
+
+
+def test_parse_profile_args():
+    options = parse_profile_args(["--profile-startup=out.json", "--startup-budget", "250"])
+    assert (options.enabled, options.report_path, options.budget_ms) == (True, "out.json", 250)
+    assert not parse_profile_args([]).enabled
+
+
+def test_over_budget_fails(profiler, tmp_path, loop):
+    window = fakes.Window()
+    results = run(profiler, tmp_path / "report.json", budget_ms=0.001, window=window)
+
+    window.show()
+    # the report waits for the first frame
+    assert results == []
+    loop.run_idle()
+
+    assert results == [True]
+    with open(tmp_path / "report.json") as h:
+        report = json.load(h)
+    assert report["over_budget"]
+    assert report["first_map_ms"] >= 1000
+    assert not profiler.enabled
+
+
+def test_within_budget_passes(profiler, tmp_path, loop):
+    window = fakes.Window()
+    window.show()
+    results = run(profiler, tmp_path / "report.json", budget_ms=60_000, window=window)
+    loop.run_idle()
+
+    assert results == [False]
+    with open(tmp_path / "report.json") as h:
+        assert not json.load(h)["over_budget"]
+
+
+def test_never_mapping_fails(profiler, tmp_path, loop):
+    results = run(profiler, tmp_path / "report.json", budget_ms=None, window=fakes.Window())
+    loop.advance(MAP_TIMEOUT - 1)
+    assert results == []
+
+    loop.advance(1)
+    assert results == [True]
+    with open(tmp_path / "report.json") as h:
+        assert json.load(h)["first_map_ms"] is None
+
+
+def test_unwritable_report_fails(profiler, tmp_path, loop):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    window = fakes.Window()
+    window.show()
+    results = run(profiler, blocker / "report.json", budget_ms=None, window=window)
+    loop.run_idle()
+
+    assert results == [True]
+    assert not os.path.exists(blocker / "report.json")
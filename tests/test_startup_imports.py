@@ -0,0 +1,82 @@
+"""
+Startup must only import what the configuration asks for. Optional widgets and
+their dependencies are imported the first time they're shown.
+
+Each case runs in its own interpreter, this one has imported half the repo by now.
+"""
+
+import json
+import subprocess
+import sys
+
+from conftest import HOME, ROOT, TESTS_DIR
+
+STARTUP = """
+import json, os, sys
+sys.path[:0] = [{tests!r}, {root!r}]
+import fakes
+fakes.install({home!r})
+# there's no login session here
+os.getlogin = lambda: "tester"
+
+import main
+from user.parse_config import DEFAULT_CONFIG
+
+config = dict(DEFAULT_CONFIG, **json.loads({overrides!r}))
+main.configure_services(config)
+main.StatusBar(config=config)
+css = os.path.join({root!r}, "styles", "style.css")
+main.setup_css_provider(css)
+main.start_file_watches(css)
+fakes.loop.run_idle()
+print(json.dumps(sorted(sys.modules)))
+"""
+
+# imported on demand, none of these belong on the startup path
+LAZY = [
+    "widgets.clipboard",
+    "widgets.bluetooth_menu",
+    "widgets.wifi_menu",
+    "widgets.network_controls",
+    "widgets.media_widget",
+    "widgets.kanban",
+    "widgets.pins",
+    "widgets.timer",
+    "widgets.todos",
+    "widgets.scratchpad",
+    "widgets.weather",
+    "widgets.quote_display",
+    "services.weather",
+    "services.quotes",
+    "utils.bluez",
+    "utils.networkmanager",
+    "utils.wifi_backend",
+    "utils.favicon_cache",
+    "utils.art_cache",
+    "requests",
+    "aiohttp",
+    "markdown",
+]
+
+
+def startup_modules(**overrides) -> set[str]:
+    script = STARTUP.format(tests=TESTS_DIR, root=ROOT, home=HOME, overrides=json.dumps(overrides))
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_startup_skips_optional_modules():
+    modules = startup_modules()
+    assert "main" in modules and "modules.statusbar" in modules
+    assert sorted(modules.intersection(LAZY)) == []
+
+
+def test_only_the_configured_compositor_is_imported():
+    assert "i3ipc" not in startup_modules(workspaces_wm="hyprland")
+
+    modules = startup_modules(workspaces_wm="sway")
+    assert "widgets.sway" in modules
+    assert "i3ipc" in modules
@@ -0,0 +1,116 @@
+import json
+import time
+
+import pytest
+
+from services.weather import WeatherService
+
+
+def wttr(temp: str) -> dict:
+    return {
+        "current_condition": [
+            {"weatherCode": "113", "temp_C": temp, "weatherDesc": [{"value": "Sunny"}]}
+        ]
+    }
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "weather.json")
+
+
+@pytest.fixture
+def make_service(http_server, cache_path):
+    services = []
+
+    def make(**kwargs):
+        service = WeatherService(url=http_server.url("/weather"), cache_path=cache_path, interval=600, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.stop()
+
+
+def fetch(service, loop) -> None:
+    """Fires the pending refresh timer and waits for the response to be handled"""
+    loop.advance(0)
+    loop.wait_for(lambda: not service._fetching)
+
+
+def test_one_request_for_all_subscribers(http_server, make_service, cache_path, loop):
+    http_server.reply("/weather", (200, {"ETag": '"v1"'}, wttr("21")))
+    service = make_service()
+    received = []
+    for _ in range(3):
+        service.subscribe(lambda _, value: received.append(value))
+
+    fetch(service, loop)
+    assert received == [{"code": "113", "temp_C": "21", "desc": "Sunny"}] * 3
+    assert len(http_server.requests) == 1
+    with open(cache_path) as h:
+        assert json.load(h)["validators"]["etag"] == '"v1"'
+    # next one in an interval
+    assert loop.pending_timeouts == [pytest.approx(600, abs=1)]
+
+
+def test_nothing_runs_without_subscribers(http_server, make_service, loop):
+    service = make_service()
+    handler_id = service.subscribe(lambda *_: None)
+    service.unsubscribe(handler_id)
+    loop.advance(3600)
+    assert http_server.requests == []
+
+
+def test_fresh_cache_is_shown_without_a_request(http_server, make_service, cache_path, loop):
+    with open(cache_path, "w") as h:
+        json.dump({"value": {"temp_C": "5"}, "fetched_at": time.time() - 100, "validators": {}}, h)
+    service = make_service()
+    received = []
+    service.subscribe(lambda _, value: received.append(value))
+    loop.run_idle()
+
+    assert received == [{"temp_C": "5"}]
+    assert http_server.requests == []
+    assert loop.pending_timeouts == [pytest.approx(500, abs=1)]
+
+
+def test_not_modified_keeps_the_cached_value(http_server, make_service, cache_path, loop):
+    http_server.reply(
+        "/weather",
+        (200, {"ETag": '"v1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"}, wttr("21")),
+        (304, {}, b""),
+    )
+    service = make_service()
+    received = []
+    service.subscribe(lambda _, value: received.append(value))
+    fetch(service, loop)
+
+    service.refresh()
+    loop.wait_for(lambda: not service._fetching)
+    _, headers = http_server.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Sat, 17 Oct 2026 10:00:00 GMT"
+    # unchanged, nobody is told again
+    assert len(received) == 1
+    assert service.value["temp_C"] == "21"
+
+
+def test_failures_back_off(http_server, make_service, loop):
+    http_server.reply("/weather", (500, {}, b""), (500, {}, b""), (500, {}, b""), (200, {}, wttr("3")))
+    service = make_service()
+    service.subscribe(lambda *_: None)
+    fetch(service, loop)
+
+    delays = []
+    for _ in range(3):
+        delays.append(loop.pending_timeouts)
+        loop.advance(loop.pending_timeouts[0])
+        loop.wait_for(lambda: not service._fetching)
+    assert delays == [[30], [60], [120]]
+    assert service.value["temp_C"] == "3"
+    assert len(http_server.requests) == 4
+    # the backoff starts over once it works again
+    assert service._failures == 0
+
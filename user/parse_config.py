@@ -6,6 +6,8 @@ from loguru import logger
 
 from fabric.utils import get_relative_path
 
+from utils.theme_registry import get_theme_registry
+
 from typing import Any
 
 USER_CONFIG_PATH = GLib.get_user_config_dir() + "/goblin"
@@ -16,6 +18,12 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "theme": "base16/default-dark",
     "ws_icons":  ['일', '이', '삼', '사', '오', '육', '칠', '팔', '구', '십'],
     "font": "JetBrainsMono Nerd Font",
+    # seconds between weather refreshes
+    "weather_interval": 1800,
+    # optional widgets to leave out; they're never built and their modules never imported.
+    # control center: profile, hw_monitor, controls, kanban, timer, pins, network, power_menu, media
+    # calendar popup: weather, quotes
+    "disabled_widgets": [],
 }
 
 # japanese icons
@@ -41,7 +49,7 @@ def set_theme(config: dict[str, str]) -> bool:
     try:
         file = get_relative_path("../styles/current_theme.css")
         assert os.path.isfile(file)
-        if not os.path.isfile(get_relative_path(f"../styles/themes/{config['theme']}.css")):
+        if get_theme_registry().get(config["theme"]) is None:
             logger.warning("[Main] Theme not found, resorting to default")
             theme_css_lines.append("""@import url("./themes/base16/default-dark.css");""")
             return False
@@ -49,9 +57,14 @@ def set_theme(config: dict[str, str]) -> bool:
             theme_css_lines.append(f"""@import url("./themes/{config['theme']}.css");""")
             
         theme_css_lines += ["* {", "  all: unset;", f"  font-family: {config['font']};", "}"]
-        
+        theme_css = "\n".join(theme_css_lines)
+
+        # rewriting it unchanged would still set off a stylesheet reload
+        with open(file, "r") as h:
+            if h.read() == theme_css:
+                return True
         with open(file, "w+") as h:
-            h.write("\n".join(theme_css_lines))
+            h.write(theme_css)
         return True
     except Exception as e:
         logger.error(f"[Main] unable to set theme because of {e}")
@@ -0,0 +1,168 @@
+"""
+Album art cache. Thumbnails are stored already cropped and scaled, keyed by a hash
+of the art URL and size, under $XDG_CACHE_HOME/goblin/art, with a small in-memory
+LRU in front. A cache hit costs no network and no decode of the full-size image.
+"""
+
+import asyncio
+import hashlib
+import os
+import urllib.parse
+from collections import OrderedDict
+
+import gi
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf
+from loguru import logger
+
+from utils.http import fetch_bytes
+
+ART_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "goblin", "art"
+)
+
+
+def crop_and_scale(pixbuf: GdkPixbuf.Pixbuf, size: int) -> GdkPixbuf.Pixbuf:
+    """Center-crop to a square and scale to size x size"""
+    width = pixbuf.get_width()
+    height = pixbuf.get_height()
+    size_to_crop = min(width, height)
+
+    x_offset = (width - size_to_crop) // 2
+    y_offset = (height - size_to_crop) // 2
+
+    cropped_pixbuf = pixbuf.new_subpixbuf(x_offset, y_offset, size_to_crop, size_to_crop)
+    return cropped_pixbuf.scale_simple(size, size, GdkPixbuf.InterpType.BILINEAR)
+
+
+class ArtCache:
+    """`get` must be awaited on async_task_manager's loop, the LRU isn't locked."""
+
+    def __init__(
+        self,
+        cache_dir: str = ART_CACHE_DIR,
+        max_bytes: int = 32 * 1024 * 1024,
+        memory_entries: int = 32,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self._memory: OrderedDict[str, GdkPixbuf.Pixbuf] = OrderedDict()
+        # metadata tends to arrive several times per track, share the in-flight fetch
+        self._pending: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(art_url: str, size: int) -> str:
+        parsed = urllib.parse.urlparse(art_url)
+        if parsed.scheme == "file":
+            # local covers can be overwritten in place, the mtime is part of the content
+            try:
+                art_url = f"{art_url}@{os.stat(parsed.path).st_mtime_ns}"
+            except OSError:
+                pass
+        return hashlib.sha1(f"{art_url}|{size}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    async def get(self, art_url: str, size: int) -> GdkPixbuf.Pixbuf | None:
+        key = self._key(art_url, size)
+        if (pixbuf := self._memory.get(key)) is not None:
+            self._memory.move_to_end(key)
+            return pixbuf
+
+        if (task := self._pending.get(key)) is None:
+            task = asyncio.ensure_future(self._load(key, art_url, size))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        pixbuf = await asyncio.shield(task)
+        if pixbuf is not None:
+            self._memory[key] = pixbuf
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return pixbuf
+
+    async def _load(self, key: str, art_url: str, size: int) -> GdkPixbuf.Pixbuf | None:
+        try:
+            if (pixbuf := await asyncio.to_thread(self._read_disk, key)) is not None:
+                return pixbuf
+
+            parsed = urllib.parse.urlparse(art_url)
+            if parsed.scheme == "file":
+                data = await asyncio.to_thread(self._read_file, parsed.path)
+            else:
+                data = await fetch_bytes(art_url)
+            if not data:
+                return None
+
+            return await asyncio.to_thread(self._decode_and_store, key, data, size)
+        except Exception as e:
+            logger.error(f"[ArtCache] unable to load {art_url}: {e}")
+            return None
+
+    # blocking helpers, run in worker threads
+    def _read_disk(self, key: str) -> GdkPixbuf.Pixbuf | None:
+        path = self._path(key)
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(path)
+        except Exception:
+            return None
+        try:
+            os.utime(path)  # recency for eviction
+        except OSError:
+            pass
+        return pixbuf
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _decode_and_store(self, key: str, data: bytes, size: int) -> GdkPixbuf.Pixbuf:
+        loader = GdkPixbuf.PixbufLoader.new()
+        loader.write(data)
+        loader.close()
+        thumbnail = crop_and_scale(loader.get_pixbuf(), size)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            thumbnail.savev(tmp_path, "png", [], [])
+            os.replace(tmp_path, path)
+            self._evict()
+        except Exception as e:
+            logger.warning(f"[ArtCache] unable to write thumbnail: {e}")
+        return thumbnail
+
+    def _evict(self) -> None:
+        """Drop least recently used thumbnails until the directory fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_cache: ArtCache | None = None
+
+
+def get_art_cache() -> ArtCache:
+    global _cache
+    if _cache is None:
+        _cache = ArtCache()
+    return _cache
@@ -0,0 +1,211 @@
+"""
+BlueZ client built on org.freedesktop.DBus.ObjectManager. Keeps an in-memory table
+of adapters' devices, updated from InterfacesAdded / InterfacesRemoved /
+PropertiesChanged, so the bluetooth menu never has to fork bluetoothctl or sleep
+through a scan to find out what's around.
+"""
+
+import gi
+
+gi.require_version("Gio", "2.0")
+gi.require_version("GObject", "2.0")
+from gi.repository import Gio, GLib, GObject
+
+from loguru import logger
+
+BLUEZ_BUS_NAME = "org.bluez"
+BLUEZ_ADAPTER_IFACE = "org.bluez.Adapter1"
+BLUEZ_DEVICE_IFACE = "org.bluez.Device1"
+
+DEVICE_PROPERTIES = ("Address", "Alias", "Name", "Icon", "Connected", "Paired")
+
+
+def _unpack(variant: GLib.Variant | None, default=None):
+    return variant.unpack() if variant is not None else default
+
+
+class BluezClient(GObject.Object):
+    __gsignals__ = {
+        "device-added": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        "device-removed": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        "device-changed": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        "powered-changed": (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+        "discovering-changed": (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+    }
+
+    def __init__(self, bus_type: Gio.BusType = Gio.BusType.SYSTEM):
+        super().__init__()
+
+        # mac -> device info, the dicts BluetoothDeviceRow takes
+        self._devices: dict[str, dict[str, str | bool]] = {}
+        # object path <-> mac
+        self._paths: dict[str, str] = {}
+        self._macs: dict[str, str] = {}
+        self._adapter: Gio.DBusProxy | None = None
+
+        try:
+            self._manager = Gio.DBusObjectManagerClient.new_for_bus_sync(
+                bus_type,
+                Gio.DBusObjectManagerClientFlags.NONE,
+                BLUEZ_BUS_NAME,
+                "/",
+                None,
+                None,
+                None,
+            )
+        except GLib.Error as e:
+            logger.error(f"[Bluetooth] unable to reach BlueZ: {e.message}")
+            self._manager = None
+            return
+
+        for obj in self._manager.get_objects():
+            for proxy in obj.get_interfaces():
+                self._on_interface_added(self._manager, obj, proxy, notify=False)
+
+        self._manager.connect("interface-added", self._on_interface_added)
+        self._manager.connect("interface-removed", self._on_interface_removed)
+        self._manager.connect(
+            "interface-proxy-properties-changed", self._on_properties_changed
+        )
+
+    # table maintenance
+    @staticmethod
+    def _device_info(proxy: Gio.DBusProxy) -> dict[str, str | bool]:
+        props = {name: _unpack(proxy.get_cached_property(name)) for name in DEVICE_PROPERTIES}
+        return {
+            "mac_addr": props["Address"] or "",
+            "device_name": props["Alias"] or props["Name"] or props["Address"] or "",
+            "device_type": props["Icon"] or "unknown",
+            "connected": bool(props["Connected"]),
+            "paired": bool(props["Paired"]),
+        }
+
+    def _on_interface_added(self, manager, obj, proxy, notify: bool = True) -> None:
+        match proxy.get_interface_name():
+            case "org.bluez.Adapter1":
+                if self._adapter is None:
+                    self._adapter = proxy
+                    if notify:
+                        self.emit("powered-changed", self.powered)
+            case "org.bluez.Device1":
+                info = self._device_info(proxy)
+                if not info["mac_addr"]:
+                    return
+                self._devices[info["mac_addr"]] = info
+                self._paths[proxy.get_object_path()] = info["mac_addr"]
+                self._macs[info["mac_addr"]] = proxy.get_object_path()
+                if notify:
+                    self.emit("device-added", info["mac_addr"])
+
+    def _on_interface_removed(self, manager, obj, proxy) -> None:
+        match proxy.get_interface_name():
+            case "org.bluez.Adapter1":
+                if self._adapter is not None and self._adapter.get_object_path() == proxy.get_object_path():
+                    self._adapter = None
+                    self.emit("powered-changed", False)
+            case "org.bluez.Device1":
+                mac = self._paths.pop(proxy.get_object_path(), None)
+                self._macs.pop(mac, None)
+                if mac is not None and self._devices.pop(mac, None) is not None:
+                    self.emit("device-removed", mac)
+
+    def _on_properties_changed(self, manager, obj, proxy, changed: GLib.Variant, invalidated) -> None:
+        changed = changed.unpack()
+        match proxy.get_interface_name():
+            case "org.bluez.Adapter1":
+                if proxy is not self._adapter:
+                    return
+                if "Powered" in changed:
+                    self.emit("powered-changed", bool(changed["Powered"]))
+                if "Discovering" in changed:
+                    self.emit("discovering-changed", bool(changed["Discovering"]))
+            case "org.bluez.Device1":
+                mac = self._paths.get(proxy.get_object_path())
+                if mac is None or not any(name in changed for name in DEVICE_PROPERTIES):
+                    return
+                self._devices[mac] = self._device_info(proxy)
+                self.emit("device-changed", mac)
+
+    # lookups, all served from the table
+    @property
+    def available(self) -> bool:
+        return self._adapter is not None
+
+    @property
+    def powered(self) -> bool:
+        return self._adapter is not None and bool(_unpack(self._adapter.get_cached_property("Powered")))
+
+    @property
+    def discovering(self) -> bool:
+        return self._adapter is not None and bool(_unpack(self._adapter.get_cached_property("Discovering")))
+
+    def get_device(self, mac_addr: str) -> dict[str, str | bool] | None:
+        return self._devices.get(mac_addr)
+
+    def get_devices(self) -> list[dict[str, str | bool]]:
+        """Known devices, paired ones first"""
+        return sorted(
+            self._devices.values(),
+            key=lambda device: (not device["paired"], device["device_name"].lower()),
+        )
+
+    # actions. these block on BlueZ (Connect/Pair can take seconds), call them off the main thread
+    def _device_proxy(self, mac_addr: str) -> Gio.DBusProxy | None:
+        if (path := self._macs.get(mac_addr)) is None:
+            return None
+        return self._manager.get_interface(path, BLUEZ_DEVICE_IFACE)
+
+    def _call(self, proxy: Gio.DBusProxy | None, method: str, params: GLib.Variant | None = None) -> bool:
+        if proxy is None:
+            return False
+        try:
+            proxy.call_sync(method, params, Gio.DBusCallFlags.NONE, -1, None)
+            return True
+        except GLib.Error as e:
+            logger.error(f"[Bluetooth] {method} failed: {e.message}")
+            return False
+
+    def set_powered(self, enabled: bool) -> bool:
+        return self._call(
+            self._adapter,
+            "org.freedesktop.DBus.Properties.Set",
+            GLib.Variant("(ssv)", (BLUEZ_ADAPTER_IFACE, "Powered", GLib.Variant("b", enabled))),
+        )
+
+    def start_discovery(self) -> bool:
+        if self.discovering:
+            return True
+        return self._call(self._adapter, "StartDiscovery")
+
+    def stop_discovery(self) -> bool:
+        if not self.discovering:
+            return True
+        return self._call(self._adapter, "StopDiscovery")
+
+    def pair_device(self, mac_addr: str) -> bool:
+        return self._call(self._device_proxy(mac_addr), "Pair")
+
+    def connect_device(self, mac_addr: str) -> bool:
+        return self._call(self._device_proxy(mac_addr), "Connect")
+
+    def disconnect_device(self, mac_addr: str) -> bool:
+        return self._call(self._device_proxy(mac_addr), "Disconnect")
+
+    def forget_device(self, mac_addr: str) -> bool:
+        proxy = self._device_proxy(mac_addr)
+        if proxy is None:
+            return False
+        return self._call(
+            self._adapter, "RemoveDevice", GLib.Variant("(o)", (proxy.get_object_path(),))
+        )
+
+
+_client: BluezClient | None = None
+
+
+def get_bluez_client() -> BluezClient:
+    """Shared BlueZ client, created on first use. Must be first called from the main thread."""
+    global _client
+    if _client is None:
+        _client = BluezClient()
+    return _client
@@ -0,0 +1,257 @@
+"""
+SQLite storage for the productivity widgets (todos, reminders, kanban, pins).
+
+Every change is a row-level statement instead of rewriting a whole file. The
+database runs in WAL mode with synchronous=NORMAL, so a commit appends to the
+WAL without an fsync and is cheap enough to do on the main thread; the WAL is
+synced at checkpoints. The connection is only used from the main thread.
+
+The files the widgets used before are imported once, the first time the
+database is opened, and left in place.
+"""
+
+import datetime
+import json
+import os
+import pickle
+import sqlite3
+
+from gi.repository import GLib
+from loguru import logger
+
+DB_PATH = os.path.join(GLib.get_user_data_dir(), "goblin", "goblin.db")
+
+LEGACY_TODOS_PATH = GLib.get_user_cache_dir() + "/todos.txt"
+LEGACY_REMINDERS_PATH = GLib.get_user_cache_dir() + "/reminders.goblin"
+LEGACY_KANBAN_PATH = os.path.expanduser("~/.kanban.json")
+LEGACY_PINS_PATH = os.path.expanduser("~/.pins.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    category TEXT NOT NULL DEFAULT '',
+    deadline TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    due REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reminders_by_due ON reminders (due);
+
+CREATE TABLE IF NOT EXISTS kanban_notes (
+    id INTEGER PRIMARY KEY,
+    column_title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS kanban_notes_by_column ON kanban_notes (column_title, position);
+
+CREATE TABLE IF NOT EXISTS pins (
+    slot INTEGER PRIMARY KEY,
+    content_type TEXT,
+    content TEXT,
+    alias TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# user_version -> statements that bring the database up to it
+MIGRATIONS = {
+    1: SCHEMA,
+    2: "ALTER TABLE reminders ADD COLUMN recurrence TEXT NOT NULL DEFAULT '';",
+    # the Todos widget sorts the few rows it has itself, these were never used
+    3: "DROP INDEX IF EXISTS todos_by_priority; DROP INDEX IF EXISTS todos_by_category;",
+}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+class Database:
+    def __init__(self, path: str = DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            # executescript() commits whatever is pending before it runs, so the
+            # migration and its version bump go in one explicit transaction, or a
+            # crash in between would re-run the migration on the next start
+            try:
+                self.conn.executescript(
+                    f"BEGIN; {MIGRATIONS[target]} PRAGMA user_version={target}; COMMIT;"
+                )
+            except sqlite3.Error:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+                raise
+        self.migrate_legacy_files()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # todos
+    def todos(self) -> list[dict]:
+        rows = self.conn.execute("SELECT * FROM todos ORDER BY id")
+        return [dict(row, completed=bool(row["completed"])) for row in rows]
+
+    def add_todo(self, text: str, category: str = "", deadline: str = "", priority: str = "", completed: bool = False) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO todos (text, completed, category, deadline, priority) VALUES (?, ?, ?, ?, ?)",
+                (text, completed, category, deadline, priority),
+            )
+        return cursor.lastrowid
+
+    def set_todo_completed(self, todo_id: int, completed: bool) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE todos SET completed = ? WHERE id = ?", (completed, todo_id))
+
+    def remove_todo(self, todo_id: int) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+
+    def clear_todos(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM todos")
+
+    # reminders
+    def reminders(self) -> list[dict]:
+        rows = self.conn.execute("SELECT * FROM reminders ORDER BY due, text")
+        return [dict(row, due=datetime.datetime.fromtimestamp(row["due"])) for row in rows]
+
+    def add_reminder(self, due: datetime.datetime, text: str, recurrence: str = "") -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO reminders (due, text, recurrence) VALUES (?, ?, ?)",
+                (due.timestamp(), text, recurrence),
+            )
+        return cursor.lastrowid
+
+    def set_reminder_due(self, reminder_id: int, due: datetime.datetime) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE reminders SET due = ? WHERE id = ?", (due.timestamp(), reminder_id))
+
+    def remove_reminder(self, reminder_id: int) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+
+    def clear_reminders(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM reminders")
+
+    # kanban
+    def kanban_notes(self) -> dict[str, list[str]]:
+        notes: dict[str, list[str]] = {}
+        for row in self.conn.execute("SELECT column_title, text FROM kanban_notes ORDER BY column_title, position"):
+            notes.setdefault(row["column_title"], []).append(row["text"])
+        return notes
+
+    def set_kanban_column(self, title: str, notes: list[str]) -> None:
+        """Replaces one column, the others aren't touched"""
+        with self.conn:
+            self.conn.execute("DELETE FROM kanban_notes WHERE column_title = ?", (title,))
+            self.conn.executemany(
+                "INSERT INTO kanban_notes (column_title, position, text) VALUES (?, ?, ?)",
+                [(title, position, text) for position, text in enumerate(notes)],
+            )
+
+    # pins
+    def pins(self) -> dict[int, dict]:
+        return {row["slot"]: dict(row) for row in self.conn.execute("SELECT * FROM pins")}
+
+    def set_pin(self, slot: int, content_type: str | None, content: str | None, alias: str | None) -> None:
+        with self.conn:
+            if content is None:
+                self.conn.execute("DELETE FROM pins WHERE slot = ?", (slot,))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO pins (slot, content_type, content, alias) VALUES (?, ?, ?, ?)",
+                    (slot, content_type, content, alias),
+                )
+
+    # migration from the old per-widget files
+    def _migrated(self, name: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM meta WHERE key = ?", (f"migrated:{name}",)).fetchone() is not None
+
+    def migrate_legacy_files(self) -> None:
+        for name, path, importer in (
+            ("todos", LEGACY_TODOS_PATH, self._import_todos),
+            ("reminders", LEGACY_REMINDERS_PATH, self._import_reminders),
+            ("kanban", LEGACY_KANBAN_PATH, self._import_kanban),
+            ("pins", LEGACY_PINS_PATH, self._import_pins),
+        ):
+            if self._migrated(name):
+                continue
+            try:
+                with self.conn:
+                    if os.path.isfile(path):
+                        importer(path)
+                        logger.info(f"[Database] imported {name} from {path}")
+                    self.conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (f"migrated:{name}", path))
+            except Exception as e:
+                # rolled back, tried again next start
+                logger.error(f"[Database] unable to import {name} from {path}: {e}")
+
+    def _import_todos(self, path: str) -> None:
+        with open(path) as h:
+            for line in h:
+                if not line.strip():
+                    continue
+                # text can contain "|", the other fields can't
+                text, completed, category, deadline, priority = line.rstrip("\n").rsplit("|", 4)
+                self.conn.execute(
+                    "INSERT INTO todos (text, completed, category, deadline, priority) VALUES (?, ?, ?, ?, ?)",
+                    (text, completed == "True", category, deadline, priority),
+                )
+
+    def _import_reminders(self, path: str) -> None:
+        with open(path, "rb") as h:
+            heap = pickle.load(h)
+        self.conn.executemany(
+            "INSERT INTO reminders (due, text) VALUES (?, ?)",
+            [(due.timestamp(), text) for due, text in heap],
+        )
+
+    def _import_kanban(self, path: str) -> None:
+        with open(path) as h:
+            state = json.load(h)
+        for column in state["columns"]:
+            self.conn.executemany(
+                "INSERT INTO kanban_notes (column_title, position, text) VALUES (?, ?, ?)",
+                [(column["title"], position, text) for position, text in enumerate(column["notes"])],
+            )
+
+    def _import_pins(self, path: str) -> None:
+        with open(path) as h:
+            state = json.load(h)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO pins (slot, content_type, content, alias) VALUES (?, ?, ?, ?)",
+            [
+                (slot, cell.get("content_type"), cell.get("content"), cell.get("alias"))
+                for slot, cell in enumerate(state)
+                if cell.get("content") is not None
+            ],
+        )
+
+
+_database: Database | None = None
+
+
+def get_database() -> Database:
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
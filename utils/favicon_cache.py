@@ -0,0 +1,127 @@
+"""
+Favicon cache for URL pins. Raw favicon bytes are kept per origin under
+$XDG_CACHE_HOME/goblin/favicons and reused until they are older than the TTL, so
+loading pins at startup doesn't need the network. Sites that answer 404/410 are
+remembered too (as an empty file, for a day) so they aren't asked again on every
+load. Server errors and network failures aren't cached at all, the next load
+simply tries again, and an expired icon is kept in the meantime.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import urllib.parse
+from collections import OrderedDict
+
+from loguru import logger
+
+from utils.http import get_session
+
+FAVICON_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "goblin", "favicons"
+)
+
+# the site definitely has no favicon there, anything else may work next time
+MISSING_STATUSES = (404, 410)
+
+
+def get_favicon_url(url: str) -> str:
+    parsed_url = urllib.parse.urlparse(url)
+    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+    return f"{base_url}/favicon.ico"
+
+
+class FaviconCache:
+    """`get` must be awaited on async_task_manager's loop"""
+
+    def __init__(
+        self,
+        cache_dir: str = FAVICON_CACHE_DIR,
+        ttl: int = 7 * 24 * 60 * 60,
+        missing_ttl: int = 24 * 60 * 60,
+        memory_entries: int = 64,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.memory_entries = memory_entries
+        # only definite answers go in here, failures are retried on the next get
+        self._memory: OrderedDict[str, bytes | None] = OrderedDict()
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def _path(self, favicon_url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(favicon_url.encode()).hexdigest())
+
+    async def get(self, url: str) -> bytes | None:
+        favicon_url = get_favicon_url(url)
+        if favicon_url in self._memory:
+            self._memory.move_to_end(favicon_url)
+            return self._memory[favicon_url]
+
+        if (task := self._pending.get(favicon_url)) is None:
+            task = asyncio.ensure_future(self._load(favicon_url))
+            self._pending[favicon_url] = task
+            task.add_done_callback(lambda _: self._pending.pop(favicon_url, None))
+
+        data, definite = await asyncio.shield(task)
+        if definite:
+            self._memory[favicon_url] = data
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return data
+
+    async def _load(self, favicon_url: str) -> tuple[bytes | None, bool]:
+        """(favicon bytes, whether that's a definite answer worth caching)"""
+        path = self._path(favicon_url)
+        fresh, cached = await asyncio.to_thread(self._read_disk, path)
+        if fresh:
+            return cached, True
+
+        try:
+            async with get_session().get(favicon_url) as response:
+                status = response.status
+                data = await response.read() if status == 200 else b""
+        except Exception as e:
+            # offline or timed out, an expired icon beats no icon
+            logger.info(f"[Favicons] error downloading {favicon_url}: {e}")
+            return cached, False
+
+        if status == 200 and data:
+            await asyncio.to_thread(self._write_disk, path, data)
+            return data, True
+        if status in MISSING_STATUSES:
+            await asyncio.to_thread(self._write_disk, path, b"")
+            return None, True
+        logger.info(f"[Favicons] {favicon_url} answered {status}, trying again next time")
+        return cached, False
+
+    def _read_disk(self, path: str) -> tuple[bool, bytes | None]:
+        """(still within ttl, cached bytes). An empty file is a remembered 404."""
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False, None
+        return age < (self.ttl if data else self.missing_ttl), data or None
+
+    def _write_disk(self, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[Favicons] unable to write cache: {e}")
+
+
+_cache: FaviconCache | None = None
+
+
+def get_favicon_cache() -> FaviconCache:
+    global _cache
+    if _cache is None:
+        _cache = FaviconCache()
+    return _cache
@@ -0,0 +1,133 @@
+"""
+One file watch service for the whole shell, built on Gio.FileMonitor so every
+callback runs on the GLib main loop (no watcher threads, no idle_add hops).
+
+Watches are always placed on directories: one monitor per directory no matter
+how many subscriptions it has, and a watched file is matched by name inside its
+parent, which also catches editors that save by writing a temp file and renaming
+it over the original. Events are debounced per path so such a save is delivered
+as a single "changed".
+"""
+
+import os
+from typing import Callable
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+from loguru import logger
+
+# callback(path, event, dest). event is "changed", "deleted" or "moved", dest is
+# only set for "moved"
+FileWatchCallback = Callable[[str, str, str | None], None]
+
+DEFAULT_DEBOUNCE_MS = 100
+
+
+class FileWatcher:
+    def __init__(self):
+        self._monitors: dict[str, Gio.FileMonitor] = {}
+        # subscription id -> (directory, file name or None for the whole directory, callback, debounce)
+        self._subscriptions: dict[int, tuple[str, str | None, FileWatchCallback, int]] = {}
+        self._next_id: int = 1
+        # (subscription id, path) -> [timer id, event, dest]
+        self._pending: dict[tuple[int, str], list] = {}
+
+    def watch_file(
+        self, path: str, callback: FileWatchCallback, debounce_ms: int = DEFAULT_DEBOUNCE_MS
+    ) -> int:
+        path = os.path.realpath(path)
+        return self._subscribe(os.path.dirname(path), os.path.basename(path), callback, debounce_ms)
+
+    def watch_dir(
+        self, path: str, callback: FileWatchCallback, debounce_ms: int = DEFAULT_DEBOUNCE_MS
+    ) -> int:
+        """Like watch_file, for every entry directly inside `path`"""
+        return self._subscribe(os.path.realpath(path), None, callback, debounce_ms)
+
+    def unwatch(self, watch_id: int) -> None:
+        subscription = self._subscriptions.pop(watch_id, None)
+        if subscription is None:
+            return
+        for key in [key for key in self._pending if key[0] == watch_id]:
+            GLib.source_remove(self._pending.pop(key)[0])
+
+        directory = subscription[0]
+        if not any(sub[0] == directory for sub in self._subscriptions.values()):
+            if (monitor := self._monitors.pop(directory, None)) is not None:
+                monitor.cancel()
+
+    def _subscribe(self, directory: str, name: str | None, callback, debounce_ms: int) -> int:
+        if directory not in self._monitors:
+            try:
+                monitor = Gio.File.new_for_path(directory).monitor_directory(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+            except GLib.Error as e:
+                logger.error(f"[FileWatch] unable to watch {directory}: {e.message}")
+                return 0
+            monitor.connect("changed", self._on_changed, directory)
+            self._monitors[directory] = monitor
+
+        watch_id = self._next_id
+        self._next_id += 1
+        self._subscriptions[watch_id] = (directory, name, callback, debounce_ms)
+        return watch_id
+
+    def _on_changed(self, monitor, file: Gio.File, other_file: Gio.File | None, event_type, directory: str):
+        path = file.get_path()
+        other_path = other_file.get_path() if other_file is not None else None
+
+        match event_type:
+            case Gio.FileMonitorEvent.CHANGED | Gio.FileMonitorEvent.CHANGES_DONE_HINT | Gio.FileMonitorEvent.CREATED | Gio.FileMonitorEvent.MOVED_IN:
+                events = [(path, "changed", None)]
+            case Gio.FileMonitorEvent.DELETED | Gio.FileMonitorEvent.MOVED_OUT:
+                events = [(path, "deleted", None)]
+            case Gio.FileMonitorEvent.RENAMED:
+                # the new name got (re)written, e.g. a temp file renamed over the original
+                events = [(path, "moved", other_path), (other_path, "changed", None)]
+            case _:
+                return
+
+        for watch_id, (sub_dir, name, _, debounce_ms) in list(self._subscriptions.items()):
+            if sub_dir != directory:
+                continue
+            for event_path, event, dest in events:
+                if event_path is None or (name is not None and os.path.basename(event_path) != name):
+                    continue
+                self._queue(watch_id, event_path, event, dest, debounce_ms)
+
+    def _queue(self, watch_id: int, path: str, event: str, dest: str | None, debounce_ms: int) -> None:
+        key = (watch_id, path)
+        if (pending := self._pending.get(key)) is not None:
+            pending[1], pending[2] = event, dest
+            return
+        timer_id = GLib.timeout_add(debounce_ms, self._flush, key)
+        self._pending[key] = [timer_id, event, dest]
+
+    def _flush(self, key: tuple[int, str]) -> bool:
+        _, event, dest = self._pending.pop(key)
+        watch_id, path = key
+        if (subscription := self._subscriptions.get(watch_id)) is None:
+            return False
+
+        # a rename/delete followed by a rewrite within the window is just a save
+        if event != "changed" and os.path.exists(path):
+            event, dest = "changed", None
+
+        try:
+            subscription[2](path, event, dest)
+        except Exception as e:
+            logger.error(f"[FileWatch] callback for {path} failed: {e}")
+        return False
+
+
+_watcher: FileWatcher | None = None
+
+
+def get_file_watcher() -> FileWatcher:
+    global _watcher
+    if _watcher is None:
+        _watcher = FileWatcher()
+    return _watcher
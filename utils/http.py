@@ -0,0 +1,26 @@
+"""
+One pooled aiohttp session for everything that runs on async_task_manager's loop,
+instead of a new session (and TCP/TLS handshake) per request.
+"""
+
+_session = None
+
+
+def get_session() -> "aiohttp.ClientSession":
+    """Shared session. Only call this from coroutines running on async_task_manager."""
+    global _session
+    if _session is None or _session.closed:
+        import aiohttp  # deferred, nothing needs it until the first request
+
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=8, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _session
+
+
+async def fetch_bytes(url: str) -> bytes | None:
+    async with get_session().get(url) as response:
+        if response.status != 200:
+            return None
+        return await response.read()
@@ -0,0 +1,146 @@
+"""
+Minimal Hyprland IPC client. Requests go over `.socket.sock` (one connection per
+request, that's how Hyprland serves them) and events are read from a single
+long-lived `.socket2.sock` connection watched by the GLib main loop, no threads.
+Requests are made from the main loop, so they time out instead of freezing the
+shell when the compositor doesn't answer.
+"""
+
+import json
+import os
+import socket
+from typing import Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+EventCallback = Callable[[str, str], None]
+
+# seconds, for the whole request. Hyprland answers in well under a millisecond
+REQUEST_TIMEOUT = 0.5
+
+
+def get_socket_dir(signature: str | None = None) -> str | None:
+    signature = signature or os.getenv("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    for base in (os.path.join(runtime_dir, "hypr"), "/tmp/hypr"):  # /tmp for hyprland < 0.40
+        path = os.path.join(base, signature)
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+class HyprlandIPC:
+    def __init__(
+        self,
+        socket_dir: str | None = None,
+        reconnect_interval: int = 5,
+        request_timeout: float = REQUEST_TIMEOUT,
+    ):
+        self.socket_dir = socket_dir or get_socket_dir()
+        self.reconnect_interval = reconnect_interval
+        self.request_timeout = request_timeout
+
+        self._callbacks: list[EventCallback] = []
+        self._event_socket: socket.socket | None = None
+        self._watch_id: int | None = None
+        self._buffer = b""
+
+    @property
+    def available(self) -> bool:
+        return self.socket_dir is not None
+
+    def request(self, command: str) -> bytes:
+        """Raises OSError (socket.timeout included) if Hyprland doesn't answer in time"""
+        if self.socket_dir is None:
+            raise RuntimeError("Hyprland is not running")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.request_timeout)
+            sock.connect(os.path.join(self.socket_dir, ".socket.sock"))
+            sock.sendall(command.encode())
+            chunks = []
+            while chunk := sock.recv(8192):
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def request_json(self, command: str):
+        return json.loads(self.request(f"j/{command}"))
+
+    def subscribe(self, callback: EventCallback) -> None:
+        """Call `callback(event_name, data)` for every event on the main loop."""
+        self._callbacks.append(callback)
+        if self._event_socket is None:
+            self._connect_events()
+
+    def _connect_events(self) -> bool:
+        if self.socket_dir is None:
+            return False
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(os.path.join(self.socket_dir, ".socket2.sock"))
+            sock.setblocking(False)
+        except OSError as e:
+            logger.warning(f"[Hyprland] unable to connect to event socket: {e}")
+            GLib.timeout_add_seconds(self.reconnect_interval, self._connect_events)
+            return False
+
+        self._event_socket = sock
+        self._buffer = b""
+        self._watch_id = GLib.io_add_watch(
+            sock.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self._on_readable,
+        )
+        return False
+
+    def _disconnect_events(self) -> None:
+        if self._watch_id is not None:
+            GLib.source_remove(self._watch_id)
+            self._watch_id = None
+        if self._event_socket is not None:
+            self._event_socket.close()
+            self._event_socket = None
+
+    def _on_readable(self, fd, condition) -> bool:
+        try:
+            data = self._event_socket.recv(8192) if condition & GLib.IO_IN else b""
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+
+        if not data:
+            logger.warning("[Hyprland] event socket closed, reconnecting")
+            self._watch_id = None
+            self._disconnect_events()
+            # anyone caching state has missed events in the meantime
+            self._dispatch("disconnected", "")
+            GLib.timeout_add_seconds(self.reconnect_interval, self._connect_events)
+            return False
+
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            name, _, payload = line.decode(errors="replace").partition(">>")
+            self._dispatch(name, payload)
+        return True
+
+    def _dispatch(self, name: str, data: str) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(name, data)
+            except Exception as e:
+                logger.error(f"[Hyprland] event callback failed on {name}: {e}")
+
+
+_ipc: HyprlandIPC | None = None
+
+
+def get_hyprland_ipc() -> HyprlandIPC:
+    global _ipc
+    if _ipc is None:
+        _ipc = HyprlandIPC()
+    return _ipc
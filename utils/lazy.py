@@ -0,0 +1,54 @@
+import importlib
+from typing import Callable
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+
+def import_attr(path: str):
+    """`import_attr("widgets.pins:Pins")` imports widgets.pins and returns Pins.
+
+    For factories, so that a widget's module (and everything it pulls in) is only
+    imported when the widget is actually built.
+    """
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class LazyWidget(Gtk.Box):
+    """Placeholder that builds its real child the first time it's mapped.
+
+    Lets a window be constructed (and shown) without paying for widgets the user
+    hasn't looked at yet, e.g. control center rows or notebook pages that aren't
+    the current one. `on_built(widget)` runs once, right after the child is built,
+    for wiring up signals or registering the widget somewhere.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Gtk.Widget],
+        on_built: Callable[[Gtk.Widget], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._factory = factory
+        self._on_built = on_built
+        self._widget: Gtk.Widget | None = None
+        self._map_id = self.connect("map", lambda *_: self.build())
+
+    @property
+    def widget(self) -> Gtk.Widget | None:
+        """The real widget, None until it's been built"""
+        return self._widget
+
+    def build(self) -> Gtk.Widget:
+        if self._widget is None:
+            self.disconnect(self._map_id)
+            self._widget = self._factory()
+            self.pack_start(self._widget, True, True, 0)
+            self._widget.show_all()
+            if self._on_built is not None:
+                self._on_built(self._widget)
+        return self._widget
@@ -6,6 +6,9 @@ import gi
 
 gi.require_version("Gdk", "3.0")
 from gi.repository import Gdk
+from loguru import logger
+
+from utils.hyprland import get_hyprland_ipc
 
 
 # IDC,  screen.get_monitor_plug_name is deprecated
@@ -17,16 +20,99 @@ display: Gdk.Display = Gdk.Display.get_default()
 screen: Gdk.Screen = Gdk.Display.get_default().get_default_screen()
 
 
+class MonitorCache:
+    """Active monitor and plug name -> GDK index, kept in memory.
+
+    Filled lazily over the Hyprland request socket and only thrown away when the
+    event socket says the monitor layout or focus may have moved.
+    """
+
+    # events after which the focused monitor has to be asked for again
+    WORKSPACE_EVENTS = {"workspace", "workspacev2", "moveworkspace", "moveworkspacev2", "disconnected"}
+    # events after which the gdk indices can be stale too
+    MONITOR_EVENTS = {"monitoradded", "monitoraddedv2", "monitorremoved", "monitorremovedv2"}
+
+    def __init__(self, ipc=None):
+        self.ipc = ipc or get_hyprland_ipc()
+        self._active_monitor: str | None = None
+        # last answer we got, used while Hyprland doesn't respond
+        self._last_active_monitor: str | None = None
+        self._gdk_ids: dict[str, int] | None = None
+        self._listening = False
+
+    def _listen(self) -> None:
+        if self._listening:
+            return
+        self._listening = True
+        self.ipc.subscribe(self._on_event)
+        display.connect("monitor-added", lambda *_: self.invalidate())
+        display.connect("monitor-removed", lambda *_: self.invalidate())
+
+    def _on_event(self, name: str, data: str) -> None:
+        if name == "focusedmon":
+            # focusedmon>>MONNAME,WORKSPACENAME, no need to ask for it
+            self._active_monitor = self._last_active_monitor = data.split(",", 1)[0]
+        elif name in self.MONITOR_EVENTS:
+            self.invalidate()
+        elif name in self.WORKSPACE_EVENTS:
+            self._active_monitor = None
+
+    def invalidate(self) -> None:
+        self._active_monitor = None
+        self._gdk_ids = None
+
+    @property
+    def active_monitor(self) -> str | None:
+        self._listen()
+        if self._active_monitor is None:
+            try:
+                self._active_monitor = self.ipc.request_json("activeworkspace")["monitor"]
+            except OSError as e:
+                logger.warning(f"[Monitors] Hyprland didn't answer, using the last active monitor: {e}")
+                return self._last_active_monitor
+            self._last_active_monitor = self._active_monitor
+        return self._active_monitor
+
+    def gdk_monitor_id(self, plug_name: str) -> int | None:
+        self._listen()
+        if self._gdk_ids is None:
+            self._gdk_ids = {
+                screen.get_monitor_plug_name(i): i
+                for i in range(display.get_n_monitors())
+            }
+        return self._gdk_ids.get(plug_name)
+
+
+_cache: MonitorCache | None = None
+
+
+def get_monitor_cache() -> MonitorCache:
+    global _cache
+    if _cache is None:
+        _cache = MonitorCache()
+    return _cache
+
+
+_last_monitors: Dict = {}
+
+
 def get_all_monitors() -> Dict:
-    monitors = json.loads(subprocess.check_output(["hyprctl", "monitors", "-j"]))
-    return {monitor["id"]:monitor["name"] for monitor in monitors}
+    global _last_monitors
+    ipc = get_hyprland_ipc()
+    if ipc.available:
+        try:
+            monitors = ipc.request_json("monitors")
+        except OSError as e:
+            logger.warning(f"[Monitors] Hyprland didn't answer, using the last monitor list: {e}")
+            return _last_monitors
+    else:
+        monitors = json.loads(subprocess.check_output(["hyprctl", "monitors", "-j"]))
+    _last_monitors = {monitor["id"]:monitor["name"] for monitor in monitors}
+    return _last_monitors
 
 
 def get_gdk_monitor_id_from_name(plug_name: str) -> int | None:
-    for i in range(display.get_n_monitors()):
-        if screen.get_monitor_plug_name(i) == plug_name:
-            return i
-    return None
+    return get_monitor_cache().gdk_monitor_id(plug_name)
 
 
 def get_gdk_monitor_id(hyprland_id: int) -> int | None:
@@ -37,7 +123,12 @@ def get_gdk_monitor_id(hyprland_id: int) -> int | None:
 
 
 def get_current_gdk_monitor_id() -> int | None:
-    active_workspace = json.loads(
-        subprocess.check_output(["hyprctl", "activeworkspace", "-j"])
-    )
-    return get_gdk_monitor_id_from_name(active_workspace["monitor"])
+    cache = get_monitor_cache()
+    if not cache.ipc.available:
+        return None
+    try:
+        return cache.gdk_monitor_id(cache.active_monitor)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"[Monitors] unable to get the active monitor: {e}")
+        cache.invalidate()
+        return None
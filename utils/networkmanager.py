@@ -0,0 +1,410 @@
+"""
+NetworkManager backend for the wifi menu that talks to NM over D-Bus instead of
+forking nmcli. Radio state, access points and the active connection are read from
+Gio.DBusProxy's property cache, which NM keeps current through PropertiesChanged.
+"""
+
+from typing import Dict, List
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+
+from loguru import logger
+
+from utils.wifi_backend import WifiBackend, read_interface_bytes
+
+NM_BUS_NAME = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_IFACE = "org.freedesktop.NetworkManager"
+NM_DEVICE_IFACE = NM_IFACE + ".Device"
+NM_WIRELESS_IFACE = NM_DEVICE_IFACE + ".Wireless"
+NM_AP_IFACE = NM_IFACE + ".AccessPoint"
+NM_ACTIVE_CONNECTION_IFACE = NM_IFACE + ".Connection.Active"
+NM_SETTINGS_PATH = NM_PATH + "/Settings"
+NM_SETTINGS_IFACE = NM_IFACE + ".Settings"
+NM_SETTINGS_CONNECTION_IFACE = NM_SETTINGS_IFACE + ".Connection"
+
+NM_DEVICE_TYPE_WIFI = 2
+NM_802_11_AP_FLAGS_PRIVACY = 0x1
+# NM80211ApSecurityFlags, as found in WpaFlags/RsnFlags
+NM_802_11_AP_SEC_KEY_MGMT_PSK = 0x100
+NM_802_11_AP_SEC_KEY_MGMT_802_1X = 0x200
+NM_802_11_AP_SEC_KEY_MGMT_SAE = 0x400
+NM_802_11_AP_SEC_KEY_MGMT_OWE = 0x800
+NM_WEP_KEY_TYPE_KEY = 1
+NM_WIRELESS_TYPE = "802-11-wireless"
+
+
+def _unpack(variant: GLib.Variant | None, default=None):
+    return variant.unpack() if variant is not None else default
+
+
+def _decode_ssid(ssid) -> str:
+    # SSIDs are raw bytes on the wire (an "ay"), not necessarily valid UTF-8
+    return bytes(ssid or b"").decode(errors="replace")
+
+
+class NetworkManagerWifiBackend(WifiBackend):
+    def __init__(self, bus_type: Gio.BusType = Gio.BusType.SYSTEM):
+        """`bus_type` is only ever not SYSTEM when pointing this at a mock NM on the session bus."""
+        super().__init__()
+        self._bus = Gio.bus_get_sync(bus_type, None)
+
+        self._nm = self._proxy(NM_PATH, NM_IFACE)
+        if self._nm.get_name_owner() is None:
+            raise RuntimeError("NetworkManager is not running")
+
+        self._device_path: str | None = None
+        self._interface: str | None = None
+        self._wireless: Gio.DBusProxy | None = None
+
+        self._access_points: dict[str, Gio.DBusProxy] = {}
+        self._active_connections: dict[str, Gio.DBusProxy] = {}
+
+        self._nm.connect("g-signal", self._on_nm_signal)
+        self._nm.connect("g-properties-changed", self._on_nm_properties_changed)
+
+        self._find_wifi_device()
+        self._sync_active_connections()
+
+    def _proxy(self, path: str, iface: str) -> Gio.DBusProxy:
+        return Gio.DBusProxy.new_sync(
+            self._bus, Gio.DBusProxyFlags.NONE, None, NM_BUS_NAME, path, iface, None
+        )
+
+    def _proxy_async(self, path: str, iface: str, on_ready) -> None:
+        """Creates the proxy without blocking the main loop, `on_ready(proxy)` gets it"""
+
+        def on_finish(_, result):
+            try:
+                proxy = Gio.DBusProxy.new_finish(result)
+            except GLib.Error as e:
+                logger.warning(f"[NM] {path} vanished: {e.message}")
+                return
+            on_ready(proxy)
+
+        Gio.DBusProxy.new(
+            self._bus, Gio.DBusProxyFlags.NONE, None, NM_BUS_NAME, path, iface, None, on_finish
+        )
+
+    def _call(self, proxy: Gio.DBusProxy, method: str, params: GLib.Variant | None = None):
+        return _unpack(
+            proxy.call_sync(method, params, Gio.DBusCallFlags.NONE, -1, None), ()
+        )
+
+    # devices
+    def _find_wifi_device(self) -> None:
+        (devices,) = self._call(self._nm, "GetDevices")
+        for path in devices:
+            device = self._proxy(path, NM_DEVICE_IFACE)
+            if _unpack(device.get_cached_property("DeviceType")) == NM_DEVICE_TYPE_WIFI:
+                self._set_wifi_device(path, _unpack(device.get_cached_property("Interface")))
+                return
+        logger.warning("WiFi is not supported on this machine")
+
+    def _set_wifi_device(self, path: str, interface: str) -> None:
+        self._device_path = path
+        self._interface = interface
+        self._wireless = self._proxy(path, NM_WIRELESS_IFACE)
+        self._wireless.connect("g-signal", self._on_wireless_signal)
+
+        self._access_points.clear()
+        for ap_path in _unpack(self._wireless.get_cached_property("AccessPoints"), []):
+            self._add_access_point(ap_path)
+
+    def _on_nm_signal(self, proxy, sender, signal_name: str, params: GLib.Variant) -> None:
+        match signal_name:
+            case "DeviceAdded" if self._device_path is None:
+                (path,) = params.unpack()
+                device = self._proxy(path, NM_DEVICE_IFACE)
+                if _unpack(device.get_cached_property("DeviceType")) == NM_DEVICE_TYPE_WIFI:
+                    self._set_wifi_device(path, _unpack(device.get_cached_property("Interface")))
+            case "DeviceRemoved":
+                (path,) = params.unpack()
+                if path == self._device_path:
+                    self._device_path = self._interface = self._wireless = None
+                    self._access_points.clear()
+                    self.emit("access-points-changed")
+
+    def _on_nm_properties_changed(self, proxy, changed: GLib.Variant, invalidated) -> None:
+        changed = changed.unpack()
+        if "WirelessEnabled" in changed:
+            self.emit("enabled-changed", changed["WirelessEnabled"])
+        if "ActiveConnections" in changed:
+            self._sync_active_connections()
+
+    # access points
+    def _add_access_point(self, path: str) -> None:
+        # async so a scan turning up a dozen APs doesn't block the main loop on GetAll calls
+        def on_ready(proxy):
+            self._access_points[path] = proxy
+            self.emit("access-points-changed")
+            # an active connection to this AP can only be matched to its SSID now
+            if path in self._active_ap_paths():
+                self.emit("active-connection-changed")
+
+        self._proxy_async(path, NM_AP_IFACE, on_ready)
+
+    def _on_wireless_signal(self, proxy, sender, signal_name: str, params: GLib.Variant) -> None:
+        match signal_name:
+            case "AccessPointAdded":
+                self._add_access_point(params.unpack()[0])
+            case "AccessPointRemoved":
+                if self._access_points.pop(params.unpack()[0], None) is not None:
+                    self.emit("access-points-changed")
+
+    @staticmethod
+    def _security(ap: Gio.DBusProxy) -> str:
+        if _unpack(ap.get_cached_property("RsnFlags"), 0):
+            return "WPA2"
+        if _unpack(ap.get_cached_property("WpaFlags"), 0):
+            return "WPA1"
+        if _unpack(ap.get_cached_property("Flags"), 0) & NM_802_11_AP_FLAGS_PRIVACY:
+            return "WEP"
+        return "none"
+
+    @staticmethod
+    def _key_mgmt(ap: Gio.DBusProxy) -> str | None:
+        """NM's 802-11-wireless-security.key-mgmt for `ap`, "" if it's open, None for 802.1X"""
+        sec_flags = _unpack(ap.get_cached_property("RsnFlags"), 0) | _unpack(ap.get_cached_property("WpaFlags"), 0)
+        if sec_flags & NM_802_11_AP_SEC_KEY_MGMT_PSK:
+            # also covers WPA2/WPA3 transition networks, PSK works with more drivers
+            return "wpa-psk"
+        if sec_flags & NM_802_11_AP_SEC_KEY_MGMT_SAE:
+            return "sae"
+        if sec_flags & NM_802_11_AP_SEC_KEY_MGMT_OWE:
+            return "owe"
+        if sec_flags & NM_802_11_AP_SEC_KEY_MGMT_802_1X:
+            return None
+        if _unpack(ap.get_cached_property("Flags"), 0) & NM_802_11_AP_FLAGS_PRIVACY:
+            # WEP is key-mgmt "none" with a key
+            return "none"
+        return ""
+
+    @staticmethod
+    def _ssid(ap: Gio.DBusProxy) -> str:
+        return _decode_ssid(_unpack(ap.get_cached_property("Ssid"), b""))
+
+    def _ap_path_for_ssid(self, ssid: str) -> str:
+        for path, ap in list(self._access_points.items()):
+            if self._ssid(ap) == ssid:
+                return path
+        return "/"
+
+    # connections
+    def _sync_active_connections(self) -> None:
+        """Emits active-connection-changed for removals now, and for additions once their proxy is ready"""
+        paths = _unpack(self._nm.get_cached_property("ActiveConnections"), [])
+        removed = [path for path in self._active_connections if path not in paths]
+        for path in removed:
+            del self._active_connections[path]
+        if removed:
+            self.emit("active-connection-changed")
+
+        for path in paths:
+            if path not in self._active_connections:
+                self._proxy_async(path, NM_ACTIVE_CONNECTION_IFACE, self._on_active_connection_ready)
+
+    def _on_active_connection_ready(self, proxy: Gio.DBusProxy) -> None:
+        path = proxy.get_object_path()
+        # it may have gone away again while the proxy was being set up
+        if path in _unpack(self._nm.get_cached_property("ActiveConnections"), []):
+            self._active_connections[path] = proxy
+            self.emit("active-connection-changed")
+
+    def _active_ap_paths(self) -> List[str]:
+        return [
+            _unpack(active.get_cached_property("SpecificObject"), "/")
+            for active in list(self._active_connections.values())
+        ]
+
+    def _active_wifi_connections(self) -> Dict[str, str]:
+        """SSID -> active connection path, for the active wifi connections.
+
+        The SSID comes from the access point the connection is using (its
+        SpecificObject), not from the profile name, which can be anything.
+        """
+        ret = {}
+        for path, active in list(self._active_connections.items()):
+            if _unpack(active.get_cached_property("Type")) != NM_WIRELESS_TYPE:
+                continue
+            ap = self._access_points.get(_unpack(active.get_cached_property("SpecificObject"), "/"))
+            if ap is not None and (ssid := self._ssid(ap)):
+                ret[ssid] = path
+        return ret
+
+    def _saved_connections(self, ssid: str) -> List[tuple[str, dict]]:
+        """Saved wifi profiles for `ssid`, as (path, settings) pairs.
+
+        Matched on the profile's 802-11-wireless.ssid, whatever the profile is named.
+        """
+        settings = self._proxy(NM_SETTINGS_PATH, NM_SETTINGS_IFACE)
+        (paths,) = self._call(settings, "ListConnections")
+        ret = []
+        for path in paths:
+            connection = self._proxy(path, NM_SETTINGS_CONNECTION_IFACE)
+            (conn_settings,) = self._call(connection, "GetSettings")
+            wireless = conn_settings.get(NM_WIRELESS_TYPE)
+            if wireless is not None and _decode_ssid(wireless.get("ssid")) == ssid:
+                ret.append((path, conn_settings))
+        return ret
+
+    # WifiBackend interface
+    def get_wifi_status(self) -> bool:
+        return bool(_unpack(self._nm.get_cached_property("WirelessEnabled"), False))
+
+    def set_wifi_power(self, enabled: bool) -> bool:
+        try:
+            self._call(
+                self._nm,
+                "org.freedesktop.DBus.Properties.Set",
+                GLib.Variant("(ssv)", (NM_IFACE, "WirelessEnabled", GLib.Variant("b", enabled))),
+            )
+            return True
+        except GLib.Error as e:
+            logger.error(f"Failed setting WiFi power: {e.message}")
+            return False
+
+    def request_scan(self) -> None:
+        if self._wireless is None:
+            return
+        try:
+            self._call(self._wireless, "RequestScan", GLib.Variant("(a{sv})", ({},)))
+        except GLib.Error as e:
+            # NM refuses scans requested too soon after the previous one, that's fine
+            logger.info(f"[NM] scan request refused: {e.message}")
+
+    def get_wifi_networks(self) -> List[Dict[str, str]]:
+        if self._wireless is None:
+            return []
+
+        active_ap = _unpack(self._wireless.get_cached_property("ActiveAccessPoint"), "/")
+        networks: dict[str, dict] = {}
+        for path, ap in list(self._access_points.items()):
+            ssid = self._ssid(ap).strip()
+            if not ssid:
+                continue
+            strength = _unpack(ap.get_cached_property("Strength"), 0)
+            in_use = path == active_ap
+
+            # nmcli lists every BSSID, keep only the strongest (or in-use) one per SSID
+            seen = networks.get(ssid)
+            if seen and (seen["in_use"] or (not in_use and int(seen["signal"]) >= strength)):
+                continue
+            networks[ssid] = {
+                "in_use": in_use,
+                "ssid": ssid,
+                "signal": str(strength),
+                "security": self._security(ap),
+            }
+
+        return sorted(
+            networks.values(), key=lambda network: ((not network["in_use"]), network["ssid"])
+        )
+
+    def get_connection_info(self, ssid: str) -> Dict[str, str]:
+        try:
+            saved = self._saved_connections(ssid)
+        except GLib.Error as e:
+            logger.error(f"Failed getting connection info: {e.message}")
+            return {}
+        if not saved:
+            return {}
+        _, conn_settings = saved[0]
+        return {
+            f"{section}.{key}": str(value)
+            for section, values in conn_settings.items()
+            for key, value in values.items()
+        }
+
+    def connect_network(self, ssid: str, password: str = "", remember: bool = True) -> bool:
+        if self._device_path is None:
+            return False
+        try:
+            # First try to connect using saved connection
+            if saved := self._saved_connections(ssid):
+                self._call(
+                    self._nm,
+                    "ActivateConnection",
+                    GLib.Variant("(ooo)", (saved[0][0], self._device_path, "/")),
+                )
+                return True
+
+            ap_path = self._ap_path_for_ssid(ssid)
+            ap = self._access_points.get(ap_path)
+            key_mgmt = self._key_mgmt(ap) if ap is not None else ""
+            if key_mgmt is None:
+                # needs an identity, certificates and an EAP method, none of which the menu asks for
+                logger.error(f"Failed connecting to network: {ssid} uses 802.1X (enterprise) authentication, which isn't supported here")
+                return False
+            if key_mgmt in ("wpa-psk", "sae", "none") and not password:
+                return False
+
+            conn_settings = {
+                "connection": {"id": GLib.Variant("s", ssid), "type": GLib.Variant("s", NM_WIRELESS_TYPE)},
+                NM_WIRELESS_TYPE: {"ssid": GLib.Variant("ay", ssid.encode())},
+            }
+            match key_mgmt:
+                case "wpa-psk" | "sae":
+                    security = {"key-mgmt": GLib.Variant("s", key_mgmt), "psk": GLib.Variant("s", password)}
+                case "none":
+                    security = {
+                        "key-mgmt": GLib.Variant("s", "none"),
+                        "wep-key0": GLib.Variant("s", password),
+                        "wep-key-type": GLib.Variant("u", NM_WEP_KEY_TYPE_KEY),
+                    }
+                case "owe":
+                    security = {"key-mgmt": GLib.Variant("s", "owe")}
+                case _:
+                    security = None
+            if security is not None:
+                conn_settings["802-11-wireless-security"] = security
+            options = {} if remember else {"persist": GLib.Variant("s", "volatile")}
+            self._call(
+                self._nm,
+                "AddAndActivateConnection2",
+                GLib.Variant(
+                    "(a{sa{sv}}ooa{sv})", (conn_settings, self._device_path, ap_path, options)
+                ),
+            )
+            return True
+        except GLib.Error as e:
+            logger.error(f"Failed connecting to network: {e.message}")
+            return False
+
+    def disconnect_network(self, ssid: str) -> bool:
+        path = self._active_wifi_connections().get(ssid)
+        if path is None:
+            logger.error(f"Failed disconnecting from network: {ssid} is not active")
+            return False
+        try:
+            self._call(self._nm, "DeactivateConnection", GLib.Variant("(o)", (path,)))
+            return True
+        except GLib.Error as e:
+            logger.error(f"Failed disconnecting from network: {e.message}")
+            return False
+
+    def forget_network(self, ssid: str) -> bool:
+        try:
+            saved = self._saved_connections(ssid)
+            for path, _ in saved:
+                self._call(self._proxy(path, NM_SETTINGS_CONNECTION_IFACE), "Delete")
+            return bool(saved)
+        except GLib.Error as e:
+            logger.error(f"Failed removing network: {e.message}")
+            return False
+
+    def get_network_speed(self) -> Dict[str, float]:
+        if self._interface is None:
+            return {"rx_bytes": 0, "tx_bytes": 0, "wifi_supported": False}
+        return read_interface_bytes(self._interface)
+
+    def fetch_currently_connected_ssid(self) -> str | None:
+        if self._wireless is None:
+            return None
+        ap = self._access_points.get(_unpack(self._wireless.get_cached_property("ActiveAccessPoint"), "/"))
+        if ap is not None and (ssid := self._ssid(ap)):
+            return ssid
+        return None
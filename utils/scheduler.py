@@ -0,0 +1,171 @@
+"""
+Fires callbacks at deadlines with a single GLib timeout.
+
+Entries sit in a heap and the one timeout is always armed for the earliest of
+them, re-armed whenever that changes. Removing an entry just forgets it, its heap
+slot is skipped when it comes up, so nothing has to be rebuilt.
+
+Deadlines are on `clock`, the wall clock by default. GLib timeouts run on the
+monotonic clock, which doesn't move while the machine is suspended and doesn't
+follow changes to the wall clock. So the timeout never sleeps longer than
+`max_sleep` seconds before it looks at the clock again, and it's re-armed right
+away when logind reports a resume. With a clock that can't jump, like
+`boottime`, `max_sleep` can be None and the only wakeups are the deadlines.
+"""
+
+import heapq
+import itertools
+import time
+from typing import Callable, Hashable
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+from loguru import logger
+
+DEFAULT_MAX_SLEEP = 60
+# wall clock minus monotonic clock moving by more than this is a clock jump
+CLOCK_JUMP_THRESHOLD = 2.0
+
+
+def boottime() -> float:
+    """Monotonic, and unlike time.monotonic() it keeps counting during suspend"""
+    try:
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    except AttributeError:
+        return time.monotonic()
+
+
+class DeadlineScheduler:
+    def __init__(
+        self,
+        callback: Callable[[Hashable], None],
+        max_sleep: float | None = DEFAULT_MAX_SLEEP,
+        clock: Callable[[], float] = time.time,
+    ):
+        # callback(key) runs on the main loop once the key's deadline has passed
+        self.callback = callback
+        self.max_sleep = max_sleep
+        self.clock = clock
+
+        # (due, sequence, key), only valid while _entries[key] == sequence
+        self._heap: list[tuple[float, int, Hashable]] = []
+        # key -> (sequence, due)
+        self._entries: dict[Hashable, tuple[int, float]] = {}
+        self._sequence = itertools.count()
+
+        self._timer_id: int | None = None
+        self._armed_for: float | None = None
+        self._clock_offset = self.clock() - time.monotonic()
+        self._sleep_subscription: int | None = None
+        self._bus: Gio.DBusConnection | None = None
+
+        Gio.bus_get(Gio.BusType.SYSTEM, None, self._on_system_bus)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def due(self, key: Hashable) -> float | None:
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def add(self, key: Hashable, due: float) -> None:
+        """Fire `key` at `due` (a `clock` timestamp), replacing its previous deadline"""
+        sequence = next(self._sequence)
+        self._entries[key] = (sequence, due)
+        heapq.heappush(self._heap, (due, sequence, key))
+        self._compact()
+        self._arm()
+
+    def remove(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._arm()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._heap.clear()
+        self._arm()
+
+    def _peek(self) -> tuple[float, Hashable] | None:
+        while self._heap:
+            due, sequence, key = self._heap[0]
+            if self._entries.get(key, (None,))[0] == sequence:
+                return due, key
+            heapq.heappop(self._heap)
+        return None
+
+    def _compact(self) -> None:
+        # stale entries are normally popped as they reach the top, this only matters
+        # when the same keys get rescheduled far into the future over and over
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [(due, sequence, key) for key, (sequence, due) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _arm(self) -> None:
+        head = self._peek()
+        wake_at = None
+        if head is not None:
+            wake_at = head[0]
+            if self.max_sleep is not None:
+                wake_at = min(wake_at, self.clock() + self.max_sleep)
+        if wake_at == self._armed_for and self._timer_id is not None:
+            return
+
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        self._armed_for = wake_at
+        if wake_at is not None:
+            delay_ms = max(0, int((wake_at - self.clock()) * 1000))
+            self._timer_id = GLib.timeout_add(delay_ms, self._on_timeout)
+
+    def _on_timeout(self) -> bool:
+        self._timer_id = None
+        self._armed_for = None
+
+        offset = self.clock() - time.monotonic()
+        if abs(offset - self._clock_offset) > CLOCK_JUMP_THRESHOLD:
+            # suspend or a clock change. deadlines are on our clock, so just fire what's due
+            logger.info(f"[Scheduler] clock moved {offset - self._clock_offset:+.0f}s, rechecking deadlines")
+        self._clock_offset = offset
+
+        now = self.clock()
+        while (head := self._peek()) is not None and head[0] <= now:
+            due, key = head
+            heapq.heappop(self._heap)
+            del self._entries[key]
+            try:
+                self.callback(key)
+            except Exception as e:
+                logger.error(f"[Scheduler] callback for {key} failed: {e}")
+        self._arm()
+        return False
+
+    def _on_system_bus(self, _, result) -> None:
+        try:
+            self._bus = Gio.bus_get_finish(result)
+        except GLib.Error as e:
+            logger.warning(f"[Scheduler] no system bus, resume won't be noticed right away: {e.message}")
+            return
+        self._sleep_subscription = self._bus.signal_subscribe(
+            "org.freedesktop.login1",
+            "org.freedesktop.login1.Manager",
+            "PrepareForSleep",
+            "/org/freedesktop/login1",
+            None,
+            Gio.DBusSignalFlags.NONE,
+            self._on_prepare_for_sleep,
+        )
+
+    def _on_prepare_for_sleep(self, connection, sender, path, interface, signal, parameters) -> None:
+        (going_to_sleep,) = parameters.unpack()
+        if not going_to_sleep:
+            # the monotonic timeout slept through the suspend, check again now
+            if self._timer_id is not None:
+                GLib.source_remove(self._timer_id)
+                self._timer_id = None
+            self._on_timeout()
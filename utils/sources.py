@@ -0,0 +1,75 @@
+"""
+Registry of shared data sources (services, playerctl streams, ...).
+
+Modules register a factory instead of creating the source at import, so importing
+them costs nothing and spawns nothing. A source is created the first time it's
+asked for. Sources registered with a `stop` function are reference counted
+through acquire/release and stopped again when the last user releases them;
+the rest live for the rest of the session once created.
+"""
+
+from typing import Any, Callable
+
+from loguru import logger
+
+
+class SourceRegistry:
+    def __init__(self):
+        # name -> (factory, stop)
+        self._factories: dict[str, tuple[Callable[[], Any], Callable[[Any], None] | None]] = {}
+        self._instances: dict[str, Any] = {}
+        self._users: dict[str, int] = {}
+
+    def register(
+        self, name: str, factory: Callable[[], Any], stop: Callable[[Any], None] | None = None
+    ) -> None:
+        if name in self._factories:
+            raise ValueError(f"data source {name} is already registered")
+        self._factories[name] = (factory, stop)
+
+    def is_running(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Any:
+        """The source, created if it isn't running yet. Not reference counted."""
+        if (instance := self._instances.get(name)) is not None:
+            return instance
+        try:
+            factory, _ = self._factories[name]
+        except KeyError:
+            raise KeyError(f"unknown data source {name}") from None
+        logger.info(f"[Sources] starting {name}")
+        instance = self._instances[name] = factory()
+        return instance
+
+    def acquire(self, name: str) -> Any:
+        """Like get, and keeps the source running until the matching release"""
+        instance = self.get(name)
+        self._users[name] = self._users.get(name, 0) + 1
+        return instance
+
+    def release(self, name: str) -> None:
+        users = self._users.get(name, 0) - 1
+        if users > 0:
+            self._users[name] = users
+            return
+        self._users.pop(name, None)
+
+        _, stop = self._factories[name]
+        if stop is None or (instance := self._instances.pop(name, None)) is None:
+            return
+        logger.info(f"[Sources] stopping {name}, no users left")
+        try:
+            stop(instance)
+        except Exception as e:
+            logger.error(f"[Sources] failed to stop {name}: {e}")
+
+
+_registry: SourceRegistry | None = None
+
+
+def get_source_registry() -> SourceRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SourceRegistry()
+    return _registry
@@ -0,0 +1,122 @@
+"""
+Write-behind persistence for widget state.
+
+Widgets call `write(path, serialize)` whenever their state changes. Nothing is
+written right away: calls for the same path are debounced and only the last one
+counts, so a burst of edits turns into one write. `serialize` runs on the main
+thread when the window closes (it usually reads widget state), and the bytes are
+handed to a single writer thread that writes a temp file, optionally fsyncs it
+and renames it over the target, so a crash mid-write never leaves a truncated
+file behind.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+DEFAULT_DEBOUNCE_MS = 250
+# a path that keeps changing is still written at least this often
+DEFAULT_MAX_DELAY_MS = 1000
+
+Serializer = Callable[[], str | bytes]
+
+
+def write_atomic(path: str, data: str | bytes, fsync: bool = True) -> None:
+    if isinstance(data, str):
+        data = data.encode()
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as h:
+        h.write(data)
+        if fsync:
+            h.flush()
+            os.fsync(h.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        # make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class WriteBehindStore:
+    def __init__(self, debounce_ms: int = DEFAULT_DEBOUNCE_MS, max_delay_ms: int = DEFAULT_MAX_DELAY_MS):
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+
+        # main thread: path -> [timer id, serializer, fsync, first queued at]
+        self._scheduled: dict[str, list] = {}
+
+        # writer thread: path -> (data, fsync), only the newest data per path
+        self._queued: dict[str, tuple[bytes | str, bool]] = {}
+        self._writing: int = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._writer, name="store-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: str, serialize: Serializer, fsync: bool = True) -> None:
+        """Persist `serialize()` to `path` soon. Main thread only."""
+        now = time.monotonic()
+        if (scheduled := self._scheduled.get(path)) is not None:
+            GLib.source_remove(scheduled[0])
+            first_queued = scheduled[3]
+        else:
+            first_queued = now
+
+        elapsed_ms = (now - first_queued) * 1000
+        delay = max(0, min(self.debounce_ms, self.max_delay_ms - elapsed_ms))
+        timer_id = GLib.timeout_add(int(delay), self._flush_path, path)
+        self._scheduled[path] = [timer_id, serialize, fsync, first_queued]
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Write everything pending now and wait for it, e.g. before exiting"""
+        for path in list(self._scheduled):
+            GLib.source_remove(self._scheduled[path][0])
+            self._flush_path(path)
+        with self._cond:
+            self._cond.wait_for(lambda: not self._queued and not self._writing, timeout)
+
+    def _flush_path(self, path: str) -> bool:
+        _, serialize, fsync, _ = self._scheduled.pop(path)
+        try:
+            data = serialize()
+        except Exception as e:
+            logger.error(f"[Store] unable to serialize {path}: {e}")
+            return False
+        with self._cond:
+            self._queued[path] = (data, fsync)
+            self._cond.notify_all()
+        return False
+
+    def _writer(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queued)
+                path = next(iter(self._queued))
+                data, fsync = self._queued.pop(path)
+                self._writing += 1
+            try:
+                write_atomic(path, data, fsync)
+            except OSError as e:
+                logger.error(f"[Store] unable to write {path}: {e}")
+            finally:
+                with self._cond:
+                    self._writing -= 1
+                    self._cond.notify_all()
+
+
+_store: WriteBehindStore | None = None
+
+
+def get_store() -> WriteBehindStore:
+    global _store
+    if _store is None:
+        _store = WriteBehindStore()
+    return _store
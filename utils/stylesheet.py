@@ -0,0 +1,116 @@
+"""
+Keeps exactly one Gtk.CssProvider per stylesheet. Reloading parses into a fresh
+provider first and only swaps it in (removing the old one) if that worked, so a
+half-saved file never leaves the shell unstyled and providers don't pile up on
+the screen with every save.
+"""
+
+import os
+import time
+from typing import Callable
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gdk", "3.0")
+from gi.repository import Gdk, GLib, Gtk
+from loguru import logger
+
+from utils.theme_compiler import compile_stylesheet
+
+DEFAULT_DEBOUNCE_MS = 150
+
+
+class StylesheetManager:
+    def __init__(
+        self,
+        priority: int = Gtk.STYLE_PROVIDER_PRIORITY_USER,
+        debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+        compiler: Callable[[str], str] | None = None,
+    ):
+        # compiler(source) -> path of the file GTK should actually parse
+        self.compiler = compiler
+        self.priority = priority
+        self.debounce_ms = debounce_ms
+        self._providers: dict[str, Gtk.CssProvider] = {}
+        self._pending: set[str] = set()
+        self._timer_id: int | None = None
+
+    @property
+    def sources(self) -> list[str]:
+        return list(self._providers)
+
+    def load(self, path: str) -> bool:
+        """Parse `path` and swap it in for its previous provider. Main thread only."""
+        path = os.path.realpath(path)
+        css_path = path
+        compile_ms = 0.0
+        if self.compiler is not None:
+            start = time.perf_counter()
+            try:
+                css_path = self.compiler(path)
+            except Exception as e:
+                logger.warning(f"[Style] unable to compile {path}, loading it as is: {e}")
+            compile_ms = (time.perf_counter() - start) * 1000
+
+        provider = Gtk.CssProvider()
+        start = time.perf_counter()
+        try:
+            provider.load_from_path(css_path)
+        except GLib.Error as e:
+            logger.error(f"[Style] failed to parse {path}, keeping the previous one: {e.message}")
+            return False
+        parse_ms = (time.perf_counter() - start) * 1000
+
+        screen = Gdk.Screen.get_default()
+        swap_start = time.perf_counter()
+        if (old := self._providers.get(path)) is not None:
+            Gtk.StyleContext.remove_provider_for_screen(screen, old)
+        Gtk.StyleContext.add_provider_for_screen(screen, provider, self.priority)
+        self._providers[path] = provider
+
+        def report_restyle():
+            # runs after the redraw that picked up the new provider
+            restyle_ms = (time.perf_counter() - swap_start) * 1000
+            logger.info(f"[Style] loaded {path}: compile {compile_ms:.1f} ms, parse {parse_ms:.1f} ms, restyle {restyle_ms:.1f} ms")
+            return False
+
+        GLib.idle_add(report_restyle, priority=GLib.PRIORITY_DEFAULT_IDLE)
+        return True
+
+    def unload(self, path: str) -> None:
+        path = os.path.realpath(path)
+        if (provider := self._providers.pop(path, None)) is not None:
+            Gtk.StyleContext.remove_provider_for_screen(Gdk.Screen.get_default(), provider)
+
+    def queue_reload(self, path: str) -> None:
+        """Reload `path` soon. Safe from any thread, bursts of calls end up in one reload."""
+        GLib.idle_add(self._schedule, path)
+
+    def reload_all(self) -> None:
+        for path in self._providers:
+            self.queue_reload(path)
+
+    def _schedule(self, path: str) -> bool:
+        self._pending.add(path)
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add(self.debounce_ms, self._flush)
+        return False
+
+    def _flush(self) -> bool:
+        self._timer_id = None
+        pending, self._pending = self._pending, set()
+        for path in pending:
+            self.load(path)
+        return False
+
+
+_manager: StylesheetManager | None = None
+
+
+def get_stylesheet_manager() -> StylesheetManager:
+    global _manager
+    if _manager is None:
+        _manager = StylesheetManager(compiler=compile_stylesheet)
+    return _manager
@@ -0,0 +1,174 @@
+"""
+Flattens a stylesheet and everything it @imports into a single CSS file, with
+@define-color references resolved to their values, and caches the result.
+
+The cache key is a hash of the contents of every file in the import graph.
+Contents are only re-hashed when a file's mtime/size changed, so checking the
+cache costs a stat per file. Since the key is content based, switching back to a
+theme that was already compiled is a cache hit even though set_theme rewrote
+current_theme.css in between. Only the MAX_ARTIFACTS most recently used results
+are kept, older ones are deleted whenever a new one is written.
+
+`python -m utils.theme_compiler` compiles every shipped theme and prints timings.
+"""
+
+import hashlib
+import os
+import re
+
+from gi.repository import GLib
+from loguru import logger
+
+THEME_CACHE_DIR = os.path.join(GLib.get_user_cache_dir(), "goblin", "themes")
+# every theme edit or switch makes a new artifact, enough to flip between a few themes
+MAX_ARTIFACTS = 8
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+IMPORT_RE = re.compile(r"""@import\s+(?:url\(\s*)?["']?([^"')\s;]+)["']?\s*\)?\s*;""")
+DEFINE_COLOR_RE = re.compile(r"@define-color\s+([\w-]+)\s+([^;]+);")
+COLOR_REF_RE = re.compile(r"@([\w-]+)")
+
+# path -> ((mtime_ns, size), sha1 of contents)
+_hash_memo: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def _read(path: str) -> str:
+    with open(path, "r") as h:
+        return COMMENT_RE.sub("", h.read())
+
+
+def _content_hash(path: str) -> str:
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if (memo := _hash_memo.get(path)) is not None and memo[0] == stamp:
+        return memo[1]
+    with open(path, "rb") as h:
+        digest = hashlib.sha1(h.read()).hexdigest()
+    _hash_memo[path] = (stamp, digest)
+    return digest
+
+
+def _resolve_import(target: str, importer: str) -> str:
+    target = os.path.expanduser(target.removeprefix("file://"))
+    return os.path.realpath(os.path.join(os.path.dirname(importer), target))
+
+
+def import_graph(entry: str) -> list[str]:
+    """Every file reachable from `entry` through @import, entry first"""
+    seen: list[str] = []
+    stack = [os.path.realpath(entry)]
+    while stack:
+        path = stack.pop()
+        if path in seen or not os.path.isfile(path):
+            continue
+        seen.append(path)
+        for target in IMPORT_RE.findall(_read(path)):
+            stack.append(_resolve_import(target, path))
+    return seen
+
+
+def flatten(entry: str) -> str:
+    colors: dict[str, str] = {}
+    rules: list[str] = []
+    unresolved: list[str] = []
+    visited: set[str] = set()
+
+    def inline(path: str) -> None:
+        if path in visited:
+            return
+        visited.add(path)
+        css = _read(path)
+
+        def replace_import(match: re.Match) -> str:
+            target = _resolve_import(match.group(1), path)
+            if not os.path.isfile(target):
+                # leave it to GTK, same as before it was compiled. imports have to come first
+                unresolved.append(match.group(0))
+                return ""
+            inline(target)
+            return ""
+
+        css = IMPORT_RE.sub(replace_import, css)
+        for name, value in DEFINE_COLOR_RE.findall(css):
+            colors[name] = value.strip()
+        css = DEFINE_COLOR_RE.sub("", css)
+        if css.strip():
+            rules.append(css.strip())
+
+    inline(os.path.realpath(entry))
+
+    def substitute(text: str, depth: int = 0) -> str:
+        def replace_ref(match: re.Match) -> str:
+            value = colors.get(match.group(1))
+            if value is None or depth > 8:
+                return match.group(0)
+            return substitute(value, depth + 1)
+
+        return COLOR_REF_RE.sub(replace_ref, text)
+
+    resolved = {name: substitute(value) for name, value in colors.items()}
+    # keep the definitions, inline styles elsewhere in the shell refer to them by name
+    header = [f"@define-color {name} {value};" for name, value in resolved.items()]
+    return "\n".join(unresolved + header + [substitute(css) for css in rules]) + "\n"
+
+
+def _prune(cache_dir: str, keep: int) -> None:
+    """Delete all but the `keep` most recently used artifacts"""
+    try:
+        artifacts = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".css")]
+        artifacts.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in artifacts[keep:]:
+            os.remove(entry.path)
+    except OSError as e:
+        logger.warning(f"[Theme] unable to prune compiled themes: {e}")
+
+
+def compile_stylesheet(entry: str, cache_dir: str = THEME_CACHE_DIR, max_artifacts: int = MAX_ARTIFACTS) -> str:
+    """Path of the flattened version of `entry`, compiled now if not cached yet"""
+    graph = import_graph(entry)
+    key = hashlib.sha1(
+        "\n".join(f"{path}:{_content_hash(path)}" for path in graph).encode()
+    ).hexdigest()[:16]
+    artifact = os.path.join(cache_dir, f"{key}.css")
+    if os.path.isfile(artifact):
+        try:
+            # mtime doubles as the last use, for _prune
+            os.utime(artifact)
+        except OSError:
+            pass
+        return artifact
+
+    css = flatten(entry)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{artifact}.tmp"
+    with open(tmp_path, "w") as h:
+        h.write(css)
+    os.replace(tmp_path, artifact)
+    logger.info(f"[Theme] compiled {entry} -> {artifact}")
+    _prune(cache_dir, max_artifacts)
+    return artifact
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    themes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "styles", "themes")
+    themes = [
+        os.path.join(root, name)
+        for root, _, files in os.walk(themes_dir)
+        for name in files
+        if name.endswith(".css")
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        for theme in themes:
+            compile_stylesheet(theme, cache_dir, max_artifacts=len(themes))
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for theme in themes:
+            compile_stylesheet(theme, cache_dir, max_artifacts=len(themes))
+        warm = time.perf_counter() - start
+
+    print(f"{len(themes)} themes: cold {cold * 1000:.1f} ms, cached {warm * 1000:.1f} ms")
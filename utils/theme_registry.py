@@ -0,0 +1,282 @@
+"""
+Index of every theme under styles/themes: name, path, palette and whether it's a
+dark theme. The index is persisted, and on startup only the theme directories are
+stat'ed, a directory is rescanned only if its mtime moved. While running it's
+kept up to date from file watch events, one theme at a time. Themes rewritten in
+place while the shell wasn't running don't move their directory's mtime, those
+are caught by checking every file's mtime and size once the main loop is idle.
+"""
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+
+import gi
+
+gi.require_version("GObject", "2.0")
+from gi.repository import GLib, GObject
+from loguru import logger
+
+from utils.file_watch import get_file_watcher
+
+THEMES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "styles", "themes")
+INDEX_PATH = os.path.join(GLib.get_user_cache_dir(), "goblin", "theme-index.json")
+
+# written by yaml2css next to the themes it builds
+SCHEME_INDEX_FILE = "index.json"
+
+DEFINE_COLOR_RE = re.compile(r"@define-color\s+([\w-]+)\s+(#[0-9a-fA-F]{3,8})\s*;")
+
+
+@dataclass
+class ThemeInfo:
+    name: str
+    path: str
+    mtime: float
+    size: int = 0
+    palette: dict[str, str] = field(default_factory=dict)
+    dark: bool | None = None
+    # display name from yaml2css, if it built this theme
+    scheme: str = ""
+
+
+def _luminance(hex_color: str) -> float:
+    hex_color = hex_color.lstrip("#")
+    if len(hex_color) in (3, 4):
+        hex_color = "".join(c * 2 for c in hex_color)
+    r, g, b = (int(hex_color[i : i + 2], 16) / 255 for i in (0, 2, 4))
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def read_theme(name: str, path: str, scheme: str = "") -> ThemeInfo:
+    with open(path) as h:
+        palette = dict(DEFINE_COLOR_RE.findall(h.read()))
+    stat = os.stat(path)
+    # base00 is the default background in base16
+    background = palette.get("base00")
+    return ThemeInfo(
+        name=name,
+        path=path,
+        mtime=stat.st_mtime,
+        size=stat.st_size,
+        palette=palette,
+        dark=_luminance(background) < 0.5 if background else None,
+        scheme=scheme,
+    )
+
+
+def fuzzy_score(query: str, name: str) -> float | None:
+    """Higher is better, None if `query` isn't a subsequence of `name`"""
+    query, name = query.lower(), name.lower()
+    if not query:
+        return 0.0
+    if (index := name.find(query)) != -1:
+        # substring matches first, earlier and at a word boundary is better
+        boundary = index == 0 or name[index - 1] in "/-_"
+        return 100 - index + (50 if boundary else 0)
+
+    score, position, streak = 0.0, 0, 0
+    for char in query:
+        found = name.find(char, position)
+        if found == -1:
+            return None
+        streak = streak + 1 if found == position else 0
+        boundary = found == 0 or name[found - 1] in "/-_"
+        score += 1 + streak + (3 if boundary else 0)
+        position = found + 1
+    # between equal matches prefer the one with less left over
+    return score - len(name) / 100
+
+
+class ThemeRegistry(GObject.Object):
+    __gsignals__ = {"changed": (GObject.SignalFlags.RUN_FIRST, None, ())}
+
+    def __init__(self, themes_dir: str = THEMES_DIR, index_path: str = INDEX_PATH):
+        super().__init__()
+        self.themes_dir = os.path.realpath(themes_dir)
+        self.index_path = index_path
+
+        self._themes: dict[str, ThemeInfo] = {}
+        # directory -> mtime when it was last scanned
+        self._dirs: dict[str, float] = {}
+        self._save_id: int | None = None
+        self._watching = False
+
+        self._load_index()
+        self._refresh_dirs()
+        self._watch()
+        GLib.idle_add(self._verify_files, priority=GLib.PRIORITY_LOW)
+
+    # lookups
+    def get(self, name: str) -> ThemeInfo | None:
+        return self._themes.get(name)
+
+    def names(self) -> list[str]:
+        return sorted(self._themes)
+
+    def themes(self, dark: bool | None = None) -> list[ThemeInfo]:
+        return [
+            self._themes[name]
+            for name in self.names()
+            if dark is None or self._themes[name].dark == dark
+        ]
+
+    def search(self, query: str, limit: int = 20) -> list[ThemeInfo]:
+        scored = [
+            (score, name)
+            for name in self._themes
+            if (score := fuzzy_score(query, name)) is not None
+        ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._themes[name] for _, name in scored[:limit]]
+
+    # index maintenance
+    def _name_for(self, path: str) -> str:
+        return os.path.splitext(os.path.relpath(path, self.themes_dir))[0]
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path) as h:
+                data = json.load(h)
+            self._dirs = {str(directory): float(mtime) for directory, mtime in data["dirs"].items()}
+            self._themes = {theme["name"]: ThemeInfo(**theme) for theme in data["themes"]}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._dirs, self._themes = {}, {}
+
+    def _refresh_dirs(self) -> None:
+        """Rescan only the directories whose mtime moved since the index was written"""
+        changed = False
+        if not self._dirs:
+            # no index yet, scan everything
+            self._dirs = {self.themes_dir: 0.0}
+        for directory in list(self._dirs):
+            if directory not in self._dirs:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                self._drop_dir(directory)
+                changed = True
+                continue
+            if self._dirs[directory] != mtime:
+                changed |= self._rescan(directory)
+
+        if changed or not os.path.isfile(self.index_path):
+            self._save()
+
+    def _verify_files(self) -> bool:
+        """Re-read the themes rewritten in place since the index was written"""
+        changed = False
+        for theme in list(self._themes.values()):
+            if os.path.exists(theme.path):
+                changed |= self._update(theme.path)
+        if changed:
+            self.emit("changed")
+            self._queue_save()
+        return False
+
+    def _drop_dir(self, directory: str) -> None:
+        del self._dirs[directory]
+        for name in [n for n, t in self._themes.items() if os.path.dirname(t.path) == directory]:
+            del self._themes[name]
+
+    def _scheme_names(self, directory: str) -> dict[str, str]:
+        try:
+            with open(os.path.join(directory, SCHEME_INDEX_FILE)) as h:
+                return {theme["file"]: theme["scheme"] for theme in json.load(h)}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _rescan(self, directory: str) -> bool:
+        present = set()
+        changed = False
+        schemes = self._scheme_names(directory)
+        self._dirs[directory] = os.stat(directory).st_mtime
+        for entry in os.scandir(directory):
+            if entry.is_dir() and not entry.name.startswith(".") and entry.path not in self._dirs:
+                changed |= self._rescan(entry.path)
+                if self._watching:
+                    get_file_watcher().watch_dir(entry.path, self._on_file_event)
+                continue
+            if not (entry.is_file() and entry.name.endswith(".css")):
+                continue
+            present.add(entry.path)
+            changed |= self._update(entry.path, schemes.get(entry.name, ""))
+        for name in [n for n, t in self._themes.items() if os.path.dirname(t.path) == directory]:
+            if self._themes[name].path not in present:
+                del self._themes[name]
+                changed = True
+        return changed
+
+    def _update(self, path: str, scheme: str | None = None) -> bool:
+        name = self._name_for(path)
+        known = self._themes.get(name)
+        if scheme is None:
+            scheme = known.scheme if known is not None else ""
+        try:
+            stat = os.stat(path)
+            if (
+                known is not None
+                and (known.mtime, known.size) == (stat.st_mtime, stat.st_size)
+                and known.scheme == scheme
+            ):
+                return False
+            self._themes[name] = read_theme(name, path, scheme)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Themes] unable to read {path}: {e}")
+            return False
+        return True
+
+    def _watch(self) -> None:
+        watcher = get_file_watcher()
+        for directory in self._dirs:
+            watcher.watch_dir(directory, self._on_file_event)
+        self._watching = True
+
+    def _on_file_event(self, path: str, event: str, dest: str | None) -> None:
+        if os.path.basename(path) == SCHEME_INDEX_FILE:
+            # yaml2css rebuilt this directory, pick up the new scheme names
+            changed = self._rescan(os.path.dirname(path))
+        elif not path.endswith(".css"):
+            return
+        elif event == "changed":
+            changed = self._update(path)
+        else:
+            changed = self._themes.pop(self._name_for(path), None) is not None
+            if dest is not None and dest.endswith(".css"):
+                changed |= self._update(dest)
+        # this change is accounted for, don't rescan the directory on the next start
+        try:
+            self._dirs[os.path.dirname(path)] = os.stat(os.path.dirname(path)).st_mtime
+        except OSError:
+            pass
+        if changed:
+            self.emit("changed")
+            self._queue_save()
+
+    def _queue_save(self) -> None:
+        if self._save_id is None:
+            self._save_id = GLib.timeout_add_seconds(2, self._save)
+
+    def _save(self) -> bool:
+        self._save_id = None
+        data = {"dirs": self._dirs, "themes": [asdict(theme) for theme in self._themes.values()]}
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(f"{self.index_path}.tmp", "w") as h:
+                json.dump(data, h)
+            os.replace(f"{self.index_path}.tmp", self.index_path)
+        except OSError as e:
+            logger.warning(f"[Themes] unable to write theme index: {e}")
+        return False
+
+
+_registry: ThemeRegistry | None = None
+
+
+def get_theme_registry() -> ThemeRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ThemeRegistry()
+    return _registry
@@ -0,0 +1,54 @@
+from typing import Iterable, Protocol
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+
+class Pausable(Protocol):
+    def pause(self) -> None: ...
+
+    def resume(self) -> None: ...
+
+
+class VisibilityGate:
+    """Pauses pollers while a window is hidden, resumes them when it's shown again.
+
+    Pollers are anything with `pause()` and `resume()`. `resume()` is expected to
+    refresh immediately rather than wait for its next tick, since whatever it shows
+    has gone stale while the window was hidden.
+    """
+
+    def __init__(self, window: Gtk.Window, hide_signals: Iterable[str] = ()):
+        self._pollers: list[Pausable] = []
+        self._active: bool = window.get_mapped()
+
+        window.connect("map", lambda *_: self.resume())
+        window.connect("unmap", lambda *_: self.pause())
+        for signal in hide_signals:
+            window.connect(signal, lambda *_: self.pause())
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def register(self, *pollers: Pausable) -> None:
+        for poller in pollers:
+            self._pollers.append(poller)
+            if not self._active:
+                poller.pause()
+
+    def pause(self) -> None:
+        if not self._active:
+            return
+        self._active = False
+        for poller in self._pollers:
+            poller.pause()
+
+    def resume(self) -> None:
+        if self._active:
+            return
+        self._active = True
+        for poller in self._pollers:
+            poller.resume()
@@ -1,8 +1,14 @@
 import subprocess
+from abc import ABCMeta, abstractmethod
 from typing import List, Dict
 from loguru import logger
 import re
 
+import gi
+
+gi.require_version("GObject", "2.0")
+from gi.repository import GObject
+
 
 def get_wifi_status() -> bool:
     """Get WiFi power status
@@ -20,17 +26,22 @@ def get_wifi_status() -> bool:
         return False
 
 
-def set_wifi_power(enabled: bool) -> None:
+def set_wifi_power(enabled: bool) -> bool:
     """Set WiFi power state
 
     Args:
         enabled (bool): True to enable, False to disable
+
+    Returns:
+        bool: True if the radio state was changed successfully
     """
     try:
         state = "on" if enabled else "off"
         subprocess.run(["nmcli", "radio", "wifi", state], check=True)
+        return True
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed setting WiFi power: {e}")
+        return False
 
 
 def get_wifi_networks() -> List[Dict[str, str]]:
@@ -207,8 +218,22 @@ def get_network_speed() -> Dict[str, float]:
             return {"rx_bytes": 0, "tx_bytes": 0, "wifi_supported": False}
 
         interface = wifi_lines[0].split(":")[0]
+        return read_interface_bytes(interface)
+    except Exception as e:
+        logger.error(f"Failed getting network speed: {e}")
+        return {"rx_bytes": 0, "tx_bytes": 0, "wifi_supported": False}
+
+
+def read_interface_bytes(interface: str) -> Dict[str, float]:
+    """Read the rx/tx byte counters of a network interface from sysfs
+
+    Args:
+        interface (str): Interface name, e.g. wlan0
 
-        # Get current bytes
+    Returns:
+        Dict[str, float]: Dictionary with rx_bytes, tx_bytes and wifi_supported
+    """
+    try:
         with open(f"/sys/class/net/{interface}/statistics/rx_bytes") as f:
             rx_bytes = int(f.read())
         with open(f"/sys/class/net/{interface}/statistics/tx_bytes") as f:
@@ -240,3 +265,111 @@ def fetch_currently_connected_ssid() -> str | None:
 
         else:
             return None
+
+
+# abc.ABC can't be mixed into a GObject class as is, the metaclasses conflict
+class _GObjectABCMeta(type(GObject.Object), ABCMeta):
+    def __call__(cls, *args, **kwargs):
+        # GObject's constructor skips object.__new__, which is where abstract
+        # classes are normally refused
+        if cls.__abstractmethods__:
+            missing = ", ".join(sorted(cls.__abstractmethods__))
+            raise TypeError(f"Can't instantiate abstract class {cls.__name__} without {missing}")
+        return super().__call__(*args, **kwargs)
+
+
+class WifiBackend(GObject.Object, metaclass=_GObjectABCMeta):
+    """Interface shared by the wifi backends, see `get_wifi_backend`.
+
+    Backends that can watch state (NetworkManager over D-Bus) emit the signals below
+    on the main loop; polling backends (nmcli) never do.
+    """
+
+    __gsignals__ = {
+        "enabled-changed": (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+        "access-points-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        "active-connection-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    @abstractmethod
+    def get_wifi_status(self) -> bool: ...
+
+    @abstractmethod
+    def set_wifi_power(self, enabled: bool) -> bool: ...
+
+    @abstractmethod
+    def request_scan(self) -> None: ...
+
+    @abstractmethod
+    def get_wifi_networks(self) -> List[Dict[str, str]]: ...
+
+    @abstractmethod
+    def get_connection_info(self, ssid: str) -> Dict[str, str]: ...
+
+    @abstractmethod
+    def connect_network(self, ssid: str, password: str = "", remember: bool = True) -> bool: ...
+
+    @abstractmethod
+    def disconnect_network(self, ssid: str) -> bool: ...
+
+    @abstractmethod
+    def forget_network(self, ssid: str) -> bool: ...
+
+    @abstractmethod
+    def get_network_speed(self) -> Dict[str, float]: ...
+
+    @abstractmethod
+    def fetch_currently_connected_ssid(self) -> str | None: ...
+
+
+class NmcliWifiBackend(WifiBackend):
+    """Fallback backend, forks nmcli for everything."""
+
+    def get_wifi_status(self) -> bool:
+        return get_wifi_status()
+
+    def set_wifi_power(self, enabled: bool) -> bool:
+        return set_wifi_power(enabled)
+
+    def request_scan(self) -> None:
+        # `nmcli device wifi list` already rescans when its results are stale
+        pass
+
+    def get_wifi_networks(self) -> List[Dict[str, str]]:
+        return get_wifi_networks()
+
+    def get_connection_info(self, ssid: str) -> Dict[str, str]:
+        return get_connection_info(ssid)
+
+    def connect_network(self, ssid: str, password: str = "", remember: bool = True) -> bool:
+        return connect_network(ssid, password=password, remember=remember)
+
+    def disconnect_network(self, ssid: str) -> bool:
+        return disconnect_network(ssid)
+
+    def forget_network(self, ssid: str) -> bool:
+        return forget_network(ssid)
+
+    def get_network_speed(self) -> Dict[str, float]:
+        return get_network_speed()
+
+    def fetch_currently_connected_ssid(self) -> str | None:
+        return fetch_currently_connected_ssid()
+
+
+_backend: WifiBackend | None = None
+
+
+def get_wifi_backend() -> WifiBackend:
+    """Shared wifi backend. NetworkManager over D-Bus if it's reachable, nmcli otherwise."""
+    global _backend
+    if _backend is None:
+        try:
+            from utils.networkmanager import NetworkManagerWifiBackend
+
+            _backend = NetworkManagerWifiBackend()
+        except Exception as e:
+            logger.warning(f"NetworkManager D-Bus unavailable ({e}), falling back to nmcli")
+            _backend = NmcliWifiBackend()
+    return _backend
+
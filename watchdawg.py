@@ -1,28 +1,22 @@
 import os
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-import time
 
-from user.parse_config import USER_CONFIG_PATH
+from gi.repository import GLib
 
-class ConfigEventHandler(FileSystemEventHandler):
-    def on_modified(self, event):
-        if os.path.basename(event.src_path) == "config.json":
-            print("ERMMMMM Config modification alert")
+from user.parse_config import USER_CONFIG_FILE
+from utils.file_watch import get_file_watcher
 
 
-if __name__ == "__main__":
-    path = os.path.realpath(USER_CONFIG_PATH) # Directory to monitor (current directory in this case)
-    event_handler = ConfigEventHandler()
-    observer = Observer()
-    observer.schedule(event_handler, path, recursive=True)
+def on_config_changed(path, event, dest):
+    if event == "changed":
+        print("ERMMMMM Config modification alert")
+
 
-    # Start the observer
-    observer.start()
+if __name__ == "__main__":
+    path = os.path.realpath(USER_CONFIG_FILE)
+    get_file_watcher().watch_file(path, on_config_changed)
 
+    loop = GLib.MainLoop()
     try:
-        while True:
-            time.sleep(1)
+        loop.run()
     except KeyboardInterrupt:
-        observer.stop()
-    observer.join()
+        loop.quit()
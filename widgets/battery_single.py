@@ -1,14 +1,11 @@
-import threading 
-import time 
-
 from widgets.circular_indicator import CircularIndicator
 from user.icons import Icons
 
 import gi 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, GLib
+from gi.repository import Gtk
 
-import psutil
+from services import acquire_service, release_service
 
 
 class BatterySingle(Gtk.Box):
@@ -24,26 +21,13 @@ class BatterySingle(Gtk.Box):
             icon=Icons.BAT.value,
         )
 
-        self._running = True
-
-        thread = threading.Thread(target=self.psutil_poll, daemon=True)
-        thread.start()
+        self.metrics = acquire_service("metrics")
+        self._handler_id = self.metrics.subscribe("battery", self.update_status)
+        self.connect("destroy", self.on_destroy)
 
         self.add(self.battery_progress_bar)
 
-    def psutil_poll(self):
-        while self._running:
-            value = {}
-            if bat_sen := psutil.sensors_battery():
-                value["percent"] = bat_sen.percent 
-                value["charging"] = bat_sen.power_plugged
-            else:
-                value["percent"] = 100
-                value["charging"] = True 
-            GLib.idle_add(self.update_status, value)
-            time.sleep(1)
-
-    def update_status(self, value: dict[str, str | bool]):
+    def update_status(self, _, value: dict[str, float | bool]):
         self.battery_progress_bar.progress_bar.set_value(value["percent"] / 100)
         self.battery_progress_bar.label.set_label(str(int(value["percent"])) + "%")
         if value["charging"]:
@@ -51,3 +35,8 @@ class BatterySingle(Gtk.Box):
         else:
             self.battery_progress_bar.icon.set_text(Icons.BAT.value)
 
+    def on_destroy(self, *_):
+        self.metrics.unsubscribe("battery", self._handler_id)
+        release_service("metrics")
+
+
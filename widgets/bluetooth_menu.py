@@ -3,13 +3,10 @@ import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import GObject, Gtk, GLib, Pango
 
-import subprocess
-import threading
 import asyncio
-import time
 
 from utils import async_task_manager
-from utils.bluetooth_backend import forget_device, get_bluetooth_enabled, set_bluetooth_power, get_bluetooth_device_status, get_bluetooth_devices, pair_device, connect_device, disconnect_device, forget_device
+from utils.bluez import get_bluez_client
 
 from loguru import logger
 
@@ -45,8 +42,6 @@ class BluetoothDeviceRow(Gtk.ListBoxRow):
     def __init__(self, device_info: dict[str, str | bool]):
         super().__init__()
 
-        self.task_manager = async_task_manager
-
         self.set_margin_top(5)
         self.set_margin_bottom(5)
         self.set_margin_start(10)
@@ -55,8 +50,8 @@ class BluetoothDeviceRow(Gtk.ListBoxRow):
         self.mac_address: str = device_info["mac_addr"]
         self.device_name: str = device_info["device_name"]
 
-        self.is_connected = False
-        self.device_type = "unknown"
+        self.is_connected: bool = bool(device_info.get("connected", False))
+        self.device_type: str = device_info.get("device_type", "unknown")
 
         # Main container for the row
         container = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -100,24 +95,28 @@ class BluetoothDeviceRow(Gtk.ListBoxRow):
         left_box.pack_start(self.details_box, False, False, 0)
 
         container.pack_start(left_box, True, True, 0)
-        self.task_manager.run(self.update_ui())
+        self.update_ui()
 
-    async def update_ui(self):
-        device_info = await asyncio.to_thread(lambda: get_bluetooth_device_status(self.mac_address))
-        
-        self.device_type = device_info.get("device_type", "")
-        self.is_connected = device_info.get("connected", False)
+    def update(self, device_info: dict[str, str | bool]):
+        """Refresh the row from the client's device table"""
+        self.device_name = device_info["device_name"]
+        self.device_type = device_info.get("device_type", "unknown")
+        self.is_connected = bool(device_info.get("connected", False))
+        self.update_ui()
 
-        GLib.idle_add(
-            self.device_icon.set_from_icon_name,
+    def update_ui(self):
+        self.device_icon.set_from_icon_name(
             self.get_icon_name_for_device(),
             Gtk.IconSize.LARGE_TOOLBAR,
         )
 
         if self.is_connected:
-            GLib.idle_add(self.name_label.set_markup, f"<b>{self.device_name}</b>")
-            GLib.idle_add(self.connected_label.set_text, " (Connected)")
-        GLib.idle_add(self.type_label.set_text, self.get_friendly_device_type())
+            self.name_label.set_markup(f"<b>{GLib.markup_escape_text(self.device_name)}</b>")
+            self.connected_label.set_text(" (Connected)")
+        else:
+            self.name_label.set_text(self.device_name)
+            self.connected_label.set_text("")
+        self.type_label.set_text(self.get_friendly_device_type())
 
     def get_icon_name_for_device(self):
         """Return appropriate icon based on device type"""
@@ -151,6 +150,9 @@ class BluetoothMenu(Gtk.Box):
         self._scan_lock: bool = False
 
         self.task_manager = async_task_manager
+
+        self.client = get_bluez_client()
+        self._rows: dict[str, BluetoothDeviceRow] = {}
         
         self._container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         self._container.set_hexpand(True)
@@ -162,8 +164,13 @@ class BluetoothMenu(Gtk.Box):
 
         self.add(self._container)
 
+        self.client.connect("device-added", self.on_device_added)
+        self.client.connect("device-changed", self.on_device_changed)
+        self.client.connect("device-removed", self.on_device_removed)
+        self.client.connect("powered-changed", self.on_powered_changed)
+
         self.update_switch()
-        self.refresh_bluetooth(None)
+        self._populate_rows()
 
     def _setup_header_ui(self):
         """Sets up the header UI elements (title and switch)."""
@@ -221,56 +228,71 @@ class BluetoothMenu(Gtk.Box):
             scan_duration = self.scan_duration
 
         # prevent concurrent scans
-        if hasattr(self, "_scan_lock") and self._scan_lock:
-            return
+        if self._scan_lock:
+            return False
         self._scan_lock = True
 
+        # devices stream in through device-added while discovery runs
+        logger.info(f"Starting bluetooth scan for {scan_duration} seconds")
         self.scan_status_label.set_text("scanning for devices...")
-        self.task_manager.run(self._refresh_bluetooth())
+        self.task_manager.run(asyncio.to_thread(self.client.start_discovery))
 
-        def clear_scan_flag():
+        def stop_scan():
+            self.task_manager.run(asyncio.to_thread(self.client.stop_discovery))
             self._scan_lock = False
-            self.scan_status_label.set_text("scan complete")
+            self.scan_status_label.set_text(
+                "scan complete" if self._rows else "no devices found"
+            )
             return False
 
-        GLib.timeout_add(1000 * scan_duration, clear_scan_flag)
+        GLib.timeout_add(1000 * scan_duration, stop_scan)
+        return False
 
-    async def _refresh_bluetooth(self, scan_duration: int | None = None):
-        """Performs Bluetooth scanning in a background thread with improved discovery."""
-        if scan_duration is None:
-            scan_duration = self.scan_duration
+    def _populate_rows(self):
+        self._clear_rows()
+        if not self.client.powered:
+            return
+        for device in self.client.get_devices():
+            self._add_row(device)
 
-        logger.info(f"Starting bluetooth scan for {scan_duration} seconds")
+    def _add_row(self, device: dict[str, str | bool]):
+        if device["mac_addr"] in self._rows:
+            return
         try:
-            # Combine both lists, prioritizing paired devices
-            devices = await asyncio.to_thread(lambda: get_bluetooth_devices(scan_duration))
-
-            GLib.idle_add(self._update_device_list_with_rows, devices)
-
+            row = BluetoothDeviceRow(device)
         except Exception as e:
-            logger.info(f"Error in Bluetooth refresh thread: {e}")
-            GLib.idle_add(
-                lambda: self.scan_status_label.set_text(f"Scan error: {str(e)}")
-            )
-
-    def _update_device_list_with_rows(self, devices):
-        self.devices_listbox.foreach(lambda row: self.devices_listbox.remove(row))
-
-        if not devices:
-            self.scan_status_label.set_text("no devices found")
+            logger.error(f"Error creating BluetoothDeviceRow for device {device}: {e}")
             return
+        self._rows[device["mac_addr"]] = row
+        self.devices_listbox.add(row)
+        row.show_all()
 
-        for device in devices:
-            logger.info(str(device))
-            if device:
-                try:
-                    row = BluetoothDeviceRow(device)
-                    self.devices_listbox.add(row)
-                    row.show()
-
-                except Exception as e:
-                    logger.error(f"Error creating BluetoothDeviceRow for device {device}: {e}")
-            self.devices_listbox.show_all()
+    def _clear_rows(self):
+        self.devices_listbox.foreach(lambda row: self.devices_listbox.remove(row))
+        self._rows.clear()
+
+    def on_device_added(self, client, mac_addr: str):
+        if self._bt_enabled and (device := client.get_device(mac_addr)):
+            self._add_row(device)
+
+    def on_device_changed(self, client, mac_addr: str):
+        device = client.get_device(mac_addr)
+        if device and (row := self._rows.get(mac_addr)):
+            row.update(device)
+
+    def on_device_removed(self, client, mac_addr: str):
+        if row := self._rows.pop(mac_addr, None):
+            self.devices_listbox.remove(row)
+
+    def on_powered_changed(self, client, powered: bool):
+        self._set_switch_state(powered)
+        self._bt_enabled = powered
+        self.emit("enabled-status-changed", powered)
+        if powered:
+            self._populate_rows()
+        else:
+            self._clear_rows()
+            self.scan_status_label.set_text("off")
 
     def _set_switch_state(self, state: bool):
         # block signals during update, to prevent recursive calls
@@ -279,26 +301,18 @@ class BluetoothMenu(Gtk.Box):
         self.status_switch.handler_unblock_by_func(self.on_switch_toggled)
 
     def update_switch(self):
-        async def check_enabled():
-            try:
-                is_enabled = await asyncio.to_thread(get_bluetooth_enabled)
-                logger.info(f"[Bluetooth] Enabled: {is_enabled}")
-
-                GLib.idle_add(lambda *_: self._set_switch_state(is_enabled))
-                self._bt_enabled = is_enabled
-                self.emit("enabled-status-changed", is_enabled)
-            except Exception as e:
-                logger.info("ERROR ERROR {}".format(str(e)))
-
-        self.task_manager.run(check_enabled())
+        is_enabled = self.client.powered
+        logger.info(f"[Bluetooth] Enabled: {is_enabled}")
+        self._set_switch_state(is_enabled)
+        self._bt_enabled = is_enabled
+        self.emit("enabled-status-changed", is_enabled)
 
 
     def on_refresh_clicked(self, button):
         if not self._bt_enabled:
             return
 
-        self.devices_listbox.foreach(lambda row: self.devices_listbox.remove(row))
-        GLib.idle_add(self.refresh_bluetooth, None)
+        self.refresh_bluetooth(None)
 
     def on_device_row_activated(self, listbox, row):
         if row:
@@ -318,23 +332,21 @@ class BluetoothMenu(Gtk.Box):
 
         self.scan_status_label.set_text(f"connecting to {name}")
 
-        def connect():
-            # For whatever reason, asyncio doesn't work?
-            try:
-                connect_device(mac_address)
+        device = self.client.get_device(mac_address)
+        needs_pairing = device is not None and not device["paired"]
 
-                GLib.idle_add(
-                    lambda *_: self.scan_status_label.set_text(f"connected to {name}")
-                )
-                self.refresh_bluetooth(None)
+        async def connect():
+            # row state follows through device-changed, no rescan needed
+            if needs_pairing and not await asyncio.to_thread(self.client.pair_device, mac_address):
+                GLib.idle_add(self.scan_status_label.set_text, f"pairing with {name} failed")
+                return
+            success = await asyncio.to_thread(self.client.connect_device, mac_address)
+            GLib.idle_add(
+                self.scan_status_label.set_text,
+                f"connected to {name}" if success else f"connection to {name} failed",
+            )
 
-            except Exception as e:
-                GLib.idle_add(
-                    lambda *_: self.scan_status_label.set_text(
-                        f"connection failed: {str(e)}"
-                    )
-                )
-        threading.Thread(target=connect, daemon=True).start()
+        self.task_manager.run(connect())
 
     def disconnect_selected_device(self, button):
         """Disconnect the selected Bluetooth device."""
@@ -349,21 +361,11 @@ class BluetoothMenu(Gtk.Box):
         self.scan_status_label.set_text(f"Disconnecting from {device_name}...")
 
         async def disconnect():
-            try:
-                await asyncio.to_thread(lambda: disconnect_device(mac_address))
-
-                GLib.idle_add(
-                    lambda: self.scan_status_label.set_text(
-                        f"Disconnected from {device_name}"
-                    )
-                )
-                GLib.idle_add(self.refresh_bluetooth, None)
-            except Exception as e:
-                GLib.idle_add(
-                    lambda: self.scan_status_label.set_text(
-                        f"Disconnection failed: {str(e)}"
-                    )
-                )
+            success = await asyncio.to_thread(self.client.disconnect_device, mac_address)
+            GLib.idle_add(
+                self.scan_status_label.set_text,
+                f"Disconnected from {device_name}" if success else "Disconnection failed",
+            )
 
         self.task_manager.run(disconnect())
 
@@ -398,32 +400,27 @@ class BluetoothMenu(Gtk.Box):
         self.scan_status_label.set_text(f"Removing {device_name}...")
 
         async def forget():
-            try:
-                await asyncio.to_thread(lambda: forget_device(mac_address))
-                GLib.idle_add(
-                    lambda: self.scan_status_label.set_text(f"Removed {device_name}")
-                )
-                GLib.idle_add(self.refresh_bluetooth, None)
-            except Exception as e:
-                GLib.idle_add(
-                    lambda: self.scan_status_label.set_text(f"Removal failed: {str(e)}")
-                )
+            # the row goes away through device-removed
+            success = await asyncio.to_thread(self.client.forget_device, mac_address)
+            GLib.idle_add(
+                self.scan_status_label.set_text,
+                f"Removed {device_name}" if success else "Removal failed",
+            )
 
         self.task_manager.run(forget())
 
     def _enable_bluetooth_action(self):
         """Handles the actions for enabling Bluetooth."""
         self.scan_status_label.set_text("enabling bluetooth...")
-        self.task_manager.run(asyncio.to_thread(lambda: set_bluetooth_power(True)))
-        self.scan_status_label.set_text("scanning for devices...")
-        GLib.timeout_add(1000, self.refresh_bluetooth, None) # Add a short delay before refresh
+        self.task_manager.run(asyncio.to_thread(self.client.set_powered, True))
         self._bt_enabled = True
+        GLib.timeout_add(1000, self.refresh_bluetooth, None) # Add a short delay before refresh
 
     def _disable_bluetooth_action(self):
         """Handles the actions for disabling Bluetooth."""
         self.scan_status_label.set_text("disabling bluetooth...")
-        self.task_manager.run(asyncio.to_thread(lambda: set_bluetooth_power(False)))
-        self.devices_listbox.foreach(lambda row: self.devices_listbox.remove(row))
+        self.task_manager.run(asyncio.to_thread(self.client.set_powered, False))
+        self._clear_rows()
         self.scan_status_label.set_text("off")
         self._bt_enabled = False
 
@@ -2,8 +2,9 @@ from gi.repository import Gtk
 
 from fabric.widgets.box import Box 
 from fabric.widgets.wayland import WaylandWindow as Window
-from .weather import Weather
-from .quote_display import QuoteDisplay
+
+from utils.lazy import LazyWidget, import_attr
+from user.parse_config import DEFAULT_CONFIG
 
 class CalendarWidget(Box):
     def __init__(self, **kwargs):
@@ -14,8 +15,9 @@ class CalendarWidget(Box):
 
 class CalendarWindow(Window):
     def __init__(
-        self, **kwargs
+        self, config: dict = DEFAULT_CONFIG, **kwargs
     ):
+        disabled_widgets = set(config.get("disabled_widgets", DEFAULT_CONFIG["disabled_widgets"]))
 
         super().__init__(
             layer="overlay",
@@ -32,10 +34,15 @@ class CalendarWindow(Window):
         self._container = Box(orientation="v")
 
         self._container.add(CalendarWidget())
-        self._container.add(Weather())
-        self._container.add(QuoteDisplay(name="quote-display"))
+        # these fetch from the network, wait until the popup is first opened
+        if "weather" not in disabled_widgets:
+            self._container.add(LazyWidget(lambda: import_attr("widgets.weather:Weather")()))
+        if "quotes" not in disabled_widgets:
+            self._container.add(LazyWidget(lambda: import_attr("widgets.quote_display:QuoteDisplay")(name="quote-display")))
         self.add(self._container)
-        self.show_all()
+        # not show_all(), that would map the popup right away and build the lazy
+        # widgets with it. the contents are shown, the window waits to be opened
+        self._container.show_all()
 
     def toggle_visible(self) -> None:
         self.set_visible(not self.is_visible())
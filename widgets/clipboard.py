@@ -1,17 +1,87 @@
 
 import gi
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, GLib, Gdk, GdkPixbuf
+from gi.repository import Gtk, GLib, Gdk, GdkPixbuf, Gio, GObject
 
 import threading
 import subprocess
-import time
 import shlex
-import tempfile
+import shutil
+import hashlib
+from collections import deque
+
+
+class ClipboardWatcher(GObject.Object):
+    """Emits "changed" when the clipboard selection changes.
+
+    Uses one long-lived `wl-paste --watch` process when available, otherwise the
+    GTK clipboard's owner-change signal. Nothing is polled either way.
+    """
+
+    __gsignals__ = {"changed": (GObject.SignalFlags.RUN_FIRST, None, ())}
+
+    def __init__(self):
+        super().__init__()
+        self._process: Gio.Subprocess | None = None
+        self._cancellable: Gio.Cancellable | None = None
+        self._owner_change_id: int | None = None
+
+    @property
+    def uses_wl_paste(self) -> bool:
+        return self._process is not None
+
+    def start(self):
+        if shutil.which("wl-paste"):
+            try:
+                # wl-paste runs `echo` on every change, so we get one line per copy
+                self._process = Gio.Subprocess.new(
+                    ["wl-paste", "--watch", "echo"], Gio.SubprocessFlags.STDOUT_PIPE
+                )
+                self._cancellable = Gio.Cancellable()
+                stream = Gio.DataInputStream.new(self._process.get_stdout_pipe())
+                stream.read_line_async(GLib.PRIORITY_DEFAULT, self._cancellable, self._on_line)
+                return
+            except GLib.Error as e:
+                print(f"Unable to start wl-paste --watch because of {e.message}")
+                self._process = None
+        self._watch_owner_change()
+
+    def stop(self):
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+            self._cancellable = None
+        if self._process is not None:
+            self._process.force_exit()
+            self._process = None
+        if self._owner_change_id is not None:
+            Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD).disconnect(self._owner_change_id)
+            self._owner_change_id = None
+
+    def _watch_owner_change(self):
+        if self._owner_change_id is None:
+            self._owner_change_id = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD).connect(
+                "owner-change", lambda *_: self.emit("changed")
+            )
+
+    def _on_line(self, stream: Gio.DataInputStream, result):
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+        except GLib.Error as e:
+            if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                return
+            line = None
+        if line is None:
+            # wl-paste went away, not much else to do but fall back
+            print("wl-paste --watch exited, falling back to owner-change")
+            self._process = None
+            self._watch_owner_change()
+            return
+        self.emit("changed")
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, self._cancellable, self._on_line)
 
 
 class ClipboardHistory(Gtk.Box):
-    def __init__(self, **kwargs):
+    def __init__(self, max_items: int = 10, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
         self.set_spacing(5)
 
@@ -19,67 +89,171 @@ class ClipboardHistory(Gtk.Box):
         scroller.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         
         self.clipboard_list = Gtk.ListBox()
-        self.clipboard_store = []  
+        self.max_items = max_items
+        # entry id -> row / (decoded content, thumbnail or None)
+        self._rows: dict[str, Gtk.ListBoxRow] = {}
+        self._previews: dict[str, tuple[bytes, GdkPixbuf.Pixbuf | None]] = {}
+
+        # cliphist is only the store when it's installed, otherwise keep our own history
+        self._use_cliphist = shutil.which("cliphist") is not None
+        self._ring: deque[tuple[str, str]] = deque(maxlen=max_items)
         
         scroller.add(self.clipboard_list)
         
         self.pack_start(scroller, True, True, 0)
-        
-        self.last_clipboard_content = None
-        
-        self._running = True
-        threading.Thread(target=self.cliphist_poll, daemon=True).start()
-    def cliphist_poll(self):
-        while self._running:
+
+        self._refresh_id: int | None = None
+        self._loading = False
+        self._dirty = False
+
+        self.watcher = ClipboardWatcher()
+        self.watcher.connect("changed", self.on_clipboard_changed)
+        self.watcher.start()
+        self.connect("destroy", lambda *_: self.cleanup())
+
+        if self._use_cliphist:
+            self._refresh()
+
+    def on_clipboard_changed(self, watcher):
+        # cliphist is storing the same change, give it a moment. also merges bursts
+        if self._refresh_id is not None:
+            GLib.source_remove(self._refresh_id)
+        self._refresh_id = GLib.timeout_add(150, self._refresh)
+
+    def _refresh(self):
+        self._refresh_id = None
+        if self._loading:
+            self._dirty = True
+            return False
+        if self._use_cliphist:
+            # the worker gets its own copy, _previews itself is only touched on the main loop
+            self._start_worker(self._load_cliphist, dict(self._previews))
+        elif self.watcher.uses_wl_paste:
+            self._start_worker(self._load_wl_paste)
+        else:
+            Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD).request_text(self._on_text_received)
+        return False
+
+    def _start_worker(self, target, *args):
+        self._loading = True
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    def _worker_done(self):
+        self._loading = False
+        if self._dirty:
+            self._dirty = False
+            self._refresh()
+        return False
+
+    def _load_cliphist(self, previews: dict[str, tuple[bytes, GdkPixbuf.Pixbuf | None]]):
+        try:
+            history = subprocess.check_output(shlex.split("cliphist list")).splitlines()[:self.max_items]
+            entries, previews = self._load_entries(history, previews)
+            GLib.idle_add(self._apply_cliphist, entries, previews)
+        except Exception as e:
+            print(f"Error reading cliphist: {e}")
+        GLib.idle_add(self._worker_done)
+
+    def _load_wl_paste(self):
+        try:
+            clipboard_content = subprocess.check_output(["wl-paste", "--no-newline"])
+            if clipboard_content:
+                GLib.idle_add(self._push_entry, clipboard_content, self._make_thumbnail(clipboard_content))
+        except Exception as e:
+            print(f"Error reading clipboard: {e}")
+        GLib.idle_add(self._worker_done)
+
+    def _on_text_received(self, clipboard, text):
+        if text:
+            self._push_entry(text.encode(), None)
+
+    def _push_entry(self, clipboard_content: bytes, thumbnail: GdkPixbuf.Pixbuf | None):
+        entry_id = hashlib.sha1(clipboard_content).hexdigest()[:16]
+        if thumbnail is not None:
+            content = "[[ image ]]"
+        else:
+            content = clipboard_content.decode(errors="replace")
+
+        # copying something already in the history moves it to the top
+        self._ring = deque(
+            (entry for entry in self._ring if entry[0] != entry_id), maxlen=self.max_items
+        )
+        self._ring.appendleft((entry_id, content))
+        self._previews[entry_id] = (clipboard_content, thumbnail)
+        listed = {listed_id for listed_id, _ in self._ring}
+        for stale_id in set(self._previews) - listed:
+            self._previews.pop(stale_id, None)
+
+        self._update_clipboard_list(list(self._ring))
+        return False
+
+    def _load_entries(self, clipboard_history: list[bytes], previews: dict) -> tuple[list[tuple[str, str]], dict]:
+        """Runs off the main thread. Returns the entries and a new preview cache for them,
+        reusing what's in `previews` and decoding the rest"""
+        entries = []
+        new_previews = {}
+        for entry in clipboard_history:
+            entry_id, content = entry.decode(errors="replace").split('\t', 1)
+            entries.append((entry_id, content))
+            if entry_id in previews:
+                new_previews[entry_id] = previews[entry_id]
+                continue
             try:
-                new_history = subprocess.check_output(shlex.split("cliphist list -max-items 10")).splitlines()[:10]
-                
-                # check if changed, and end iteration if so
-                if hasattr(self, 'current_history') and new_history == self.current_history:
-                    time.sleep(1)
-                    continue
-                    
-                self.current_history = new_history
-                GLib.idle_add(self._update_clipboard_list, new_history)
-                
+                clipboard_content = subprocess.check_output(shlex.split(f"cliphist decode {entry_id}"))
             except Exception as e:
-                print(f"Error in cliphist_poll: {e}")
-                
-            time.sleep(1)
-            
-    def _update_clipboard_list(self, clipboard_history: list[str]):
-        # Clear existing items
-        for child in self.clipboard_list.get_children():
-            self.clipboard_list.remove(child)
-        
-        # Add new items in reverse order (newest first)
-        for entry in clipboard_history:
-            entry_id, content = entry.decode().split('\t', 1)
-            clipboard_content = subprocess.check_output(shlex.split(f"cliphist decode {entry_id}"))
-            match b'PNG' in clipboard_content[:4]: # PNG header, idk the rest lmao
-                case True:
-                    loader = GdkPixbuf.PixbufLoader()
-                    try:
-                        loader.write(clipboard_content)
-                        loader.close()
-                        pixbuf = loader.get_pixbuf().scale_simple(100, 100, GdkPixbuf.InterpType.BILINEAR)
-                        img = Gtk.Image.new_from_pixbuf(pixbuf)
-                    except Exception as e:
-                        print(f"Unable to add image because of {str(e)}")
-                        img = Gtk.Image()
-                    btn = Gtk.Button()
-                    btn.add(img)
-                    btn.connect("clicked", self.on_item_clicked, clipboard_content, True)
-                    self.clipboard_list.add(btn)
-                    
-                case False:
-                    btn = Gtk.Button(label=content[:30] + ("..." if len(content) > 30 else ""))
-                    btn.set_tooltip_text(content)
-                    btn.connect("clicked", self.on_item_clicked, clipboard_content, False)
-                    self.clipboard_list.add(btn)
-       
-        # Show all widgets
-        self.clipboard_list.show_all()
+                print(f"Unable to decode entry {entry_id} because of {str(e)}")
+                continue
+            new_previews[entry_id] = (clipboard_content, self._make_thumbnail(clipboard_content))
+        return entries, new_previews
+
+    def _apply_cliphist(self, entries: list[tuple[str, str]], previews: dict):
+        self._previews = previews
+        return self._update_clipboard_list(entries)
+
+    @staticmethod
+    def _make_thumbnail(clipboard_content: bytes) -> GdkPixbuf.Pixbuf | None:
+        if b'PNG' not in clipboard_content[:4]: # PNG header, idk the rest lmao
+            return None
+        loader = GdkPixbuf.PixbufLoader()
+        try:
+            loader.write(clipboard_content)
+            loader.close()
+            return loader.get_pixbuf().scale_simple(100, 100, GdkPixbuf.InterpType.BILINEAR)
+        except Exception as e:
+            print(f"Unable to add image because of {str(e)}")
+            return None
+
+    def _make_row(self, entry_id: str, content: str) -> Gtk.ListBoxRow:
+        clipboard_content, thumbnail = self._previews.get(entry_id, (content.encode(), None))
+        is_image = b'PNG' in clipboard_content[:4]
+        if is_image:
+            btn = Gtk.Button()
+            btn.add(Gtk.Image.new_from_pixbuf(thumbnail) if thumbnail else Gtk.Image())
+        else:
+            btn = Gtk.Button(label=content[:30] + ("..." if len(content) > 30 else ""))
+            btn.set_tooltip_text(content)
+        btn.connect("clicked", self.on_item_clicked, clipboard_content, is_image)
+
+        row = Gtk.ListBoxRow()
+        row.add(btn)
+        row.show_all()
+        return row
+
+    def _update_clipboard_list(self, entries: list[tuple[str, str]]):
+        # rows are keyed by cliphist id, only touch the ones that changed
+        wanted = [entry_id for entry_id, _ in entries]
+        for entry_id in set(self._rows) - set(wanted):
+            self.clipboard_list.remove(self._rows.pop(entry_id))
+
+        for index, (entry_id, content) in enumerate(entries):
+            row = self._rows.get(entry_id)
+            if row is None:
+                row = self._rows[entry_id] = self._make_row(entry_id, content)
+                self.clipboard_list.insert(row, index)
+            elif row.get_index() != index:
+                self.clipboard_list.remove(row)
+                self.clipboard_list.insert(row, index)
+        return False
         
     def on_item_clicked(self, button, clipboard_content, is_image: bool = False):
         # get clipboard 
@@ -103,7 +277,10 @@ class ClipboardHistory(Gtk.Box):
                     clipboard.set_text(str(clipboard_content), -1)
 
     def cleanup(self):
-        self._running = False
+        if self._refresh_id is not None:
+            GLib.source_remove(self._refresh_id)
+            self._refresh_id = None
+        self.watcher.stop()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 from fabric.widgets.box import Box
 
-from services import audio_service, brightness_service
+from services import get_service
 
 from fabric.utils import exec_shell_command_async
 
@@ -89,11 +89,11 @@ class Controls(Box):
     def __init__(self, size: tuple[int, int] = (-1, -1), **kwargs) -> None:
         super().__init__(orientation="v", size=size, **kwargs)
 
-        self.audio = audio_service
+        self.audio = get_service("audio")
         self.audio.connect("notify::speaker", self.on_speaker_changed)
         self.audio.connect("changed", self.check_mute)
 
-        self.brightness = brightness_service.get_initial()
+        self.brightness = get_service("brightness")
         self.volume_box = ScaleControl(
             label=Icons.VOL.value,
             name="scale-control",
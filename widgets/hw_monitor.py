@@ -5,12 +5,9 @@ from user.icons import Icons
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, GLib
+from gi.repository import Gtk
 
-import psutil
-
-from utils import async_task_manager
-import asyncio
+from services import acquire_service, release_service
 
 class HWMonitor(Gtk.Box):
     def __init__(self, **kwargs) -> None:
@@ -56,54 +53,43 @@ class HWMonitor(Gtk.Box):
 
         self.add(self._container)
 
-        self.task_manager = async_task_manager
-        
-        self.start_poll()
-        self._running = True
+        self.metrics = acquire_service("metrics")
+        self._handlers: list[tuple[str, int]] = []
+        self.resume()
 
         self.connect("destroy", self.on_destroy)
 
-    def start_poll(self):
-        self.task_manager.run(self._poll())
-
-    async def _poll(self) -> None:
-        while self._running:
-            value = await asyncio.to_thread(self._poll_once)
-            GLib.idle_add(self.update_ui, value)
-            await asyncio.sleep(1)
-
-    def _poll_once(self) -> dict:
-        ram = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
-        try:
-            temp = list(psutil.sensors_temperatures().items())[0][1][0].current
-        except (IndexError, KeyError):
-            temp = 0
-
-        value = {
-            "cpu_usage": int(psutil.cpu_percent()),
-            "cpu_temp": int(temp),
-            "ram_percent": ram.percent / 100,
-            "ram_usage": (ram.total - ram.available) / (1024**3),
-            "disk_percent": disk.percent / 100,
-            "disk_usage": disk.used / (1024**3),
-        }
-
-        return value
-
-
-    def update_ui(self, value: dict):
-        self.cpu_progress_bar.progress_bar.set_value(value["cpu_usage"] / 100)
-        self.cpu_progress_bar.label.set_label(str(value["cpu_usage"]) + "%")
-
-        self.cpu_temp_progress_bar.progress_bar.set_value(value["cpu_temp"] / 100)
-        self.cpu_temp_progress_bar.label.set_label(str(value["cpu_temp"]) + "°C")
-
-        self.ram_progress_bar.progress_bar.set_value(value["ram_percent"])
-        self.ram_progress_bar.label.set_label(f"{value['ram_usage']:.1f}GB")
-
-        self.disk_progress_bar.progress_bar.set_value(value["disk_percent"])
-        self.disk_progress_bar.label.set_label(f"{value['disk_usage']:.0f}GB")
+    def pause(self):
+        for metric, handler_id in self._handlers:
+            self.metrics.unsubscribe(metric, handler_id)
+        self._handlers = []
+
+    def resume(self):
+        if self._handlers:
+            return
+        self._handlers = [
+            ("cpu", self.metrics.subscribe("cpu", self.on_cpu)),
+            ("temperature", self.metrics.subscribe("temperature", self.on_temperature)),
+            ("memory", self.metrics.subscribe("memory", self.on_memory)),
+            ("disk", self.metrics.subscribe("disk", self.on_disk)),
+        ]
+
+    def on_cpu(self, _, value: int):
+        self.cpu_progress_bar.progress_bar.set_value(value / 100)
+        self.cpu_progress_bar.label.set_label(str(value) + "%")
+
+    def on_temperature(self, _, value: int):
+        self.cpu_temp_progress_bar.progress_bar.set_value(value / 100)
+        self.cpu_temp_progress_bar.label.set_label(str(value) + "°C")
+
+    def on_memory(self, _, value: dict):
+        self.ram_progress_bar.progress_bar.set_value(value["percent"])
+        self.ram_progress_bar.label.set_label(f"{value['used_gb']:.1f}GB")
+
+    def on_disk(self, _, value: dict):
+        self.disk_progress_bar.progress_bar.set_value(value["percent"])
+        self.disk_progress_bar.label.set_label(f"{value['used_gb']:.0f}GB")
 
     def on_destroy(self, *_):
-        self._running = False
+        self.pause()
+        release_service("metrics")
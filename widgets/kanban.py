@@ -1,15 +1,13 @@
 # STOLEN FROM AXENIDE's AX-SHELL
 
 import gi
-import json
-import os
-from pathlib import Path
 import cairo  # For rendering the drag preview
 
 
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, Gdk, GObject, GLib
 from user.icons import Icons 
+from utils.database import get_database
 
 def createSurfaceFromWidget(widget: Gtk.Widget) -> cairo.ImageSurface:
     alloc = widget.get_allocation()
@@ -301,10 +299,10 @@ class KanbanColumn(Gtk.Frame):
         widget.get_parent().get_parent().drag_unhighlight()
 
 class Kanban(Gtk.Box):
-    STATE_FILE = Path(os.path.expanduser("~/.kanban.json"))
-
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # column title -> notes as last written, only columns that differ get rewritten
+        self._saved: dict[str, list[str]] = {}
         
         self.grid = Gtk.Grid(column_spacing=4, column_homogeneous=True)
         self.grid.set_vexpand(True)
@@ -324,33 +322,27 @@ class Kanban(Gtk.Box):
         self.show_all()
 
     def save_state(self):
-        state = {
-            "columns": [
-                {"title": col.title, "notes": col.get_notes()}
-                for col in self.columns
-            ]
-        }
-        try:
-            with open(self.STATE_FILE, "w") as f:
-                json.dump(state, f, indent=2)
-        except Exception as e:
-            print(f"Error saving state: {e}")
+        for column in self.columns:
+            notes = column.get_notes()
+            if self._saved.get(column.title) == notes:
+                continue
+            try:
+                get_database().set_kanban_column(column.title, notes)
+                self._saved[column.title] = notes
+            except Exception as e:
+                print(f"Error saving state: {e}")
 
     def load_state(self):
         try:
-            with open(self.STATE_FILE, "r") as f:
-                state = json.load(f)
-                for col_data in state["columns"]:
-                    for column in self.columns:
-                        if column.title == col_data["title"]:
-                            column.clear_notes(suppress_signal=True)
-                            for note_text in col_data["notes"]:
-                                column.add_note(note_text, suppress_signal=True)
-                            break
-        except FileNotFoundError:
-            pass
+            saved = get_database().kanban_notes()
         except Exception as e:
             print(f"Error loading state: {e}")
+            return
+        for column in self.columns:
+            column.clear_notes(suppress_signal=True)
+            for note_text in saved.get(column.title, []):
+                column.add_note(note_text, suppress_signal=True)
+            self._saved[column.title] = saved.get(column.title, [])
 
 
 KANBAN_CSS = """
@@ -5,21 +5,27 @@ gi.require_version("Playerctl", "2.0")
 gi.require_version("Gtk", "3.0")
 from gi.repository import Playerctl, GLib, Gtk, GObject, GdkPixbuf
 from utils import AsyncTaskManager, async_task_manager
-import threading
-import asyncio
-import aiohttp
 
 from loguru import logger
-import urllib
+
+from utils.art_cache import get_art_cache
+from utils.sources import get_source_registry
 
 from user.icons import Icons
 from enum import Enum
 
-import time
-
 from loguru import logger
 
 
+# one player manager (it watches the session bus for MPRIS players) shared by every
+# MediaWidget, and dropped once the last one is destroyed
+get_source_registry().register(
+    "playerctl-manager",
+    Playerctl.PlayerManager,
+    stop=lambda manager: manager.run_dispose(),
+)
+
+
 def format_time(seconds):
     hours, remainder = divmod(seconds, 3600)
     minutes, seconds = divmod(remainder, 60)
@@ -44,6 +50,7 @@ class PlayerBox(Gtk.Box):
         self._status = self._player.props.playback_status
 
         self._art_size = art_size
+        self._art_url: str | None = None
 
         self._duration: int = 0
 
@@ -128,11 +135,22 @@ class PlayerBox(Gtk.Box):
         except:
             pass
 
-        thread = threading.Thread(target=self._check_position_thread, daemon=True)
-        thread.start()
+        self._position_timer_id: int | None = None
+        self.resume()
+        self.connect("destroy", lambda *_: self.pause())
 
         self.show_all()
 
+    def pause(self):
+        if self._position_timer_id is not None:
+            GLib.source_remove(self._position_timer_id)
+            self._position_timer_id = None
+
+    def resume(self):
+        if self._position_timer_id is None:
+            self._check_position()
+            self._position_timer_id = GLib.timeout_add_seconds(1, self._on_position_tick)
+
     @property
     def status(self):
         return self._status
@@ -165,43 +183,12 @@ class PlayerBox(Gtk.Box):
         self._player.next()
 
     async def set_art(self, art_url: str):
-        pixbuf = None
-        if urllib.parse.urlparse(art_url).scheme == "file":
-            # just create a pixbuf from file
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file(urllib.parse.urlparse(art_url).path)
-        else:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(art_url) as response:
-                        if response.status == 200:
-                            img_bytes = await response.read()
-
-                        else:
-                            img_bytes = None
-                loader = GdkPixbuf.PixbufLoader.new()
-                loader.write(img_bytes)
-                loader.close()
-                pixbuf = loader.get_pixbuf()
-
-            except Exception as e:
-                ...
-
-        width = pixbuf.get_width()
-        height = pixbuf.get_height()
-        size_to_crop = min(width, height)
-
-        x_offset = (width - size_to_crop) // 2
-        y_offset = (height - size_to_crop) // 2
-
-        cropped_pixbuf = pixbuf.new_subpixbuf(
-            x_offset, y_offset, size_to_crop, size_to_crop
-        )
-
-        resized_pixbuf = cropped_pixbuf.scale_simple(
-            self._art_size, self._art_size, GdkPixbuf.InterpType.BILINEAR
-        )
-
-        GLib.idle_add(self.art.set_from_pixbuf, resized_pixbuf)
+        self._art_url = art_url
+        pixbuf = await get_art_cache().get(art_url, self._art_size)
+        if pixbuf is None or art_url != self._art_url:
+            # failed, or the track changed while this one was loading
+            return
+        GLib.idle_add(self.art.set_from_pixbuf, pixbuf)
 
     def on_metadata(self, player, metadata: GLib.Variant):
         logger.info(metadata)
@@ -223,17 +210,18 @@ class PlayerBox(Gtk.Box):
         if art_url:
             self.task_manager.run(self.set_art(art_url.get_string()))
 
-    def _check_position_thread(self):
-        while True:
-            self._check_position()
-            time.sleep(1)
+    def _on_position_tick(self) -> bool:
+        self._check_position()
+        return True
 
     def _check_position(self):
-        pos = self._player.props.position
-        logger.info(pos)
-        GLib.idle_add(self.position_label.set_label, format_time((pos/10**6)))
+        try:
+            pos = self._player.props.position
+        except Exception:
+            return
+        self.position_label.set_label(format_time((pos/10**6)))
         if self._duration > 0:
-            GLib.idle_add(self.time_scale.set_value, pos)
+            self.time_scale.set_value(pos)
             
     def set_position(self, scale, *_): 
         new_pos = scale.get_value() 
@@ -313,9 +301,14 @@ class MediaWidget(Gtk.Box):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self._manager = Playerctl.PlayerManager()
-        self._manager.connect("name-appeared", self.on_name_appeared)
-        self._manager.connect("player-vanished", self.on_player_vanished)
+        self._paused: bool = False
+
+        self._manager = get_source_registry().acquire("playerctl-manager")
+        self._manager_handlers = [
+            self._manager.connect("name-appeared", self.on_name_appeared),
+            self._manager.connect("player-vanished", self.on_player_vanished),
+        ]
+        self.connect("destroy", self.on_destroy)
 
         self.stack = Gtk.Stack()
         self.stackswitcher = Gtk.StackSwitcher(orientation=Gtk.Orientation.VERTICAL)
@@ -353,14 +346,35 @@ class MediaWidget(Gtk.Box):
         self._manager.manage_player(player)
 
         player_box = PlayerBox(player=player)
+        if self._paused:
+            player_box.pause()
         player_box.set_visible(True)
         self.stack.add_titled(player_box, player_name.name, "")
         self.stackswitcher.set_stack(self.stack)
         self.show_all()
 
+    def pause(self):
+        self._paused = True
+        for child in self.stack.get_children():
+            if isinstance(child, PlayerBox):
+                child.pause()
+
+    def resume(self):
+        self._paused = False
+        for child in self.stack.get_children():
+            if isinstance(child, PlayerBox):
+                child.resume()
+
+    def on_destroy(self, *_):
+        self.pause()
+        for handler_id in self._manager_handlers:
+            self._manager.disconnect(handler_id)
+        get_source_registry().release("playerctl-manager")
+
     def on_player_vanished(self, manager, player):
         child = self.stack.get_child_by_name(player.props.player_name)
         if child:
+            child.pause()
             self.stack.remove(child)
         # If there are no players left, add the blank placeholder
         if not self.stack.get_children():
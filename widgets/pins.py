@@ -3,8 +3,6 @@ import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk, GLib, Gio, GdkPixbuf, Pango
 
-import cairo
-
 import re
 import os
 
@@ -12,8 +10,6 @@ from enum import Enum
 import subprocess
 
 from pathlib import Path
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 
 import json
 import tempfile
@@ -23,14 +19,14 @@ from user.icons import Icons
 import urllib.parse 
 import urllib.request 
 
-import aiohttp
-
 from loguru import logger
 
 from utils import async_task_manager
+from utils.favicon_cache import get_favicon_cache
+from utils.file_watch import get_file_watcher
+from utils.database import get_database
 import asyncio
 
-SAVE_FILE = os.path.expanduser("~/.pins.json")
 URL_REGEX = re.compile(r"https?://\S+")
 
 class DefaultApps(Enum):
@@ -48,29 +44,6 @@ def is_url(text):
         r'(?:/?|[/?]\S+)$', re.IGNORECASE)
     return bool(url_pattern.match(text))
 
-def get_favicon_url(url: str) -> str:
-    parsed_url = urllib.parse.urlparse(url)
-    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-    return f"{base_url}/favicon.ico"
-
-
-
-async def download_favicon(url: str) -> bytes:
-    favicon_url = get_favicon_url(url)
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(favicon_url) as response:
-                if response.status == 200:
-                    return await response.read()
-                else:
-                    logger.info(f"Failed to download favicon: HTTP {response.status}")
-                    return None
-    except Exception as e:
-        logger.info(f"Error downloading favicon: {e}")
-        return None
-
-        
-    
 
 def open_file(filepath):
     try:
@@ -84,7 +57,9 @@ def reveal_file(filepath):
     except Exception as e:
         logger.error("Error opening file:", e)
         
-def createSurfaceFromWidget(widget: Gtk.Widget) -> cairo.ImageSurface:
+def createSurfaceFromWidget(widget: Gtk.Widget) -> "cairo.ImageSurface":
+    import cairo  # only needed once something is dragged
+
     alloc = widget.get_allocation()
     surface = cairo.ImageSurface(cairo.Format.ARGB32, alloc.width, alloc.height)
     cr = cairo.Context(surface)
@@ -329,22 +304,35 @@ class Cell(Gtk.EventBox):
                 return Gtk.Image.new_from_icon_name(icon_name, Gtk.IconSize.DIALOG)
 
     def get_url_preview(self):
-        icon_theme = Gtk.IconTheme.get_default()
-
+        # placeholder now, the favicon is swapped in once it's loaded
+        image = Gtk.Image.new_from_icon_name("text-html", Gtk.IconSize.DIALOG)
+        image.set_pixel_size(self._icon_size)
+        self.task_manager.run(self.load_favicon(self._content, image))
+        return image
+
+    async def load_favicon(self, url: str, image: Gtk.Image):
+        favicon_bytes = await get_favicon_cache().get(url)
+        if not favicon_bytes:
+            return
         try:
-            future = self.task_manager.run(download_favicon(self._content))
-            favicon_bytes = future.result() 
-            loader = GdkPixbuf.PixbufLoader.new()
-            loader.write(favicon_bytes)
-            loader.close()
+            pixbuf = await asyncio.to_thread(self._decode_favicon, favicon_bytes)
+        except Exception as e:
+            logger.info(f"Error decoding favicon for {url}: {e}")
+            return
+        GLib.idle_add(self._set_favicon, url, image, pixbuf)
 
-            pixbuf = loader.get_pixbuf().scale_simple(self._icon_size, self._icon_size, GdkPixbuf.InterpType.BILINEAR)
+    def _decode_favicon(self, favicon_bytes: bytes) -> GdkPixbuf.Pixbuf:
+        loader = GdkPixbuf.PixbufLoader.new()
+        loader.write(favicon_bytes)
+        loader.close()
+        return loader.get_pixbuf().scale_simple(self._icon_size, self._icon_size, GdkPixbuf.InterpType.BILINEAR)
+
+    def _set_favicon(self, url: str, image: Gtk.Image, pixbuf: GdkPixbuf.Pixbuf):
+        # the cell may have been cleared or redrawn while this was loading
+        if self._content == url and image.get_parent() is self.box:
+            image.set_from_pixbuf(pixbuf)
+        return False
 
-            return Gtk.Image.new_from_pixbuf(pixbuf)
-        except Exception as e:
-            logger.info("Error loading folder icon " + str(e))
-            return Gtk.Image.new_from_icon_name("default-folder", Gtk.IconSize.DIALOG)
-    
     def clear_cell(self, button=None):
         self._content = None
         self._content_type = None
@@ -422,37 +410,6 @@ class Cell(Gtk.EventBox):
         menu.popup_at_pointer(event)
 
 
-class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self, app):
-        self.app = app
-
-    def on_any_event(self, event):
-        if event.is_directory:
-            return
-
-        for cell in self.app.cells:
-            if cell._content_type == 'file' and cell._content:
-                try:
-                    cell_real = os.path.realpath(cell._content)
-                    src_real = os.path.realpath(event.src_path)
-                    dest_real = os.path.realpath(getattr(event, 'dest_path', ''))
-                    if cell_real == src_real or (dest_real and cell_real == dest_real):
-                        GLib.idle_add(self.handle_file_event, cell, event)
-                except Exception:
-                    pass
-
-    def handle_file_event(self, cell, event):
-        if event.event_type == 'deleted':
-            cell.clear_cell()
-            self.app.save_state()
-        elif event.event_type == 'moved':
-            if hasattr(event, 'dest_path') and os.path.exists(event.dest_path):
-                cell._content = event.dest_path
-                cell.update_display()
-                self.app.save_state()
-                self.app.add_monitor_for_path(os.path.dirname(event.dest_path))
-
-
 class Pins(Gtk.Box):
     def __init__(self, rows: int = 4, columns: int = 5, icon_size: int = 30, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
@@ -462,11 +419,13 @@ class Pins(Gtk.Box):
         self._icon_size = icon_size
 
         self.loading_state = True
-        self.monitored_paths = set()
-        self.observer = Observer()
-        self.event_handler = FileChangeHandler(self)
+        # pinned file path -> watch id
+        self._file_watches: dict[str, int] = {}
+        self.file_watcher = get_file_watcher()
 
         self.cells = []
+        # slot -> (content_type, content, alias) as last written
+        self._saved: dict[int, tuple] = {}
 
         # Create a grid with 5 rows and 5 columns
         grid = Gtk.Grid(row_spacing=10, column_spacing=10)
@@ -494,50 +453,58 @@ class Pins(Gtk.Box):
         self.connect("drag-data-received", self.on_drag_data_received)
 
     def start_file_monitoring(self):
+        """Watch exactly the pinned files, adding and dropping watches as pins change"""
+        pinned = {
+            cell._content
+            for cell in self.cells
+            if cell._content_type == 'file' and cell._content
+        }
+        for path in set(self._file_watches) - pinned:
+            self.file_watcher.unwatch(self._file_watches.pop(path))
+        for path in pinned - set(self._file_watches):
+            if os.path.exists(path):
+                self._file_watches[path] = self.file_watcher.watch_file(path, self.on_pinned_file_event)
+
+    def on_pinned_file_event(self, path, event, dest):
+        # plain writes to a pinned file fire here too and must not save anything.
+        # clearing or moving a cell saves through update_display()
         for cell in self.cells:
-            if cell._content_type == 'file' and cell._content:
-                dir_path = os.path.dirname(cell._content)
-                if os.path.exists(dir_path) and dir_path not in self.monitored_paths:
-                    self.observer.schedule(self.event_handler, dir_path, recursive=False)
-                    self.monitored_paths.add(dir_path)
-        self.observer.start()
-
-    def add_monitor_for_path(self, path):
-        if path not in self.monitored_paths and os.path.exists(path):
-            self.observer.schedule(self.event_handler, path, recursive=False)
-            self.monitored_paths.add(path)
+            if cell._content_type != 'file' or not cell._content:
+                continue
+            if os.path.realpath(cell._content) != path:
+                continue
+            if event == 'deleted':
+                cell.clear_cell()
+            elif event == 'moved' and dest and os.path.exists(dest):
+                cell._content = dest
+                cell.update_display()
 
     def save_state(self):
-        state = []
-        for cell in self.cells:
-            state.append({
-                'content_type': cell._content_type,
-                'content': cell._content,
-                'alias': cell._alias,
-            })
-        try:
-            with open(SAVE_FILE, 'w+') as f:
-                json.dump(state, f)
-        except Exception as e:
-            logger.info("Error saving state:", e)
+        # only the cells that changed since the last save are written
+        for slot, cell in enumerate(self.cells):
+            state = (cell._content_type, cell._content, cell._alias)
+            if self._saved.get(slot, (None, None, None)) == state:
+                continue
+            try:
+                get_database().set_pin(slot, *state)
+                self._saved[slot] = state
+            except Exception as e:
+                logger.info("Error saving state:", e)
+        self.start_file_monitoring()
 
     def load_state(self):
-        if not os.path.exists(SAVE_FILE):
-            return
         try:
-            with open(SAVE_FILE, 'r') as f:
-                state = json.load(f)
-            for i, cell_data in enumerate(state):
-                if i < len(self.cells):
-                    content = cell_data.get('content')
-                    content_type = cell_data.get('content_type')
-                    alias = cell_data.get('alias')
-                    self.cells[i]._content = content
-                    self.cells[i]._content_type = content_type
-                    self.cells[i]._alias = alias
-                    self.cells[i].update_display()
+            saved = get_database().pins()
         except Exception as e:
             logger.info("Error loading state:", e)
+            return
+        for slot, cell_data in saved.items():
+            if slot < len(self.cells):
+                self.cells[slot]._content = cell_data['content']
+                self.cells[slot]._content_type = cell_data['content_type']
+                self.cells[slot]._alias = cell_data['alias']
+                self.cells[slot].update_display()
+                self._saved[slot] = (cell_data['content_type'], cell_data['content'], cell_data['alias'])
 
     def on_drag_data_received(self, widget, drag_context, x, y, data, info, time):
         if data.get_length() >= 0:
@@ -556,8 +523,9 @@ class Pins(Gtk.Box):
         drag_context.finish(True, False, time)
 
     def stop_monitoring(self):
-        self.observer.stop()
-        self.observer.join()
+        for watch_id in self._file_watches.values():
+            self.file_watcher.unwatch(watch_id)
+        self._file_watches.clear()
         
 if __name__ == "__main__":
     win = Gtk.Window()
@@ -6,12 +6,11 @@ from gi.repository import Gtk, GdkPixbuf, GLib
 
 import os
 import time
-import psutil
-import threading 
 
 from loguru import logger
 
 from user.icons import Icons
+from services import acquire_service, release_service
 
 def get_profile_picture_pixbuf(size=96):
     path = os.path.expanduser("~/Pictures/profile.jpg")
@@ -55,7 +54,7 @@ class Profile(Gtk.Box):
         self.date = Gtk.Label(label=time.strftime(Icons.CALENDAR.value + " %A %m/%d/%Y"))
         self.date.set_xalign(0)
         self.date.get_style_context().add_class("date")
-        GLib.timeout_add(1000, self.update_date_label)
+        self._date_timer_id = GLib.timeout_add(1000, self.update_date_label)
 
         self.uptime = Gtk.Label(label="")
         self.uptime.set_xalign(0)
@@ -72,23 +71,38 @@ class Profile(Gtk.Box):
         self.pack_start(self.profile_pic, False, False, 0)
         self.pack_start(self._labels_container, True, True, 6)
 
-        self._running = True 
-        thread = threading.Thread(target=self.psutil_uptime, daemon=True)
-        thread.start()
-
-    def psutil_uptime(self):
-        while self._running:
-            elapsed = int(time.time() - psutil.boot_time())
-            days, remainder = divmod(elapsed, 86400)
-            hours, remainder = divmod(remainder, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            self.update_uptime(value=f"{days}d {hours}h {minutes}m")
-            time.sleep(60)
-
+        self.metrics = acquire_service("metrics")
+        self._uptime_handler = self.metrics.subscribe("uptime", self.on_uptime)
+        self.connect("destroy", self.on_destroy)
+
+    def pause(self):
+        if self._date_timer_id is not None:
+            GLib.source_remove(self._date_timer_id)
+            self._date_timer_id = None
+        if self._uptime_handler is not None:
+            self.metrics.unsubscribe("uptime", self._uptime_handler)
+            self._uptime_handler = None
+
+    def resume(self):
+        if self._date_timer_id is None:
+            self.update_date_label()
+            self._date_timer_id = GLib.timeout_add(1000, self.update_date_label)
+        if self._uptime_handler is None:
+            self._uptime_handler = self.metrics.subscribe("uptime", self.on_uptime)
+
+    def on_uptime(self, _, elapsed: int):
+        days, remainder = divmod(elapsed, 86400)
+        hours, remainder = divmod(remainder, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        self.update_uptime(value=f"{days}d {hours}h {minutes}m")
 
     def update_uptime(self, value: str):
         self.uptime.set_text(Icons.TIMER.value + " " + value)
 
+    def on_destroy(self, *_):
+        self.pause()
+        release_service("metrics")
+
     def update_date_label(self):
         """Update the date label every second."""
         current_date = time.strftime(Icons.CALENDAR.value + " %A %m/%d/%Y")
@@ -1,4 +1,4 @@
-import heapq
+import bisect
 import gi
 import datetime
 import re
@@ -11,9 +11,23 @@ from gi.repository import Gtk, GLib, GObject
 
 from loguru import logger
 
-import pickle
+from utils.database import get_database
+from utils.scheduler import DeadlineScheduler
 
-REMINDERS_CACHE_PATH = GLib.get_user_cache_dir() + "/reminders.goblin"
+# recurrence -> step between occurrences. stepping naive local datetimes keeps the
+# time of day across DST changes
+RECURRENCES = {
+    "daily": datetime.timedelta(days=1),
+    "weekly": datetime.timedelta(weeks=1),
+}
+
+
+def next_occurrence(due: datetime.datetime, recurrence: str, after: datetime.datetime) -> datetime.datetime:
+    """First occurrence strictly after `after`, skipping any that were missed"""
+    step = RECURRENCES[recurrence]
+    if due > after:
+        return due
+    return due + step * ((after - due) // step + 1)
 
 class Reminders(Box):
     __gsignals__ = {
@@ -28,7 +42,12 @@ class Reminders(Box):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self.task_heap = []
+        # id -> {"id", "due", "text", "recurrence"}
+        self._reminders: dict[int, dict] = {}
+        # (due, text, id) in display order, and the row for each id
+        self._order: list[tuple[datetime.datetime, str, int]] = []
+        self._rows: dict[int, Gtk.Box] = {}
+        self._scheduler = DeadlineScheduler(self.on_reminder_due)
         self.set_orientation(Gtk.Orientation.VERTICAL)
         self.set_spacing(6)
         
@@ -70,6 +89,12 @@ class Reminders(Box):
         )
         hbox_entry.pack_start(self.reminder_entry, True, True, 0)
 
+        self.recurrence_combo = Gtk.ComboBoxText()
+        for recurrence in ["once", *RECURRENCES]:
+            self.recurrence_combo.append(recurrence, recurrence)
+        self.recurrence_combo.set_active_id("once")
+        hbox_entry.pack_start(self.recurrence_combo, False, False, 0)
+
         add_button = Gtk.Button(label="add")
         add_button.connect("clicked", self.add_reminder)
         hbox_entry.pack_start(add_button, False, False, 0)
@@ -92,8 +117,6 @@ class Reminders(Box):
         clear_button.connect("clicked", self.clear_all_tasks)
         hbox_buttons.pack_start(clear_button, True, True, 0)
 
-        GLib.timeout_add(1000, self.check_reminders)
-
         self.load_from_cache()
 
 
@@ -113,85 +136,112 @@ class Reminders(Box):
 
         reminder_name = self.reminder_entry.get_text()
         time_str = self.time_entry.get_text()
+        recurrence = self.recurrence_combo.get_active_id()
+        recurrence = "" if recurrence == "once" else recurrence
         try:
             hour, minute = int(time_str[:2]), int(time_str[2:])
             now = datetime.datetime.now()
             reminder_time = now.replace(
                 hour=hour, minute=minute, second=0, microsecond=0
             )
-            heapq.heappush(self.task_heap, (reminder_time, reminder_name))
-            self.update_task_list()
+            if recurrence:
+                # a repeating reminder for a time that already passed starts at its next occurrence
+                reminder_time = next_occurrence(reminder_time, recurrence, now)
+            reminder_id = get_database().add_reminder(reminder_time, reminder_name, recurrence)
+            self._insert(
+                {"id": reminder_id, "due": reminder_time, "text": reminder_name, "recurrence": recurrence}
+            )
         except (ValueError, IndexError):
             logger.info("Invalid time format! Use HHMM.")
-        self.cache_reminders()
         self.time_entry.set_text("")
         self.reminder_entry.set_text("")
 
     def remove_task(self, widget):
-        if self.task_heap:
-            heapq.heappop(self.task_heap)
-            self.update_task_list()
-            self.cache_reminders()
+        if self._order:
+            self.remove_specific_task(self._order[0][2])
 
     def clear_all_tasks(self, widget):
-        self.task_heap.clear()
-        self.update_task_list()
-        self.cache_reminders()
-
-    def remove_specific_task(self, reminder_time, reminder_name):
-        self.task_heap = [
-            (t, n) for (t, n) in self.task_heap if (t, n) != (reminder_time, reminder_name)
-        ]
-        heapq.heapify(self.task_heap)
-        self.update_task_list()
-        self.cache_reminders()
-
-    def check_reminders(self):
-        if self.task_heap:
-            now = datetime.datetime.now()
-            while self.task_heap and self.task_heap[0][0] <= now:
-                reminder_time, reminder_name = heapq.heappop(self.task_heap)
-                self.update_task_list()
-                self.emit("reminder-due", reminder_name)
-        return True
-
-    def update_task_list(self):
-        for child in self.task_list.get_children():
-            self.task_list.remove(child)
-
-        for reminder_time, reminder_name in sorted(self.task_heap):
-            hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-            label = Gtk.Label(label=f"{reminder_name} - {reminder_time.strftime('%H:%M')}")
-            label.set_max_width_chars(20)
-            label.set_line_wrap(True)
-            label.set_line_wrap_mode(Gtk.WrapMode.CHAR)
-            
-            remove_button = Gtk.Button(label="X")
-            remove_button.set_size_request(20, 20)
-            remove_button.connect(
-                "clicked",
-                lambda _, t=reminder_time, n=reminder_name: self.remove_specific_task(t, n),
-            )
-            
-            hbox.pack_start(label, True, True, 0)
-            hbox.pack_start(remove_button, False, False, 0)
-            self.task_list.pack_start(hbox, False, False, 0)
-        self.task_list.show_all()
+        get_database().clear_reminders()
+        self._scheduler.clear()
+        for row in self._rows.values():
+            row.destroy()
+        self._reminders.clear()
+        self._order.clear()
+        self._rows.clear()
+
+    def remove_specific_task(self, reminder_id):
+        if reminder_id not in self._reminders:
+            return
+        get_database().remove_reminder(reminder_id)
+        self._scheduler.remove(reminder_id)
+        self._remove_row(reminder_id)
+
+    def on_reminder_due(self, reminder_id):
+        reminder = self._reminders[reminder_id]
+        self.emit("reminder-due", reminder["text"])
+
+        if not reminder["recurrence"]:
+            get_database().remove_reminder(reminder_id)
+            self._remove_row(reminder_id)
+            return
+
+        # only the next occurrence is ever stored, computed when the current one fires
+        due = next_occurrence(reminder["due"], reminder["recurrence"], datetime.datetime.now())
+        get_database().set_reminder_due(reminder_id, due)
+        self._remove_row(reminder_id)
+        self._insert(dict(reminder, due=due))
+
+    def _insert(self, reminder: dict) -> None:
+        """Adds one reminder to the schedule and its row to the list, in order"""
+        self._reminders[reminder["id"]] = reminder
+        self._scheduler.add(reminder["id"], reminder["due"].timestamp())
+
+        key = (reminder["due"], reminder["text"], reminder["id"])
+        index = bisect.bisect(self._order, key)
+        self._order.insert(index, key)
+
+        row = self._make_row(reminder)
+        self._rows[reminder["id"]] = row
+        self.task_list.pack_start(row, False, False, 0)
+        self.task_list.reorder_child(row, index)
+        row.show_all()
+
+    def _remove_row(self, reminder_id: int) -> None:
+        reminder = self._reminders.pop(reminder_id)
+        key = (reminder["due"], reminder["text"], reminder_id)
+        del self._order[bisect.bisect_left(self._order, key)]
+        self._rows.pop(reminder_id).destroy()
+
+    def _make_row(self, reminder: dict) -> Gtk.Box:
+        due = reminder["due"]
+        when = due.strftime("%H:%M") if due.date() == datetime.date.today() else due.strftime("%a %H:%M")
+        repeat = f" ({reminder['recurrence']})" if reminder["recurrence"] else ""
+
+        hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        label = Gtk.Label(label=f"{reminder['text']} - {when}{repeat}")
+        label.set_max_width_chars(20)
+        label.set_line_wrap(True)
+        label.set_line_wrap_mode(Gtk.WrapMode.CHAR)
+
+        remove_button = Gtk.Button(label="X")
+        remove_button.set_size_request(20, 20)
+        remove_button.connect(
+            "clicked",
+            lambda _, reminder_id=reminder["id"]: self.remove_specific_task(reminder_id),
+        )
 
-    def cache_reminders(self):
-        try:
-            with open(REMINDERS_CACHE_PATH, "wb") as cache:
-                pickle.dump(self.task_heap, cache)
-        except Exception as e:
-            logger.error("[REMINDERS] " + str(e))
+        hbox.pack_start(label, True, True, 0)
+        hbox.pack_start(remove_button, False, False, 0)
+        return hbox
 
     def load_from_cache(self):
         try:
-            with open(REMINDERS_CACHE_PATH, "rb") as cache:
-                self.task_heap = pickle.load(cache)
-            
-        except Exception as e: ... #Whocares xd
-        self.update_task_list()
+            reminders = get_database().reminders()
+        except Exception as e:
+            logger.error(f"[REMINDERS] {e}")
+            return
+        for reminder in reminders:
+            self._insert(reminder)
 
 if __name__ == "__main__":
     rs = Reminders()
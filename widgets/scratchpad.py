@@ -1,19 +1,31 @@
 import gi
 gi.require_version("Gtk", "3.0")
-gi.require_version("WebKit2", "4.0")
-from gi.repository import Gtk, GLib, WebKit2, Gdk, Gio
+from gi.repository import Gtk, GLib, Gdk, Gio
 
 import os
-import markdown
 
 import threading 
 import gc 
 
 import webbrowser
 
+from utils.store import get_store
+
 SCRATCH_CACHE_PATH = GLib.get_user_cache_dir() + "/scratch.md"
 
 
+# WebKit and markdown are only needed once the preview is opened, don't load them before
+def get_webkit():
+    gi.require_version("WebKit2", "4.0")
+    from gi.repository import WebKit2
+    return WebKit2
+
+
+def render_markdown(text: str) -> str:
+    import markdown
+    return markdown.markdown(text)
+
+
 class Scratchpad(Gtk.Box):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -152,14 +164,14 @@ class Scratchpad(Gtk.Box):
     def initialize_webview(self):
         def _init_webview_thread():
             if self.webview is None:
-                self.webview = WebKit2.WebView() 
+                self.webview = get_webkit().WebView() 
                 self.webview.get_settings().set_enable_javascript(True)
                 self.webview.connect("decide-policy", self.on_decide_policy)
                 self.preview_box.pack_start(self.webview, True, True, 0)
                 self.webview.show() 
 
                 if self.current_markdown:
-                    html = markdown.markdown(self.current_markdown)
+                    html = render_markdown(self.current_markdown)
                     styled_html = self.generate_html_wrapper(html)
                     self.webview.load_html(styled_html, "file:///")
 
@@ -175,11 +187,12 @@ class Scratchpad(Gtk.Box):
             start=start_iter, end=end_iter, include_hidden_chars=True
         )
 
-        with open(SCRATCH_CACHE_PATH, "w+") as h:
-            h.write(self.current_markdown)
+        # debounced, so typing doesn't rewrite the file on every keystroke. losing the
+        # last second of typing to a power cut is fine, so skip the fsync
+        get_store().write(SCRATCH_CACHE_PATH, lambda: self.current_markdown, fsync=False)
 
         if self.webview is not None:
-            html = markdown.markdown(self.current_markdown)
+            html = render_markdown(self.current_markdown)
             styled_html = self.generate_html_wrapper(html)
             self.webview.load_html(styled_html, "file:///")
 
@@ -216,7 +229,7 @@ class Scratchpad(Gtk.Box):
 
 
     def on_decide_policy(self, webview, decision, decision_type):
-        if decision_type == WebKit2.PolicyDecisionType.NAVIGATION_ACTION:
+        if decision_type == get_webkit().PolicyDecisionType.NAVIGATION_ACTION:
             action = decision.get_navigation_action()
             request = action.get_request()
             uri = request.get_uri()
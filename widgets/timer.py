@@ -1,8 +1,6 @@
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, GLib, GObject
-
-from fabric.core.service import Signal
+from gi.repository import Gtk, GLib
 
 try:
     from user.icons import Icons
@@ -14,20 +12,44 @@ except ImportError:
         REBOOT = ""
 
 
-from typing import Callable
+import math
+
+from services import get_service
+
+DEFAULT_TIMER = "timer"
+
 
 class TimerWidget(Gtk.Box):
-    __gsignals__ = {
-        "timer-finished": (GObject.SignalFlags.RUN_FIRST, None, ())
-    }
+    """Shows and controls one of the TimerService timers at a time.
+
+    The label is only refreshed while the widget is mapped, with one wakeup each
+    time the displayed second changes; the countdown itself lives in the service.
+    """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+        self.timers = get_service("timers")
+        self.tick_id = None
+        if not self.timers.names():
+            self.timers.create(DEFAULT_TIMER)
+        self.current = self.timers.names()[0]
 
-        self.time_left = 0  
-        self.is_running = False  
-        self.timer_id = None  
+        # pick a timer, or type a new name to create one
+        self.timer_select = Gtk.ComboBoxText.new_with_entry()
+        self.timer_select.set_name("timer-select")
+        for name in self.timers.names():
+            self.timer_select.append(name, name)
+        self.timer_select.set_active_id(self.current)
+        self.timer_select.connect("changed", self.on_timer_selected)
+        self.timer_select.get_child().connect("activate", self.on_timer_name_activated)
+
+        self.remove_timer_button = Gtk.Button(label="X")
+        self.remove_timer_button.connect("clicked", self.on_remove_timer_clicked)
+
+        select_box = Gtk.Box(spacing=6)
+        select_box.pack_start(self.timer_select, True, True, 0)
+        select_box.pack_start(self.remove_timer_button, False, False, 0)
 
         self.time_label = Gtk.Button(label="00:00")  
         self.time_label.set_name("time-label")
@@ -72,12 +94,10 @@ class TimerWidget(Gtk.Box):
         self.pause_button = Gtk.Button(label=Icons.MEDIA_PAUSE.value)
         self.pause_button.set_name("button-icon")
         self.pause_button.connect("clicked", self.on_pause_clicked)
-        self.pause_button.set_sensitive(False)  
 
         self.reset_button = Gtk.Button(label=Icons.REBOOT.value)
         self.reset_button.set_name("button-icon")
         self.reset_button.connect("clicked", self.on_reset_clicked)
-        self.reset_button.set_sensitive(False)
 
         control_box = Gtk.Box(spacing=6)
         control_box.pack_start(self.start_button, True, True, 0)
@@ -85,11 +105,21 @@ class TimerWidget(Gtk.Box):
         control_box.pack_start(self.reset_button, True, True, 0)
 
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        vbox.pack_start(select_box, True, True, 0)
         vbox.pack_start(self.time_container, True, True, 0)
         vbox.pack_start(button_grid, True, True, 0)
         vbox.pack_start(control_box, True, True, 0)
 
         self.add(vbox)
+
+        self._handler_ids = [
+            self.timers.connect("changed", self.on_timer_changed),
+            self.timers.connect("removed", self.on_timer_removed),
+        ]
+        self.connect("map", lambda *_: self.refresh())
+        self.connect("unmap", lambda *_: self.stop_ticking())
+        self.connect("destroy", self.on_destroy)
+        self.refresh()
     
     @staticmethod
     def format_time(seconds):
@@ -112,31 +142,75 @@ class TimerWidget(Gtk.Box):
                 h, m, s = ts[0], ts[1], ts[2]
                 return int(h) * 60 * 60 + int(m) * 60 + int(s)
 
+    def refresh(self):
+        """Show the current timer, and keep it ticking while it runs and we're mapped"""
+        self.stop_ticking()
+        remaining = self.timers.remaining(self.current)
+        running = self.timers.is_running(self.current)
+        # whole seconds left, rounded up so it reads 00:00 exactly when it finishes
+        self.time_label.set_label(self.format_time(math.ceil(remaining)))
+
+        self.start_button.set_sensitive(not running)
+        self.pause_button.set_sensitive(running)
+        self.reset_button.set_sensitive(running or remaining > 0)
+
+        if running and self.get_mapped() and remaining > 0:
+            # wake up right when the displayed second changes
+            until_next_second = remaining - (math.ceil(remaining) - 1)
+            self.tick_id = GLib.timeout_add(max(1, int(until_next_second * 1000)), self.on_tick)
+
+    def on_tick(self):
+        self.tick_id = None
+        self.refresh()
+        return False
+
+    def stop_ticking(self):
+        if self.tick_id is not None:
+            GLib.source_remove(self.tick_id)
+            self.tick_id = None
+
+    def on_timer_changed(self, service, name):
+        if name not in [row[1] for row in self.timer_select.get_model()]:
+            self.timer_select.append(name, name)
+        if name == self.current:
+            self.refresh()
+
+    def on_timer_removed(self, service, name):
+        for index, row in enumerate(self.timer_select.get_model()):
+            if row[1] == name:
+                self.timer_select.remove(index)
+                break
+        if name == self.current:
+            if not self.timers.names():
+                self.timers.create(DEFAULT_TIMER)
+            self.timer_select.set_active_id(self.timers.names()[0])
+
+    def on_timer_selected(self, combo):
+        name = combo.get_active_id()
+        if name is not None and name in self.timers:
+            self.current = name
+            self.time_container.set_visible_child_name("time-label")
+            self.refresh()
 
+    def on_timer_name_activated(self, entry):
+        name = entry.get_text().strip()
+        if not name:
+            return
+        self.timers.create(name)
+        self.timer_select.set_active_id(name)
 
-    def update_timer(self):
-        # step forward timer
-        if self.time_left > 0:
-            self.time_left -= 1
-            self.time_label.set_label(self.format_time(self.time_left))
-            return True  # continue timer
-        else:
-            self.is_running = False
-            self.start_button.set_sensitive(True)
-            self.pause_button.set_sensitive(False)
-            self.reset_button.set_sensitive(True)
+    def on_remove_timer_clicked(self, button):
+        self.timers.remove(self.current)
 
-            # emit timer finished signal
-            self.emit("timer-finished")
-            return False  
+    def on_destroy(self, *_):
+        self.stop_ticking()
+        for handler_id in self._handler_ids:
+            self.timers.disconnect(handler_id)
 
     def on_add_time(self, button, seconds):
         """Add time to the timer."""
         self.time_container.set_visible_child_name("time-label")
-        self.time_left += seconds
-        self.time_label.set_label(self.format_time(self.time_left))
-        if not self.is_running:
-            self.reset_button.set_sensitive(True)
+        self.timers.add_time(self.current, seconds)
 
     def on_start_clicked(self, button):
         """Start the timer."""
@@ -144,31 +218,15 @@ class TimerWidget(Gtk.Box):
             self.time_container.set_visible_child_name("time-label")
             self.on_entry_activated(self.time_entry)
 
-        if not self.is_running and self.time_left > 0:
-            self.is_running = True
-            self.timer_id = GLib.timeout_add_seconds(1, self.update_timer)
-            self.start_button.set_sensitive(False)
-            self.pause_button.set_sensitive(True)
-            self.reset_button.set_sensitive(True)
+        self.timers.start(self.current)
 
     def on_pause_clicked(self, button):
         """Pause the timer."""
-        if self.is_running:
-            self.is_running = False
-            GLib.source_remove(self.timer_id)
-            self.start_button.set_sensitive(True)
-            self.pause_button.set_sensitive(False)
+        self.timers.pause(self.current)
 
     def on_reset_clicked(self, button):
         """Reset the timer."""
-        if self.is_running:
-            GLib.source_remove(self.timer_id)
-        self.time_left = 0
-        self.time_label.set_label(self.format_time(self.time_left))
-        self.is_running = False
-        self.start_button.set_sensitive(True)
-        self.pause_button.set_sensitive(False)
-        self.reset_button.set_sensitive(False)
+        self.timers.reset(self.current)
 
     def on_time_label_clicked(self, button): 
         self.time_entry.set_text(button.get_label())
@@ -181,14 +239,12 @@ class TimerWidget(Gtk.Box):
         text = entry.get_text()
         try:
             if ':' in text:
-                self.time_left = self.timestamp_to_sec(text)
+                self.timers.set(self.current, self.timestamp_to_sec(text))
             else:
-                self.time_left = int(text)
-        except ValueError:
-            1
-        except TypeError:
-            1
-        self.time_label.set_label(self.format_time(self.time_left))
+                self.timers.set(self.current, int(text))
+        except (ValueError, TypeError):
+            # not a duration, the timer keeps its old time
+            pass
         self.time_container.set_visible_child_name("time-label")
 
 
@@ -19,13 +19,13 @@ from loguru import logger
 from typing import TypedDict, List, Set
 
 from user.icons import Icons
+from utils.database import get_database
 
 from typing import Literal
 
-TODOS_CACHE_PATH = GLib.get_user_cache_dir() + "/todos.txt"
-
 
 class Todo(TypedDict):
+    id: int
     text: str
     completed: bool
     category: str  
@@ -231,6 +231,7 @@ class Todos(Gtk.Box):
             category = self.category_entry.get_text().strip()
             priority = self.priority_store[self.priority_combo.get_active()][0]
             new_todo = Todo(
+                id=get_database().add_todo(todo_text, category=category, priority=priority),
                 text=todo_text,
                 completed=False,
                 category=category if category else "",
@@ -241,7 +242,6 @@ class Todos(Gtk.Box):
             if category:
                 self._categories.add(category)
                 self.update_category_store()
-            self.cache_todos()
             self.refresh_ui(group_by_mode=self.group_mode_store[self.group_mode_combo.get_active()][0])
             self.entry.set_text("")
             self.category_entry.set_text("")
@@ -269,12 +269,12 @@ class Todos(Gtk.Box):
 
     def toggle_todo(self, todo_item, completed):
         self._todos[self._todos.index(todo_item._todo)]["completed"] = completed
-        self.cache_todos()
+        get_database().set_todo_completed(todo_item._todo["id"], completed)
         self.refresh_ui(group_by_mode=self.group_mode_store[self.group_mode_combo.get_active()][0])
 
     def remove_todo(self, todo_item):
         self._todos.pop(self._todos.index(todo_item._todo))
-        self.cache_todos()
+        get_database().remove_todo(todo_item._todo["id"])
         mode = (None 
                 if len(self._todos) == 0
                 else self.group_mode_store[self.group_mode_combo.get_active()][0])
@@ -287,39 +287,17 @@ class Todos(Gtk.Box):
         self._todos = []
         self._categories.clear()
         self.update_category_store()
-        self.cache_todos()
-
-    def cache_todos(self):
-        try:
-            with open(TODOS_CACHE_PATH, "w") as cache:
-                for todo in self._todos:
-                    cache.write(
-                        f"{todo['text']}|{todo['completed']}|{todo['category']}|{todo['deadline']}|{todo['priority']}\n"
-                    )
-        except Exception as e:
-            logger.error("[TODOS] " + str(e))
+        get_database().clear_todos()
 
     def load_from_cache(self):
         try:
-            with open(TODOS_CACHE_PATH, "r") as cache:
-                self._todos = []
-                for line in cache.readlines():
-                    text, completed, category, deadline, priority = line.strip().split("|")
-                    self._todos.append(
-                        Todo(
-                            text=text,
-                            completed=completed == "True",
-                            category=category,
-                            deadline=deadline,
-                            priority=priority,
-                        )
-                    )
-                    if category:
-                        self._categories.add(category)
-                self.update_category_store()
-                self.refresh_ui(group_by_mode=self.group_mode_store[self.group_mode_combo.get_active()][0])
+            self._todos = [Todo(**row) for row in get_database().todos()]
         except Exception as e:
             logger.error("[TODOS] " + str(e))
+            return
+        self._categories = {todo["category"] for todo in self._todos if todo["category"]}
+        self.update_category_store()
+        self.refresh_ui(group_by_mode=self.group_mode_store[self.group_mode_combo.get_active()][0])
 
     def update_category_store(self):
         self.category_store.clear()
@@ -6,16 +6,7 @@ from gi.repository import Gtk, GLib, GObject, Gdk, Pango
 from utils import async_task_manager
 
 import asyncio
-from utils.wifi_backend import (
-    get_wifi_networks,
-    get_network_speed,
-    connect_network,
-    forget_network,
-    disconnect_network,
-    fetch_currently_connected_ssid,
-    get_wifi_status,
-    set_wifi_power,
-)
+from utils.wifi_backend import get_wifi_backend
 
 from loguru import logger
 
@@ -103,6 +94,8 @@ class WifiMenu(Gtk.Box):
         super().__init__(**kwargs)
         self.set_orientation(Gtk.Orientation.VERTICAL)
 
+        self._scan_lock: bool = False
+
         self._container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5) # Main container for this widget
         self.pack_start(self._container, True, True, 0)
 
@@ -113,11 +106,20 @@ class WifiMenu(Gtk.Box):
 
         self.task_manager = async_task_manager
 
+        self.backend = get_wifi_backend()
+        # the backend is shared and outlives this menu, see on_destroy
+        self._backend_handlers = [
+            self.backend.connect("enabled-changed", self.on_backend_enabled_changed),
+            self.backend.connect("access-points-changed", self.on_backend_access_points_changed),
+            self.backend.connect("active-connection-changed", lambda *_: self.update_ssid()),
+        ]
+        self._list_refresh_id: int | None = None
+
         # Store previous rx_bytes and tx_bytes to calculate Mbps
         self.prev_rx_bytes = 0
         self.prev_tx_bytes = 0
 
-        GLib.timeout_add_seconds(1, self.update_speeds)
+        self._speed_timer_id = GLib.timeout_add_seconds(1, self.update_speeds)
         self.update_ssid()
         self.update_status()
         self.refresh_wifi()
@@ -197,11 +199,30 @@ class WifiMenu(Gtk.Box):
 
         self.task_manager.run(self._fetch_wifi_list())
 
+    def on_backend_enabled_changed(self, backend, enabled: bool):
+        self.enabled_switch.handler_block_by_func(self.on_switch_toggled)
+        self.enabled_switch.set_active(enabled)
+        self.enabled_switch.handler_unblock_by_func(self.on_switch_toggled)
+        self.emit("enabled-status-changed", enabled)
+
+    def on_backend_access_points_changed(self, backend):
+        # APs come and go in bursts during a scan, rebuild the list once per burst
+        if self._list_refresh_id is None:
+            self._list_refresh_id = GLib.timeout_add(500, self._refresh_list_from_backend)
+
+    def _refresh_list_from_backend(self):
+        self._list_refresh_id = None
+        if self._scan_lock:
+            return False
+        # only backends that emit access-points-changed get here, and those read from cache
+        self.update_listbox_ui(self.backend.get_wifi_networks())
+        return False
+
     def on_switch_toggled(self, switch, gparam):
         self.task_manager.run(self._set_wifi_power(switch.get_active()))
 
     async def _fetch_wifi_list(self):
-        if hasattr(self, "_scan_lock") and self._scan_lock:
+        if self._scan_lock:
             logger.info("Wi-Fi scan already in progress. Skipping.")
             return
         
@@ -211,7 +232,8 @@ class WifiMenu(Gtk.Box):
         # current refresh_wifi adds a spinner, so this might be redundant depending on call origin
 
         try:
-            networks = await asyncio.to_thread(get_wifi_networks)
+            await asyncio.to_thread(self.backend.request_scan)
+            networks = await asyncio.to_thread(self.backend.get_wifi_networks)
             GLib.idle_add(self._update_ui_after_fetch, networks)
         except Exception as e:
             logger.error(f"Error fetching Wi-Fi list: {e}")
@@ -233,7 +255,7 @@ class WifiMenu(Gtk.Box):
 
 
     async def _fetch_current_ssid(self):
-        ssid = await asyncio.to_thread(fetch_currently_connected_ssid)
+        ssid = await asyncio.to_thread(self.backend.fetch_currently_connected_ssid)
         if ssid:
             GLib.idle_add(self.status_label.set_text, f"connected: {ssid}")
             self.emit("connected", ssid)
@@ -242,7 +264,7 @@ class WifiMenu(Gtk.Box):
             self.emit("connected", "")
 
     async def _get_wifi_speed(self):
-        speed = await asyncio.to_thread(get_network_speed)
+        speed = await asyncio.to_thread(self.backend.get_network_speed)
 
         rx_bytes = speed["rx_bytes"]
         tx_bytes = speed["tx_bytes"]
@@ -275,7 +297,7 @@ class WifiMenu(Gtk.Box):
         GLib.idle_add(self.status_label.set_text, f"{action_text} wi-fi...")
         
         try:
-            success = await asyncio.to_thread(set_wifi_power, enabled=state)
+            success = await asyncio.to_thread(self.backend.set_wifi_power, enabled=state)
             if success:
                 GLib.idle_add(self._update_ui_after_power_change, state)
             else:
@@ -302,7 +324,7 @@ class WifiMenu(Gtk.Box):
         self.update_status() # Updates the switch state
 
     async def _update_wifi_status(self):
-        enabled = await asyncio.to_thread(get_wifi_status)
+        enabled = await asyncio.to_thread(self.backend.get_wifi_status)
         GLib.idle_add(self.enabled_switch.set_active, enabled)
         GLib.idle_add(self.emit, "enabled-status-changed", enabled)
             
@@ -317,6 +339,21 @@ class WifiMenu(Gtk.Box):
         self.task_manager.run(self._get_wifi_speed())
         return True
 
+    def pause(self):
+        if self._speed_timer_id is not None:
+            GLib.source_remove(self._speed_timer_id)
+            self._speed_timer_id = None
+
+    def resume(self):
+        if self._speed_timer_id is not None:
+            return
+        # byte counters are stale after a pause, don't report the whole gap as one second
+        self.prev_rx_bytes = 0
+        self.prev_tx_bytes = 0
+        self.update_speeds()
+        self.update_ssid()
+        self._speed_timer_id = GLib.timeout_add_seconds(1, self.update_speeds)
+
     def update_listbox_ui(self, networks):
         for child in self.listbox.get_children():
             self.listbox.remove(child)
@@ -369,7 +406,7 @@ class WifiMenu(Gtk.Box):
         selected = self.listbox.get_selected_row()
         ssid = selected.network_data["ssid"]
         GLib.idle_add(self.status_label.set_text, f"Connecting to {ssid}...")
-        result = await asyncio.to_thread(connect_network, ssid)
+        result = await asyncio.to_thread(self.backend.connect_network, ssid)
         
         if result:
             self.update_ssid()
@@ -377,7 +414,7 @@ class WifiMenu(Gtk.Box):
             # Might just need a password
             password, remember = self._show_password_dialog(selected.network_data)
             logger.info("hi", password, remember)
-            result = await asyncio.to_thread(connect_network, ssid=ssid, password=password, remember=remember)
+            result = await asyncio.to_thread(self.backend.connect_network, ssid=ssid, password=password, remember=remember)
             if result:
                 self.update_ssid()
             else:
@@ -390,7 +427,7 @@ class WifiMenu(Gtk.Box):
         ssid = selected.network_data["ssid"]
         
         GLib.idle_add(self.status_label.set_text, f"Disconnecting {ssid}...")
-        result = await asyncio.to_thread(disconnect_network, ssid)
+        result = await asyncio.to_thread(self.backend.disconnect_network, ssid)
         if result:
             self.update_ssid()
         else:
@@ -403,7 +440,7 @@ class WifiMenu(Gtk.Box):
         
         GLib.idle_add(self.status_label.set_text, "Forgetting {}".format(ssid))
         
-        result = await asyncio.to_thread(forget_network, ssid)
+        result = await asyncio.to_thread(self.backend.forget_network, ssid)
         if result:
             self.update_ssid()
             
@@ -481,6 +518,13 @@ class WifiMenu(Gtk.Box):
 
     def on_destroy(self, widget):
         logger.info("seeyuh")
+        self.pause()
+        for handler_id in self._backend_handlers:
+            self.backend.disconnect(handler_id)
+        self._backend_handlers.clear()
+        if self._list_refresh_id is not None:
+            GLib.source_remove(self._list_refresh_id)
+            self._list_refresh_id = None
         del self.task_manager
 
 
@@ -1,29 +1,189 @@
-import yaml 
+"""
+Builds GTK color themes out of base16 scheme YAML files.
+
+    python yaml2css.py ~/src/base16-schemes [more dirs...] [-o styles/themes/base16] [-j 8]
+
+Schemes whose source hasn't changed since the last build (per the manifest in the
+output directory) are skipped, and an index.json listing every theme is written
+next to them so the config layer doesn't have to scan for themes. Themes are
+named after their file, so two schemes with the same file name in different
+source directories are refused before anything is written. A scheme that fails
+to convert is reported and skipped, the rest of the run still goes through.
+"""
+
+import argparse
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles", "themes", "base16")
+MANIFEST_FILE = ".manifest.json"
+INDEX_FILE = "index.json"
+
 
 def yaml_to_css(yaml_string: str) -> str:
     dct = yaml.safe_load(yaml_string)
-    
+    # newer schemes nest the colors under "palette"
+    colors = dct.get("palette", dct)
+
     ret = []
-    for k, v in dct.items():
+    for k, v in colors.items():
         if "base" in k:
             ret.append(
-                f"@define-color {k} #{v};"
+                f"@define-color {k} #{str(v).lstrip('#')};"
             )
     return "\n".join(ret)
 
-if __name__ == "__main__":
-    dir = input("What directory has all yo fuckin files \n")
-    if os.path.exists(dir):
-        for file in os.listdir(dir):
-            fullfile = os.path.join(dir, file)
-            if fullfile.endswith('.yaml'):
-                contents = open(fullfile).read()
-                css = yaml_to_css(contents)
 
-                with open(file.split(".")[0]+".css", "w+") as penis:
-                    penis.write(css)
+def scheme_info(yaml_string: str) -> dict[str, str]:
+    dct = yaml.safe_load(yaml_string)
+    return {
+        "scheme": str(dct.get("name") or dct.get("scheme") or ""),
+        "author": str(dct.get("author") or ""),
+    }
+
+
+def theme_name(source: str) -> str:
+    return os.path.basename(source).split(".")[0]
+
+
+def build_scheme(source: str, output_dir: str) -> dict[str, str]:
+    """Runs in a worker process"""
+    with open(source) as h:
+        contents = h.read()
+    name = theme_name(source)
+    # convert before opening the output, a broken scheme leaves no empty theme behind
+    css, info = yaml_to_css(contents), scheme_info(contents)
+    path = os.path.join(output_dir, f"{name}.css")
+    with open(f"{path}.tmp", "w") as h:
+        h.write(css)
+    os.replace(f"{path}.tmp", path)
+    return {"name": name, "file": f"{name}.css", **info}
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as h:
+        return hashlib.sha1(h.read()).hexdigest()
+
+
+def load_json(path: str, default):
+    try:
+        with open(path) as h:
+            return json.load(h)
+    except (OSError, ValueError):
+        return default
 
 
+def write_json(path: str, data) -> None:
+    with open(f"{path}.tmp", "w") as h:
+        json.dump(data, h, indent=4)
+    os.replace(f"{path}.tmp", path)
+
+
+def find_collisions(sources: list[str], manifest: dict[str, dict]) -> dict[str, list[str]]:
+    """Theme name -> every source that would be written to it, for names claimed twice"""
+    claims: dict[str, set[str]] = {}
+    for source in sources:
+        claims.setdefault(theme_name(source), set()).add(source)
+    # themes built from other directories by earlier runs count too
+    for source, entry in manifest.items():
+        if entry["theme"]["name"] in claims:
+            claims[entry["theme"]["name"]].add(source)
+    return {name: sorted(paths) for name, paths in claims.items() if len(paths) > 1}
+
+
+def build_index(output_dir: str, manifest: dict[str, dict]) -> list[dict[str, str]]:
+    """Every theme in output_dir, with the scheme details for those we built"""
+    built = {entry["theme"]["file"]: entry["theme"] for entry in manifest.values()}
+    return sorted(
+        (
+            built.get(file) or {"name": file[: -len(".css")], "file": file, "scheme": "", "author": ""}
+            for file in os.listdir(output_dir)
+            if file.endswith(".css")
+        ),
+        key=lambda theme: theme["name"],
+    )
+
+
+class CollisionError(Exception):
+    def __init__(self, collisions: dict[str, list[str]]):
+        super().__init__(
+            "\n".join(f"{name}.css would be built from: {', '.join(paths)}" for name, paths in collisions.items())
+        )
+
+
+def build(
+    source_dirs: list[str], output_dir: str, jobs: int | None = None
+) -> tuple[int, int, dict[str, Exception]]:
+    """Returns (built, skipped, {source: error} for the schemes that failed)
+
+    Raises CollisionError, before writing anything, if two sources map to the
+    same theme name.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    # source path -> {"hash": ..., "theme": index entry}
+    manifest: dict[str, dict] = {
+        source: entry
+        for source, entry in load_json(manifest_path, {}).items()
+        if os.path.isfile(source)
+    }
+
+    sources = sorted(
+        os.path.realpath(os.path.join(source_dir, file))
+        for source_dir in source_dirs
+        for file in os.listdir(source_dir)
+        if file.endswith((".yaml", ".yml"))
+    )
+    if collisions := find_collisions(sources, {s: e for s, e in manifest.items() if s not in sources}):
+        raise CollisionError(collisions)
+
+    hashes = {source: file_hash(source) for source in sources}
+    stale = [
+        source
+        for source in sources
+        if manifest.get(source, {}).get("hash") != hashes[source]
+        or not os.path.isfile(os.path.join(output_dir, manifest[source]["theme"]["file"]))
+    ]
+
+    errors: dict[str, Exception] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {source: pool.submit(build_scheme, source, output_dir) for source in stale}
+        for source, future in futures.items():
+            try:
+                manifest[source] = {"hash": hashes[source], "theme": future.result()}
+            except Exception as e:
+                errors[source] = e
+                # built again next time instead of keeping a half written theme
+                manifest.pop(source, None)
+
+    write_json(manifest_path, manifest)
+    write_json(index_path, build_index(output_dir, manifest))
+    return len(stale) - len(errors), len(sources) - len(stale), errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="build GTK themes from base16 scheme YAML files")
+    parser.add_argument("source_dirs", nargs="+", help="directories containing .yaml schemes")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_DIR, help="where to write the .css themes")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: cpu count)")
+    args = parser.parse_args()
+
+    for source_dir in args.source_dirs:
+        if not os.path.isdir(source_dir):
+            parser.error(f"{source_dir} is not a directory")
 
+    try:
+        built, skipped, errors = build(args.source_dirs, args.output, args.jobs)
+    except CollisionError as e:
+        parser.exit(1, f"theme names collide, nothing was built:\n{e}\n")
 
+    for source, error in errors.items():
+        print(f"failed to build {source}: {error}", file=sys.stderr)
+    print(f"built {built} themes, {skipped} unchanged, {len(errors)} failed, index at {os.path.join(args.output, INDEX_FILE)}")
+    sys.exit(1 if errors else 0)